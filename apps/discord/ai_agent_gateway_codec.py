@@ -0,0 +1,52 @@
+"""JSON codec for Gateway frames and forwarded envelopes.
+
+orjson is used when it is installed; the stdlib `json` module is the fallback
+so the watcher still runs without it. Both produce compact UTF-8 bytes, and
+an envelope is encoded once and the same bytes are posted to every target.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None  # type: ignore[assignment]
+
+AUTO_CODEC = "auto"
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    name: str
+    loads: Callable[[str | bytes], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+STDLIB_CODEC = JsonCodec(name="json", loads=json.loads, dumps=_stdlib_dumps)
+ORJSON_CODEC = (
+    JsonCodec(name="orjson", loads=orjson.loads, dumps=orjson.dumps) if orjson is not None else None
+)
+
+
+def resolve_codec(name: str | None = AUTO_CODEC) -> JsonCodec:
+    """`auto` (or unset) prefers orjson; `json` forces the stdlib codec."""
+    normalized = (name or AUTO_CODEC).strip().lower()
+    if normalized == STDLIB_CODEC.name:
+        return STDLIB_CODEC
+    if normalized == "orjson" and ORJSON_CODEC is None:
+        raise ValueError("The orjson JSON codec was requested but orjson is not installed")
+    if normalized not in {AUTO_CODEC, "orjson"}:
+        raise ValueError(f"Unknown JSON codec: {name}")
+    return ORJSON_CODEC or STDLIB_CODEC
+
+
+DEFAULT_CODEC = resolve_codec()
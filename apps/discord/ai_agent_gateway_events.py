@@ -0,0 +1,117 @@
+"""Dispatch event filtering and intent derivation for the Discord Gateway watcher."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+GUILDS_INTENT = 1
+GUILD_MEMBERS_INTENT = 2
+GUILD_PRESENCES_INTENT = 256
+GUILD_MESSAGES_INTENT = 512
+GUILD_MESSAGE_REACTIONS_INTENT = 1024
+GUILD_MESSAGE_TYPING_INTENT = 2048
+DIRECT_MESSAGES_INTENT = 4096
+DIRECT_MESSAGE_REACTIONS_INTENT = 8192
+DIRECT_MESSAGE_TYPING_INTENT = 16384
+MESSAGE_CONTENT_INTENT = 32768
+
+# Guilds is always requested: it carries the guild/channel/thread context that
+# message events refer to, and costs nothing once its dispatches are filtered.
+BASE_INTENTS = GUILDS_INTENT
+
+EVENT_INTENTS: dict[str, int] = {
+    "MESSAGE_CREATE": GUILD_MESSAGES_INTENT | DIRECT_MESSAGES_INTENT | MESSAGE_CONTENT_INTENT,
+    "MESSAGE_UPDATE": GUILD_MESSAGES_INTENT | DIRECT_MESSAGES_INTENT | MESSAGE_CONTENT_INTENT,
+    "MESSAGE_DELETE": GUILD_MESSAGES_INTENT | DIRECT_MESSAGES_INTENT,
+    "MESSAGE_DELETE_BULK": GUILD_MESSAGES_INTENT,
+    "MESSAGE_REACTION_ADD": GUILD_MESSAGE_REACTIONS_INTENT | DIRECT_MESSAGE_REACTIONS_INTENT,
+    "MESSAGE_REACTION_REMOVE": GUILD_MESSAGE_REACTIONS_INTENT | DIRECT_MESSAGE_REACTIONS_INTENT,
+    "MESSAGE_REACTION_REMOVE_ALL": GUILD_MESSAGE_REACTIONS_INTENT | DIRECT_MESSAGE_REACTIONS_INTENT,
+    "MESSAGE_REACTION_REMOVE_EMOJI": GUILD_MESSAGE_REACTIONS_INTENT
+    | DIRECT_MESSAGE_REACTIONS_INTENT,
+    "TYPING_START": GUILD_MESSAGE_TYPING_INTENT | DIRECT_MESSAGE_TYPING_INTENT,
+    "PRESENCE_UPDATE": GUILD_PRESENCES_INTENT,
+    "GUILD_MEMBER_ADD": GUILD_MEMBERS_INTENT,
+    "GUILD_MEMBER_UPDATE": GUILD_MEMBERS_INTENT,
+    "GUILD_MEMBER_REMOVE": GUILD_MEMBERS_INTENT,
+}
+
+# Every intent the watcher requested before filtering existed; used when all
+# dispatch types are allowed.
+ALL_FORWARDED_INTENTS = (
+    BASE_INTENTS
+    | GUILD_MESSAGES_INTENT
+    | GUILD_MESSAGE_REACTIONS_INTENT
+    | DIRECT_MESSAGES_INTENT
+    | DIRECT_MESSAGE_REACTIONS_INTENT
+    | MESSAGE_CONTENT_INTENT
+)
+
+# Every dispatch type is forwarded unless an allowlist narrows it (`None`
+# means all). The Chat SDK Discord adapter in apps/web only handles
+# CHAT_SDK_EVENT_TYPES, so deployments can opt into that list to skip decoding
+# the rest.
+DEFAULT_FORWARDED_EVENT_TYPES: frozenset[str] | None = None
+CHAT_SDK_EVENT_TYPES = frozenset(
+    {"MESSAGE_CREATE", "MESSAGE_REACTION_ADD", "MESSAGE_REACTION_REMOVE"}
+)
+
+# Session lifecycle dispatches are always decoded: READY carries the session id
+# and resume URL, and RESUMED ends a replay.
+SESSION_EVENT_TYPES = frozenset({"READY", "RESUMED"})
+
+# Discord serialises dispatch frames as {"t":"...","s":N,"op":0,"d":{...}}. The
+# pattern is anchored so a "t" key nested inside "d" can never match; frames in
+# any other shape simply fall back to a full decode.
+_DISPATCH_PREFIX = re.compile(r'\{\s*"t"\s*:\s*"([A-Z0-9_]+)"\s*,\s*"s"\s*:\s*(\d+)\s*,')
+
+
+def parse_event_types(value: str | None) -> frozenset[str] | None:
+    """Parse a comma/newline separated list of dispatch types. `*` means all types."""
+    entries = {entry.strip().upper() for entry in (value or "").replace("\n", ",").split(",")}
+    entries.discard("")
+    if "*" in entries:
+        return None
+    return frozenset(entries)
+
+
+def peek_dispatch(frame: str) -> tuple[str, int] | None:
+    """Return `(event_type, sequence)` from a raw dispatch frame without decoding it."""
+    match = _DISPATCH_PREFIX.match(frame)
+    if match is None:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+@dataclass(frozen=True)
+class GatewayEventFilter:
+    """Decides which dispatch types are forwarded to apps/web.
+
+    `allowlist=None` allows every type; the denylist always wins.
+    """
+
+    allowlist: frozenset[str] | None = DEFAULT_FORWARDED_EVENT_TYPES
+    denylist: frozenset[str] = frozenset()
+
+    def allows(self, event_type: str) -> bool:
+        if event_type in self.denylist:
+            return False
+        return self.allowlist is None or event_type in self.allowlist
+
+    def should_decode(self, event_type: str) -> bool:
+        return event_type in SESSION_EVENT_TYPES or self.allows(event_type)
+
+    def intents(self) -> int:
+        """Gateway intents needed to receive the allowed dispatch types."""
+        if self.allowlist is None:
+            return ALL_FORWARDED_INTENTS
+        return derive_intents(self.allowlist - self.denylist)
+
+
+def derive_intents(event_types: Iterable[str]) -> int:
+    intents = BASE_INTENTS
+    for event_type in event_types:
+        intents |= EVENT_INTENTS.get(event_type, 0)
+    return intents
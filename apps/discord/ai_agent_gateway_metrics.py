@@ -0,0 +1,275 @@
+"""Prometheus-style metrics and periodic summaries for the Discord Gateway watcher.
+
+The watcher records into one `GatewayMetrics` per process (shared by every
+shard). `start_metrics_server` exposes it as Prometheus text on
+`GET /metrics`; `log_metrics_forever` emits the same numbers as a structured
+log line so latency can be attributed to Discord (heartbeat ACKs), the
+watcher (queue depth and lag) or apps/web (forward latency) without a scraper.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from typing import Any
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_LOG_INTERVAL_SECONDS = 60.0
+HEARTBEAT_LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FORWARD_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[tuple[str, str], ...]
+QueueSource = Callable[[], Iterable[Mapping[str, Any]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _queue_labels(shard: str, snapshot: Mapping[str, Any]) -> Labels:
+    return (("shard", shard), ("target", str(snapshot["target"])))
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram keyed by label set (seconds)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[Labels, list[int]] = {}
+        self._sums: dict[Labels, float] = {}
+
+    def observe(self, labels: Labels, seconds: float) -> None:
+        counts = self._counts.setdefault(labels, [0] * (len(self.buckets) + 1))
+        counts[bisect_left(self.buckets, seconds)] += 1
+        self._sums[labels] = self._sums.get(labels, 0.0) + seconds
+
+    def totals(self) -> dict[Labels, tuple[int, float]]:
+        """`(count, sum)` per label set."""
+        return {
+            labels: (sum(counts), self._sums[labels]) for labels, counts in self._counts.items()
+        }
+
+    def render(self, name: str) -> list[str]:
+        lines = []
+        for labels, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{name}_bucket{_format_labels((*labels, ('le', le)))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(self._sums[labels])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class GatewayMetrics:
+    """Counters, latency histograms and queue gauges for every shard in a process."""
+
+    def __init__(self) -> None:
+        self.events: Counter[Labels] = Counter()
+        self.filtered_events: Counter[Labels] = Counter()
+        self.reconnects: Counter[Labels] = Counter()
+        self.forwards: Counter[Labels] = Counter()
+        self.heartbeat_latency = LatencyHistogram(HEARTBEAT_LATENCY_BUCKETS)
+        self.forward_latency = LatencyHistogram(FORWARD_LATENCY_BUCKETS)
+        self._queue_sources: list[tuple[str, QueueSource]] = []
+        self._summary_at = time.monotonic()
+        self._summary_events: Counter[str] = Counter()
+        self._summary_forwards: dict[str, tuple[int, float]] = {}
+
+    def add_queue_source(self, shard: str, source: QueueSource) -> None:
+        """Register a callable returning `TargetForwarder.snapshot()` dicts."""
+        self._queue_sources.append((shard, source))
+
+    def record_event(self, shard: str, event_type: str, *, filtered: bool = False) -> None:
+        self.events[(("shard", shard), ("type", event_type))] += 1
+        if filtered:
+            self.filtered_events[(("shard", shard), ("type", event_type))] += 1
+
+    def record_reconnect(self, shard: str) -> None:
+        self.reconnects[(("shard", shard),)] += 1
+
+    def observe_heartbeat_ack(self, shard: str, seconds: float) -> None:
+        self.heartbeat_latency.observe((("shard", shard),), seconds)
+
+    def observe_forward(self, target: str, seconds: float, *, delivered: bool) -> None:
+        self.forward_latency.observe((("target", target),), seconds)
+        self.forwards[(("result", "ok" if delivered else "failed"), ("target", target))] += 1
+
+    def queue_snapshots(self) -> list[tuple[str, Mapping[str, Any]]]:
+        return [(shard, snapshot) for shard, source in self._queue_sources for snapshot in source()]
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: Iterable[str]) -> None:
+            lines.extend((f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", *samples))
+
+        def counter_samples(name: str, counter: Counter[Labels]) -> list[str]:
+            return [
+                f"{name}{_format_labels(labels)} {count}"
+                for labels, count in sorted(counter.items())
+            ]
+
+        family(
+            "discord_gateway_events_total",
+            "counter",
+            "Gateway dispatches received, by event type.",
+            counter_samples("discord_gateway_events_total", self.events),
+        )
+        family(
+            "discord_gateway_filtered_events_total",
+            "counter",
+            "Gateway dispatches dropped by the event filter.",
+            counter_samples("discord_gateway_filtered_events_total", self.filtered_events),
+        )
+        family(
+            "discord_gateway_reconnects_total",
+            "counter",
+            "Gateway connections that ended and were retried.",
+            counter_samples("discord_gateway_reconnects_total", self.reconnects),
+        )
+        family(
+            "discord_gateway_heartbeat_ack_seconds",
+            "histogram",
+            "Time from sending a heartbeat to receiving its ACK.",
+            self.heartbeat_latency.render("discord_gateway_heartbeat_ack_seconds"),
+        )
+        family(
+            "discord_gateway_forward_seconds",
+            "histogram",
+            "Time to deliver an event (or batch) to an apps/web target.",
+            self.forward_latency.render("discord_gateway_forward_seconds"),
+        )
+        family(
+            "discord_gateway_forwards_total",
+            "counter",
+            "Deliveries to apps/web targets, by result.",
+            counter_samples("discord_gateway_forwards_total", self.forwards),
+        )
+
+        snapshots = self.queue_snapshots()
+        for key, name, kind, help_text in (
+            ("depth", "discord_gateway_queue_depth", "gauge", "Events waiting in a target queue."),
+            (
+                "spill_depth",
+                "discord_gateway_queue_spill_depth",
+                "gauge",
+                "Events spilled to disk.",
+            ),
+            (
+                "last_lag_seconds",
+                "discord_gateway_queue_lag_seconds",
+                "gauge",
+                "Queue wait of the most recently forwarded event.",
+            ),
+            (
+                "dropped",
+                "discord_gateway_queue_dropped_total",
+                "counter",
+                "Events dropped by the overflow policy.",
+            ),
+        ):
+            family(
+                name,
+                kind,
+                help_text,
+                (
+                    f"{name}{_format_labels(_queue_labels(shard, snapshot))}"
+                    f" {_format_value(snapshot[key])}"
+                    for shard, snapshot in snapshots
+                ),
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self, now: float | None = None) -> dict[str, Any]:
+        """Rates and mean latencies since the previous summary, for structured logs."""
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self._summary_at, 1e-9)
+
+        events: Counter[str] = Counter()
+        for labels, count in self.events.items():
+            events[dict(labels)["type"]] += count
+        events_per_second = {
+            event_type: round((count - self._summary_events[event_type]) / elapsed, 3)
+            for event_type, count in sorted(events.items())
+            if count > self._summary_events[event_type]
+        }
+
+        forwards = {
+            dict(labels)["target"]: totals
+            for labels, totals in self.forward_latency.totals().items()
+        }
+        forward_mean_ms = {}
+        for target, (count, total) in sorted(forwards.items()):
+            previous_count, previous_total = self._summary_forwards.get(target, (0, 0.0))
+            if count > previous_count:
+                forward_mean_ms[target] = round(
+                    (total - previous_total) / (count - previous_count) * 1000, 1
+                )
+
+        heartbeat_mean_ms = {
+            dict(labels)["shard"]: round(total / count * 1000, 1)
+            for labels, (count, total) in self.heartbeat_latency.totals().items()
+            if count
+        }
+
+        self._summary_at = now
+        self._summary_events = events
+        self._summary_forwards = forwards
+        snapshots = self.queue_snapshots()
+        return {
+            "events_per_second": events_per_second,
+            "forward_mean_ms": forward_mean_ms,
+            "heartbeat_ack_mean_ms": heartbeat_mean_ms,
+            "queue_depth": sum(int(snapshot["depth"]) for _, snapshot in snapshots),
+            "queue_dropped": sum(int(snapshot["dropped"]) for _, snapshot in snapshots),
+            "reconnects": sum(self.reconnects.values()),
+        }
+
+
+async def start_metrics_server(
+    metrics: GatewayMetrics, *, host: str = DEFAULT_METRICS_HOST, port: int
+) -> web.AppRunner:
+    """Serve `GET /metrics` until the returned runner is cleaned up."""
+
+    async def handle_metrics(_request: web.Request) -> web.Response:
+        return web.Response(
+            body=metrics.render().encode(),
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("Serving Discord Gateway watcher metrics", extra={"host": host, "port": port})
+    return runner
+
+
+async def log_metrics_forever(metrics: GatewayMetrics, interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        logger.info("Discord Gateway watcher metrics", extra=metrics.summary())
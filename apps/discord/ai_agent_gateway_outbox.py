@@ -0,0 +1,338 @@
+"""Durable SQLite outbox for Gateway events that apps/web did not accept.
+
+Failed deliveries are stored per target and retried oldest-first with
+exponential backoff. While a target has pending entries, newer events for it
+are appended behind them, so apps/web still sees each target's events in
+Gateway order after an outage. Entries that exhaust their attempts (or get a
+non-retryable response) are kept as dead letters until retention drops them.
+
+Inspect or replay the outbox of a stopped or running watcher with:
+
+    uv run python ai_agent_gateway_outbox.py stats
+    uv run python ai_agent_gateway_outbox.py list --target <webhook url>
+    uv run python ai_agent_gateway_outbox.py replay [--dead-only] [--target <url>]
+    uv run python ai_agent_gateway_outbox.py purge [--dead-only] [--target <url>]
+
+`replay` makes entries due immediately (reviving dead letters); the running
+watcher re-reads pending counts from SQLite on every retry pass, so it picks
+them up within one poll interval and delivers them in order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_PATH = Path(tempfile.gettempdir()) / "tuturuuu-ai-agent-gateway-outbox.sqlite3"
+DEFAULT_OUTBOX_MAX_ROWS = 100_000
+DEFAULT_OUTBOX_MAX_AGE_SECONDS = 24 * 60 * 60.0
+DEFAULT_OUTBOX_MAX_ATTEMPTS = 12
+DEFAULT_OUTBOX_RETRY_BASE_SECONDS = 1.0
+DEFAULT_OUTBOX_RETRY_MAX_SECONDS = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    target TEXT NOT NULL,
+    packet TEXT NOT NULL,
+    timestamp_ms INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    dead INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_target_pending ON outbox (target, dead, id);
+CREATE INDEX IF NOT EXISTS outbox_created_at ON outbox (created_at);
+"""
+
+
+def is_retryable_status(status: int | None) -> bool:
+    """Network errors, timeouts, 408, 429 and 5xx are worth retrying."""
+    return status is None or status in {408, 429} or status >= 500
+
+
+@dataclass(frozen=True)
+class OutboxEntry:
+    """One stored Gateway packet waiting for redelivery."""
+
+    id: int
+    target: str
+    packet: Mapping[str, Any]
+    timestamp_ms: int
+    attempts: int
+
+
+class GatewayOutbox:
+    """SQLite-backed outbox shared by a watcher's forwarders and its retry loop.
+
+    Calls are short local transactions and run on the caller's thread; a lock
+    keeps the single connection safe if it is ever used from worker threads.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_rows: int = DEFAULT_OUTBOX_MAX_ROWS,
+        max_age_seconds: float = DEFAULT_OUTBOX_MAX_AGE_SECONDS,
+        max_attempts: int = DEFAULT_OUTBOX_MAX_ATTEMPTS,
+        retry_base_seconds: float = DEFAULT_OUTBOX_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = DEFAULT_OUTBOX_RETRY_MAX_SECONDS,
+    ):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._lock = threading.Lock()
+        # Pending counts per target let the hot path skip SQLite when the
+        # outbox is empty, which is the normal state. The retry loop calls
+        # `refresh_pending` so changes made by another process (the CLI) show up.
+        self._pending: dict[str, int] = {}
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self.enforce_retention()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def has_pending(self, target: str) -> bool:
+        return self._pending.get(target, 0) > 0
+
+    def pending_targets(self) -> list[str]:
+        return [target for target, count in self._pending.items() if count > 0]
+
+    def refresh_pending(self) -> None:
+        """Re-read pending counts, including rows replayed or purged by another process."""
+        with self._lock:
+            self._refresh_pending()
+
+    def add(
+        self,
+        target: str,
+        packet: Mapping[str, Any],
+        timestamp_ms: int,
+        *,
+        error: str | None = None,
+    ) -> None:
+        """Append a packet behind any entries already pending for `target`."""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO outbox (target, packet, timestamp_ms, next_attempt_at, created_at,"
+                " last_error) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    target,
+                    json.dumps(packet, separators=(",", ":")),
+                    timestamp_ms,
+                    now + self.retry_base_seconds,
+                    now,
+                    error,
+                ),
+            )
+            self._pending[target] = self._pending.get(target, 0) + 1
+
+    def next_due(self, target: str, now: float | None = None) -> OutboxEntry | None:
+        """The oldest pending entry for `target` if its backoff has elapsed.
+
+        Only the head of each target's queue is ever eligible, which is what
+        keeps per-target ordering.
+        """
+        if not self.has_pending(target):
+            return None
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, target, packet, timestamp_ms, attempts, next_attempt_at FROM outbox"
+                " WHERE target = ? AND dead = 0 ORDER BY id LIMIT 1",
+                (target,),
+            ).fetchone()
+
+        if row is None:
+            self._pending[target] = 0
+            return None
+
+        entry_id, entry_target, packet, timestamp_ms, attempts, next_attempt_at = row
+        if next_attempt_at > (time.time() if now is None else now):
+            return None
+
+        return OutboxEntry(
+            id=entry_id,
+            target=entry_target,
+            packet=json.loads(packet),
+            timestamp_ms=timestamp_ms,
+            attempts=attempts,
+        )
+
+    def mark_delivered(self, entry: OutboxEntry) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM outbox WHERE id = ?", (entry.id,))
+            self._decrement(entry.target)
+
+    def mark_failed(self, entry: OutboxEntry, *, status: int | None, error: str) -> None:
+        """Back off a retryable failure, or dead-letter the entry."""
+        attempts = entry.attempts + 1
+        if not is_retryable_status(status) or attempts >= self.max_attempts:
+            logger.error(
+                "Dead-lettering Discord Gateway event after failed redelivery",
+                extra={"attempts": attempts, "status": status, "target": entry.target},
+            )
+            with self._lock:
+                self._connection.execute(
+                    "UPDATE outbox SET dead = 1, attempts = ?, last_error = ? WHERE id = ?",
+                    (attempts, error, entry.id),
+                )
+                self._decrement(entry.target)
+            return
+
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        with self._lock:
+            self._connection.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (attempts, time.time() + delay, error, entry.id),
+            )
+
+    def stats(self) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT target, SUM(dead = 0), SUM(dead = 1), MIN(created_at) FROM outbox"
+                " GROUP BY target ORDER BY target"
+            ).fetchall()
+        return [
+            {"dead": dead, "oldest_created_at": oldest, "pending": pending, "target": target}
+            for target, pending, dead, oldest in rows
+        ]
+
+    def list_entries(self, target: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, target, timestamp_ms, attempts, dead, last_error, packet FROM outbox"
+                " WHERE (:target IS NULL OR target = :target) ORDER BY id LIMIT :limit",
+                {"limit": limit, "target": target},
+            ).fetchall()
+        return [
+            {
+                "attempts": attempts,
+                "dead": bool(dead),
+                "event_type": json.loads(packet).get("t"),
+                "id": entry_id,
+                "last_error": last_error,
+                "target": entry_target,
+                "timestamp_ms": timestamp_ms,
+            }
+            for entry_id, entry_target, timestamp_ms, attempts, dead, last_error, packet in rows
+        ]
+
+    def replay(self, *, target: str | None = None, dead_only: bool = False) -> int:
+        """Make entries due now, reviving dead letters. Returns the number of rows."""
+        with self._lock:
+            changed = self._connection.execute(
+                "UPDATE outbox SET dead = 0, attempts = 0, next_attempt_at = :now"
+                " WHERE (:target IS NULL OR target = :target) AND (:dead_only = 0 OR dead = 1)",
+                {"dead_only": dead_only, "now": time.time(), "target": target},
+            ).rowcount
+            self._refresh_pending()
+        return changed
+
+    def purge(self, *, target: str | None = None, dead_only: bool = False) -> int:
+        with self._lock:
+            changed = self._connection.execute(
+                "DELETE FROM outbox"
+                " WHERE (:target IS NULL OR target = :target) AND (:dead_only = 0 OR dead = 1)",
+                {"dead_only": dead_only, "target": target},
+            ).rowcount
+            self._refresh_pending()
+        return changed
+
+    def enforce_retention(self, now: float | None = None) -> int:
+        """Drop expired rows, then the overflow beyond `max_rows`. Returns rows dropped.
+
+        Runs when the outbox opens and on the watcher's retry timer rather than
+        per insert, so the table can briefly exceed `max_rows` between runs.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            dropped = self._connection.execute(
+                "DELETE FROM outbox WHERE created_at < ?", (now - self.max_age_seconds,)
+            ).rowcount
+            overflow = self._connection.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+            overflow -= self.max_rows
+            if overflow > 0:
+                # Dead letters go first, then the oldest pending entries.
+                dropped += self._connection.execute(
+                    "DELETE FROM outbox WHERE id IN"
+                    " (SELECT id FROM outbox ORDER BY dead DESC, id LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+            self._refresh_pending()
+        if dropped:
+            logger.warning(
+                "Discord Gateway outbox retention dropped events", extra={"dropped": dropped}
+            )
+        return dropped
+
+    def _refresh_pending(self) -> None:
+        self._pending = dict(
+            self._connection.execute(
+                "SELECT target, COUNT(*) FROM outbox WHERE dead = 0 GROUP BY target"
+            ).fetchall()
+        )
+
+    def _decrement(self, target: str) -> None:
+        self._pending[target] = max(0, self._pending.get(target, 0) - 1)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--path",
+        type=Path,
+        default=Path(os.getenv("DISCORD_AI_AGENT_GATEWAY_OUTBOX_PATH") or DEFAULT_OUTBOX_PATH),
+    )
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("stats")
+    list_parser = subcommands.add_parser("list")
+    list_parser.add_argument("--target")
+    list_parser.add_argument("--limit", type=int, default=50)
+    for name in ("replay", "purge"):
+        command = subcommands.add_parser(name)
+        command.add_argument("--target")
+        command.add_argument("--dead-only", action="store_true")
+    args = parser.parse_args(argv)
+
+    outbox = GatewayOutbox(args.path)
+    try:
+        if args.command == "stats":
+            result: Any = outbox.stats()
+        elif args.command == "list":
+            result = outbox.list_entries(args.target, args.limit)
+        elif args.command == "replay":
+            result = {"replayed": outbox.replay(target=args.target, dead_only=args.dead_only)}
+        else:
+            result = {"purged": outbox.purge(target=args.target, dead_only=args.dead_only)}
+        print(json.dumps(result, indent=2))
+    finally:
+        outbox.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,489 @@
+"""Bounded per-target queues between the Gateway reader and webhook forwarders."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable, Collection, Mapping, Sequence
+from dataclasses import asdict, dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORWARD_QUEUE_SIZE = 1000
+DEFAULT_FORWARD_WORKERS_PER_TARGET = 1
+DEFAULT_BATCH_MAX_LATENCY_SECONDS = 0.05
+SPILL_FILE_SUFFIX = ".jsonl"
+SPILL_OFFSET_SUFFIX = ".offset"
+
+
+class OverflowPolicy(StrEnum):
+    """What to do with a new event when a target queue is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+    SPILL = "spill"
+
+    @classmethod
+    def parse(cls, value: str | None, default: OverflowPolicy) -> OverflowPolicy:
+        normalized = (value or "").strip().lower().replace("-", "_")
+        try:
+            return cls(normalized)
+        except ValueError:
+            return default
+
+
+@dataclass(frozen=True)
+class QueuedEvent:
+    """One Gateway packet waiting to be forwarded to one target.
+
+    `body` is the encoded forwarding envelope, shared by every target the
+    packet was routed to. It is not spilled; senders re-encode when it is None.
+    `spill_offset` is set on events read back from a spill file: the file
+    offset just past the event's line.
+    """
+
+    packet: Mapping[str, Any]
+    timestamp_ms: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+    body: bytes | None = None
+    spill_offset: int | None = None
+
+
+@dataclass
+class ForwarderMetrics:
+    """Counters and gauges for one target queue."""
+
+    depth: int = 0
+    spill_depth: int = 0
+    enqueued: int = 0
+    forwarded: int = 0
+    failed: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    batches: int = 0
+    last_lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+
+
+SendEvent = Callable[[QueuedEvent], Awaitable[bool]]
+# Returns how many of the events, from the first on, were delivered.
+SendBatch = Callable[[Sequence[QueuedEvent]], Awaitable[int]]
+
+
+def spill_path_for(spill_dir: Path, spill_key: str) -> Path:
+    return spill_dir / f"{hashlib.sha256(spill_key.encode()).hexdigest()[:16]}{SPILL_FILE_SUFFIX}"
+
+
+def remove_orphaned_spill_files(spill_dir: Path, keep: Collection[Path]) -> list[Path]:
+    """Delete spill files (and their offset files) that no running forwarder owns.
+
+    Returns the removed spill files. Subdirectories, such as per-shard spill
+    directories, are left alone.
+    """
+    if not spill_dir.is_dir():
+        return []
+
+    removed: list[Path] = []
+    for path in spill_dir.iterdir():
+        spill_path = spill_dir / f"{path.name.split('.', 1)[0]}{SPILL_FILE_SUFFIX}"
+        if spill_path in keep or not path.is_file():
+            continue
+        path.unlink(missing_ok=True)
+        if path == spill_path:
+            removed.append(path)
+    return removed
+
+
+def _write_spill_offset(path: Path, offset: int) -> None:
+    staging = path.with_name(f"{path.name}.tmp")
+    staging.write_text(str(offset), encoding="utf-8")
+    staging.replace(path)
+
+
+class TargetForwarder:
+    """Owns one target's bounded queue and the worker tasks draining it.
+
+    The Gateway reader only calls `enqueue`, which never waits on webhook
+    latency unless the overflow policy is `block`. With the default single
+    worker, events reach the target in Gateway order. `spill_key` names the
+    spill file and defaults to `name`; it must differ between forwarders that
+    can run at the same time.
+
+    When `send_batch` is given and more events are already queued behind the
+    one a worker picks up, it keeps collecting for up to
+    `batch_max_latency_seconds` or until it has `batch_max_size`, then
+    delivers them in one call. An event with nothing queued behind it goes
+    straight to `send` without waiting for the latency window.
+
+    Spill file I/O runs on worker threads. Next to the spill file, an offset
+    file records how far events have been delivered; it is updated whenever
+    the workers read more events back and when the forwarder stops, so a
+    restart resumes after the last delivered event. After a crash, at most the
+    events read back since the last update are delivered twice.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        send: SendEvent,
+        max_queue_size: int = DEFAULT_FORWARD_QUEUE_SIZE,
+        workers: int = DEFAULT_FORWARD_WORKERS_PER_TARGET,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        spill_dir: Path | None = None,
+        spill_key: str | None = None,
+        send_batch: SendBatch | None = None,
+        batch_max_size: int = 1,
+        batch_max_latency_seconds: float = DEFAULT_BATCH_MAX_LATENCY_SECONDS,
+    ):
+        if overflow_policy is OverflowPolicy.SPILL and spill_dir is None:
+            raise ValueError("spill_dir is required for the spill overflow policy")
+
+        self.name = name
+        self.overflow_policy = overflow_policy
+        self.metrics = ForwarderMetrics()
+        self._send = send
+        self._send_batch = send_batch if batch_max_size > 1 else None
+        self.batch_max_size = max(1, batch_max_size)
+        self.batch_max_latency_seconds = batch_max_latency_seconds
+        self._queue: asyncio.Queue[QueuedEvent] = asyncio.Queue(maxsize=max_queue_size)
+        self._worker_count = max(1, workers)
+        self._workers: list[asyncio.Task[None]] = []
+        self._spill_path = (
+            spill_path_for(spill_dir, spill_key or name) if spill_dir is not None else None
+        )
+        self._spill_lock = asyncio.Lock()
+        self._spill_loaded: asyncio.Task[None] | None = None
+        # Byte offsets into the spill file: the next line to read back, and
+        # the end of the last event a worker finished with.
+        self._spill_read_offset = 0
+        self._spill_delivered_offset = 0
+        # Events counted in spill_depth whose line is still being appended.
+        self._spill_writes_pending = 0
+        # Events read back from the spill file that workers have not finished.
+        self._spill_outstanding = 0
+
+    @property
+    def spill_path(self) -> Path | None:
+        return self._spill_path
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._workers:
+            return
+
+        if self._spill_path is not None:
+            # Events spilled by a previous run are drained before new ones.
+            self._spill_loaded = asyncio.create_task(self._load_spill())
+
+        self._workers = [
+            asyncio.create_task(self._run_worker(), name=f"gateway-forwarder:{self.name}")
+            for _ in range(self._worker_count)
+        ]
+
+    async def enqueue(self, event: QueuedEvent) -> bool:
+        """Queue an event for delivery. Returns False when this event was dropped."""
+        self.metrics.enqueued += 1
+        if self._spill_loaded is not None:
+            await self._spill_loaded
+
+        # Keep ordering: once events are on disk, newer events follow them there.
+        if self.metrics.spill_depth:
+            return await self._spill(event)
+
+        if not self._queue.full():
+            self._queue.put_nowait(event)
+        elif self.overflow_policy is OverflowPolicy.BLOCK:
+            await self._queue.put(event)
+        elif self.overflow_policy is OverflowPolicy.SPILL:
+            return await self._spill(event)
+        else:
+            with contextlib.suppress(asyncio.QueueEmpty):
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._record_drop()
+            self._queue.put_nowait(event)
+
+        self.metrics.depth = self._queue.qsize()
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued (and spilled) event has been processed."""
+        if self._spill_loaded is not None:
+            await self._spill_loaded
+        while True:
+            await self._queue.join()
+            if not self.metrics.spill_depth:
+                return
+            await asyncio.sleep(0.01)
+
+    async def stop(self, drain_timeout_seconds: float | None = None) -> None:
+        """Stop workers, optionally waiting for queued events to be delivered."""
+        if drain_timeout_seconds:
+            try:
+                await asyncio.wait_for(self.join(), drain_timeout_seconds)
+            except TimeoutError:
+                logger.warning(
+                    "Discord Gateway forwarder stopped with undelivered events",
+                    extra={"depth": self.depth, "target": self.name},
+                )
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._spill_path is not None and (self.metrics.spill_depth or self._spill_outstanding):
+            # Undelivered events stay on disk for the next run.
+            async with self._spill_lock:
+                await asyncio.to_thread(self._save_spill_offset, self._spill_delivered_offset)
+
+    def snapshot(self) -> dict[str, Any]:
+        self.metrics.depth = self._queue.qsize()
+        return {"target": self.name, **asdict(self.metrics)}
+
+    async def _run_worker(self) -> None:
+        if self._spill_loaded is not None:
+            await self._spill_loaded
+        while True:
+            if self._queue.empty() and self.metrics.spill_depth:
+                await self._refill_from_spill()
+                continue
+
+            events = [await self._queue.get()]
+            try:
+                if self._send_batch is not None:
+                    await self._collect_batch(events)
+
+                # Events are FIFO, so the first one has waited the longest.
+                lag = time.monotonic() - events[0].enqueued_at
+                self.metrics.last_lag_seconds = lag
+                self.metrics.max_lag_seconds = max(self.metrics.max_lag_seconds, lag)
+
+                if len(events) > 1 and self._send_batch is not None:
+                    self.metrics.batches += 1
+                    delivered = await self._send_batch(events)
+                else:
+                    delivered = int(await self._send(events[0]))
+
+                self.metrics.forwarded += delivered
+                self.metrics.failed += len(events) - delivered
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.metrics.failed += len(events)
+                logger.exception(
+                    "Discord Gateway forwarder failed to deliver event",
+                    extra={"target": self.name},
+                )
+            finally:
+                for _event in events:
+                    self._queue.task_done()
+                self.metrics.depth = self._queue.qsize()
+            for event in events:
+                if event.spill_offset is not None:
+                    await self._finish_spilled(event.spill_offset)
+
+    async def _collect_batch(self, events: list[QueuedEvent]) -> None:
+        deadline = time.monotonic() + self.batch_max_latency_seconds
+        while len(events) < self.batch_max_size:
+            if self._queue.empty() and self.metrics.spill_depth:
+                await self._refill_from_spill()
+
+            with contextlib.suppress(asyncio.QueueEmpty):
+                events.append(self._queue.get_nowait())
+                continue
+
+            # Only wait out the window for a burst already in progress.
+            if len(events) == 1:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                events.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except TimeoutError:
+                return
+
+    def _record_drop(self) -> None:
+        self.metrics.dropped += 1
+        # Log the first drop and then every 100th to avoid flooding logs in bursts.
+        if self.metrics.dropped % 100 == 1:
+            logger.warning(
+                "Discord Gateway forwarder queue full; dropping oldest events",
+                extra={"dropped": self.metrics.dropped, "target": self.name},
+            )
+
+    async def _load_spill(self) -> None:
+        async with self._spill_lock:
+            try:
+                offset, depth = await asyncio.to_thread(self._read_spill_state)
+            except OSError:
+                logger.exception(
+                    "Discord Gateway forwarder could not read its spill file",
+                    extra={"target": self.name},
+                )
+                return
+            self._spill_read_offset = self._spill_delivered_offset = offset
+            self.metrics.spill_depth += depth
+
+    async def _spill(self, event: QueuedEvent) -> bool:
+        if self._spill_path is None:
+            self._record_drop()
+            return False
+
+        line = json.dumps(
+            {
+                "packet": event.packet,
+                "queued_ms": int((time.monotonic() - event.enqueued_at) * 1000),
+                "timestamp_ms": event.timestamp_ms,
+            },
+            separators=(",", ":"),
+        )
+        # Counted before the write so the next event follows this one to disk.
+        # Workers take the lock to read, so they wait for the line to land.
+        self.metrics.spill_depth += 1
+        self._spill_writes_pending += 1
+        try:
+            async with self._spill_lock:
+                await asyncio.to_thread(self._append_spill, line)
+        except OSError:
+            self.metrics.spill_depth -= 1
+            self._record_drop()
+            logger.exception(
+                "Discord Gateway forwarder could not spill event",
+                extra={"target": self.name},
+            )
+            return False
+        finally:
+            self._spill_writes_pending -= 1
+        self.metrics.spilled += 1
+        return True
+
+    async def _refill_from_spill(self) -> None:
+        async with self._spill_lock:
+            free_slots = self._queue.maxsize - self._queue.qsize()
+            try:
+                events, lines, self._spill_read_offset = await asyncio.to_thread(
+                    self._read_spill,
+                    self._spill_delivered_offset,
+                    self._spill_read_offset,
+                    free_slots,
+                )
+            except FileNotFoundError:
+                events, lines = [], 0
+            self.metrics.spill_depth = max(0, self.metrics.spill_depth - lines)
+            if not lines and not self._spill_writes_pending:
+                # Nothing left to read and no line on its way: the file is
+                # shorter than counted, so stop waiting for the rest.
+                self.metrics.spill_depth = 0
+            self._spill_outstanding += len(events)
+            for event in events:
+                self._queue.put_nowait(event)
+            if not self.metrics.spill_depth and not self._spill_outstanding:
+                await self._clear_spill()
+
+    async def _finish_spilled(self, offset: int) -> None:
+        self._spill_delivered_offset = max(self._spill_delivered_offset, offset)
+        self._spill_outstanding -= 1
+        if self._spill_outstanding or self.metrics.spill_depth:
+            return
+        async with self._spill_lock:
+            # Re-check: an event may have been spilled while waiting for the lock.
+            if not self._spill_outstanding and not self.metrics.spill_depth:
+                await self._clear_spill()
+
+    async def _clear_spill(self) -> None:
+        await asyncio.to_thread(self._remove_spill)
+        self._spill_read_offset = self._spill_delivered_offset = 0
+
+    # The methods below run on worker threads while the spill lock is held.
+
+    def _read_spill_state(self) -> tuple[int, int]:
+        """Return the delivered offset and how many complete events follow it."""
+        assert self._spill_path is not None
+        self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+        offset_path = self._spill_path.with_suffix(SPILL_OFFSET_SUFFIX)
+        if not self._spill_path.exists():
+            offset_path.unlink(missing_ok=True)
+            return 0, 0
+
+        try:
+            offset = int(offset_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            offset = 0
+        with self._spill_path.open("r+b") as spill_file:
+            size = spill_file.seek(0, 2)
+            if not 0 <= offset <= size:
+                offset = 0
+            spill_file.seek(offset)
+            depth = 0
+            end = offset
+            for line in spill_file:
+                if not line.endswith(b"\n"):
+                    break
+                depth += 1
+                end += len(line)
+            # A line cut short by a crash would swallow the next append.
+            if end < size:
+                spill_file.truncate(end)
+        return offset, depth
+
+    def _append_spill(self, line: str) -> None:
+        assert self._spill_path is not None
+        self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._spill_path.open("a", encoding="utf-8") as spill_file:
+            spill_file.write(line + "\n")
+
+    def _read_spill(
+        self, delivered_offset: int, read_offset: int, limit: int
+    ) -> tuple[list[QueuedEvent], int, int]:
+        """Record `delivered_offset`, then read up to `limit` lines after `read_offset`.
+
+        Returns the decoded events, the number of lines consumed (malformed
+        ones included) and the new read offset.
+        """
+        assert self._spill_path is not None
+        events: list[QueuedEvent] = []
+        lines = 0
+        with self._spill_path.open("rb") as spill_file:
+            spill_file.seek(read_offset)
+            while lines < limit:
+                line = spill_file.readline()
+                if not line.endswith(b"\n"):
+                    break
+                lines += 1
+                read_offset = spill_file.tell()
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                events.append(
+                    QueuedEvent(
+                        packet=record["packet"],
+                        timestamp_ms=record["timestamp_ms"],
+                        enqueued_at=time.monotonic() - record.get("queued_ms", 0) / 1000,
+                        spill_offset=read_offset,
+                    )
+                )
+        self._save_spill_offset(delivered_offset)
+        return events, lines, read_offset
+
+    def _save_spill_offset(self, offset: int) -> None:
+        assert self._spill_path is not None
+        if self._spill_path.exists():
+            _write_spill_offset(self._spill_path.with_suffix(SPILL_OFFSET_SUFFIX), offset)
+
+    def _remove_spill(self) -> None:
+        assert self._spill_path is not None
+        self._spill_path.unlink(missing_ok=True)
+        self._spill_path.with_suffix(SPILL_OFFSET_SUFFIX).unlink(missing_ok=True)
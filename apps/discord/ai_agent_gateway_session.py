@@ -0,0 +1,114 @@
+"""Discord Gateway session state used to RESUME instead of re-IDENTIFYing."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Close codes after which reconnecting cannot succeed without operator action.
+FATAL_CLOSE_CODES = frozenset(
+    {
+        4004,  # Authentication failed
+        4010,  # Invalid shard
+        4011,  # Sharding required
+        4012,  # Invalid API version
+        4013,  # Invalid intent(s)
+        4014,  # Disallowed intent(s)
+    }
+)
+# Close codes after which the session cannot be resumed and must IDENTIFY again.
+SESSION_INVALIDATING_CLOSE_CODES = frozenset(
+    {
+        4007,  # Invalid seq
+        4009,  # Session timed out
+    }
+)
+# Closing with 1000/1001 invalidates the session; any 4xxx code keeps it resumable.
+RESUMABLE_CLOSE_CODE = 4000
+
+
+class GatewayFatalCloseError(RuntimeError):
+    """Discord closed the Gateway with a code that retrying will not fix."""
+
+    def __init__(self, code: int):
+        super().__init__(f"Discord Gateway closed the connection with fatal code {code}")
+        self.code = code
+
+
+@dataclass
+class GatewaySessionState:
+    """The pieces of a Gateway session needed to send op 6 RESUME."""
+
+    session_id: str | None = None
+    resume_gateway_url: str | None = None
+    sequence: int | None = None
+
+    @property
+    def resumable(self) -> bool:
+        return bool(self.session_id and self.resume_gateway_url and self.sequence is not None)
+
+    def resume_url(self, gateway_url: str) -> str:
+        """`resume_gateway_url` with the query string (version, encoding) of `gateway_url`."""
+        base = (self.resume_gateway_url or gateway_url).rstrip("/")
+        query = urlsplit(gateway_url).query
+        return f"{base}/?{query}" if query else base
+
+    def clear(self) -> None:
+        self.session_id = None
+        self.resume_gateway_url = None
+        self.sequence = None
+
+
+def load_session_state(path: Path | None) -> GatewaySessionState:
+    """Read persisted session state, returning an empty state when unavailable."""
+    if path is None:
+        return GatewaySessionState()
+
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return GatewaySessionState()
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable Discord Gateway session state", extra={"path": path})
+        return GatewaySessionState()
+
+    if not isinstance(payload, dict):
+        return GatewaySessionState()
+
+    session_id = payload.get("session_id")
+    resume_gateway_url = payload.get("resume_gateway_url")
+    sequence = payload.get("sequence")
+    return GatewaySessionState(
+        session_id=session_id if isinstance(session_id, str) else None,
+        resume_gateway_url=resume_gateway_url if isinstance(resume_gateway_url, str) else None,
+        sequence=sequence if isinstance(sequence, int) else None,
+    )
+
+
+def save_session_state(path: Path | None, state: GatewaySessionState) -> None:
+    """Atomically persist session state so a restarted process can RESUME."""
+    if path is None:
+        return
+
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path.write_text(json.dumps(asdict(state)), encoding="utf-8")
+        temporary_path.replace(path)
+    except OSError:
+        logger.exception("Failed to persist Discord Gateway session state", extra={"path": path})
+        with contextlib.suppress(OSError):
+            temporary_path.unlink()
+
+
+def reconnect_delay_seconds(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(maximum, base * 2**attempt)]."""
+    ceiling = min(maximum, base * 2 ** max(0, attempt))
+    return random.uniform(0, ceiling)  # noqa: S311 - jitter, not security sensitive
@@ -0,0 +1,167 @@
+"""Shard planning and IDENTIFY rate limiting for the Discord Gateway watcher."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DISCORD_GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+# Discord allows `max_concurrency` IDENTIFYs per 5 seconds, one per rate-limit
+# bucket, where a shard's bucket is `shard_id % max_concurrency`.
+IDENTIFY_INTERVAL_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+    """Which shards this process runs, out of how many, and IDENTIFY concurrency."""
+
+    shard_count: int
+    shard_ids: tuple[int, ...]
+    max_concurrency: int = 1
+
+    @property
+    def sharded(self) -> bool:
+        return self.shard_count > 1 or self.shard_ids != (0,)
+
+
+def parse_shard_ids(value: str | None) -> tuple[int, ...] | None:
+    """Parse shard ids such as `0,1,4-7`. Returns None when unset."""
+    ids: set[int] = set()
+    for raw_entry in (value or "").replace("\n", ",").split(","):
+        entry = raw_entry.strip()
+        if not entry:
+            continue
+        start, _, end = entry.partition("-")
+        first = int(start)
+        last = int(end) if end else first
+        if first < 0 or last < first:
+            raise ValueError(f"Invalid Discord shard id range: {entry}")
+        ids.update(range(first, last + 1))
+    return tuple(sorted(ids)) or None
+
+
+async def fetch_gateway_bot(*, bot_token: str, session: Any) -> dict[str, Any]:
+    """GET /gateway/bot: recommended shard count and session start limits."""
+    async with session.get(
+        DISCORD_GATEWAY_BOT_URL,
+        headers={"Authorization": f"Bot {bot_token}"},
+    ) as response:
+        if not 200 <= response.status < 300:
+            raise RuntimeError(
+                f"Failed to fetch Discord Gateway bot info: {response.status} "
+                f"{await response.text()}"
+            )
+        payload = await response.json()
+    return payload if isinstance(payload, dict) else {}
+
+
+async def resolve_shard_plan(
+    *,
+    bot_token: str,
+    session: Any,
+    shard_count: int | None = None,
+    shard_ids: tuple[int, ...] | None = None,
+) -> ShardPlan:
+    """Combine configured shards with Discord's recommendation from /gateway/bot.
+
+    An unset `shard_count` uses Discord's recommended count; unset `shard_ids`
+    runs every shard in this process. If /gateway/bot is unreachable the
+    configured values (or a single shard) are used with max_concurrency 1.
+    """
+    info: dict[str, Any] = {}
+    try:
+        info = await fetch_gateway_bot(bot_token=bot_token, session=session)
+    except Exception:
+        logger.exception("Could not fetch Discord Gateway bot info; using configured shards")
+
+    limits = info.get("session_start_limit")
+    max_concurrency = limits.get("max_concurrency") if isinstance(limits, dict) else None
+    recommended = info.get("shards")
+    count = shard_count or (recommended if isinstance(recommended, int) else None) or 1
+    ids = shard_ids or tuple(range(count))
+
+    if any(shard_id >= count for shard_id in ids):
+        raise ValueError(f"Discord shard ids {ids} must be below the shard count {count}")
+
+    return ShardPlan(
+        shard_count=count,
+        shard_ids=ids,
+        max_concurrency=max_concurrency if isinstance(max_concurrency, int) else 1,
+    )
+
+
+class IdentifyLimiter:
+    """Spaces IDENTIFYs per rate-limit bucket across shards.
+
+    Shards in one process share an instance. Processes on the same host can
+    share `lock_dir`: each bucket then has a lock file holding the last
+    IDENTIFY time, so separately launched shard groups do not exceed the limit
+    together. `flock` only coordinates one host; shard groups on different
+    hosts need an external coordinator or staggered start-up.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        *,
+        interval_seconds: float = IDENTIFY_INTERVAL_SECONDS,
+        lock_dir: Path | None = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.interval_seconds = interval_seconds
+        self.lock_dir = lock_dir
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._last_identify: dict[int, float] = {}
+
+    def bucket(self, shard_id: int) -> int:
+        return shard_id % self.max_concurrency
+
+    async def wait(self, shard_id: int = 0) -> None:
+        """Block until this shard may IDENTIFY, and claim the slot."""
+        bucket = self.bucket(shard_id)
+        async with self._locks.setdefault(bucket, asyncio.Lock()):
+            if self.lock_dir is None:
+                last_identify = self._last_identify.get(bucket)
+                if last_identify is not None:
+                    ready_at = last_identify + self.interval_seconds
+                    await asyncio.sleep(max(0.0, ready_at - time.monotonic()))
+                self._last_identify[bucket] = time.monotonic()
+                return
+
+            await asyncio.to_thread(self._wait_with_lock_file, bucket)
+
+    def _wait_with_lock_file(self, bucket: int) -> None:
+        with self._bucket_file(bucket) as lock_file:
+            lock_file.seek(0)
+            try:
+                last_identify = float(lock_file.read().strip() or 0)
+            except ValueError:
+                last_identify = 0.0
+            time.sleep(max(0.0, last_identify + self.interval_seconds - time.time()))
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(str(time.time()))
+            lock_file.flush()
+
+    @contextlib.contextmanager
+    def _bucket_file(self, bucket: int) -> Iterator[Any]:
+        if self.lock_dir is None:
+            raise ValueError("lock_dir is required for cross-process IDENTIFY limiting")
+
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        path = self.lock_dir / f"identify-{self.max_concurrency}-{bucket}.lock"
+        with path.open("a+", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield lock_file
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
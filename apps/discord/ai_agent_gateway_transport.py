@@ -0,0 +1,56 @@
+"""Discord Gateway transport helpers: URL options and zlib-stream decompression."""
+
+from __future__ import annotations
+
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+ZLIB_STREAM = "zlib-stream"
+# Every complete zlib-stream message ends with a Z_SYNC_FLUSH marker.
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+
+def with_transport_compression(url: str, compression: str | None) -> str:
+    """Set (or remove) the `compress` query parameter on a Gateway URL."""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != "compress"]
+    if compression:
+        query.append(("compress", compression))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class GatewayFrameDecoder:
+    """Turns websocket messages into complete JSON text frames.
+
+    With zlib-stream, Discord compresses the whole connection as one zlib
+    stream, so one decompressor must live for the connection's lifetime and
+    binary messages are buffered until the sync-flush suffix arrives. Create a
+    new decoder for every connection (including resumes).
+    """
+
+    def __init__(self, compression: str | None = None):
+        self.compression = compression
+        self._inflator = zlib.decompressobj() if compression == ZLIB_STREAM else None
+        self._buffer = bytearray()
+        self.compressed_bytes = 0
+        self.decompressed_bytes = 0
+
+    def feed(self, data: str | bytes) -> str | None:
+        """Return the decoded frame, or None while a compressed frame is incomplete."""
+        if isinstance(data, str):
+            self.decompressed_bytes += len(data)
+            return data
+
+        if self._inflator is None:
+            self.decompressed_bytes += len(data)
+            return data.decode()
+
+        self.compressed_bytes += len(data)
+        self._buffer.extend(data)
+        if len(data) < len(ZLIB_SUFFIX) or data[-len(ZLIB_SUFFIX) :] != ZLIB_SUFFIX:
+            return None
+
+        frame = self._inflator.decompress(self._buffer)
+        self._buffer.clear()
+        self.decompressed_bytes += len(frame)
+        return frame.decode()
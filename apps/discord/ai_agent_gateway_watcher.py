@@ -3,28 +3,83 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
 import os
+import random
+import tempfile
 import time
-from collections.abc import Mapping, Sequence
-from dataclasses import dataclass
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any
 from urllib.parse import urlencode
 
 import aiohttp
 
+from ai_agent_gateway_codec import AUTO_CODEC, DEFAULT_CODEC, JsonCodec, resolve_codec
+from ai_agent_gateway_events import (
+    ALL_FORWARDED_INTENTS,
+    DEFAULT_FORWARDED_EVENT_TYPES,
+    GatewayEventFilter,
+    parse_event_types,
+    peek_dispatch,
+)
+from ai_agent_gateway_metrics import (
+    DEFAULT_METRICS_HOST,
+    DEFAULT_METRICS_LOG_INTERVAL_SECONDS,
+    GatewayMetrics,
+    log_metrics_forever,
+    start_metrics_server,
+)
+from ai_agent_gateway_outbox import (
+    DEFAULT_OUTBOX_MAX_AGE_SECONDS,
+    DEFAULT_OUTBOX_MAX_ATTEMPTS,
+    DEFAULT_OUTBOX_MAX_ROWS,
+    DEFAULT_OUTBOX_PATH,
+    GatewayOutbox,
+    OutboxEntry,
+)
+from ai_agent_gateway_queue import (
+    DEFAULT_BATCH_MAX_LATENCY_SECONDS,
+    DEFAULT_FORWARD_QUEUE_SIZE,
+    DEFAULT_FORWARD_WORKERS_PER_TARGET,
+    OverflowPolicy,
+    QueuedEvent,
+    SendBatch,
+    SendEvent,
+    TargetForwarder,
+    remove_orphaned_spill_files,
+)
+from ai_agent_gateway_session import (
+    FATAL_CLOSE_CODES,
+    RESUMABLE_CLOSE_CODE,
+    SESSION_INVALIDATING_CLOSE_CODES,
+    GatewayFatalCloseError,
+    load_session_state,
+    reconnect_delay_seconds,
+    save_session_state,
+)
+from ai_agent_gateway_shards import IdentifyLimiter, parse_shard_ids, resolve_shard_plan
+from ai_agent_gateway_transport import (
+    ZLIB_STREAM,
+    GatewayFrameDecoder,
+    with_transport_compression,
+)
+
 logger = logging.getLogger(__name__)
 
 DISCORD_GATEWAY_URL = "wss://gateway.discord.gg/?v=10&encoding=json"
 WATCHER_CONFIG_PATH = "/api/v1/infrastructure/ai-agents/discord-gateway/watcher-config"
-DISCORD_GATEWAY_INTENTS = (
-    1  # Guilds
-    | 512  # GuildMessages
-    | 1024  # GuildMessageReactions
-    | 4096  # DirectMessages
-    | 8192  # DirectMessageReactions
-    | 32768  # MessageContent
-)
+DISCORD_GATEWAY_INTENTS = ALL_FORWARDED_INTENTS
+DEFAULT_FORWARD_TIMEOUT_SECONDS = 10.0
+DEFAULT_MAX_IN_FLIGHT_FORWARDS = 64
+# The apps/web batch webhook route rejects larger batches.
+MAX_BATCH_EVENTS = 100
+DEFAULT_RECONNECT_DELAY_SECONDS = 1.0
+DEFAULT_TARGET_REFRESH_INTERVAL_SECONDS = 30.0
+DEFAULT_MAX_RECONNECT_DELAY_SECONDS = 60.0
+DEFAULT_SPILL_DIR = Path(tempfile.gettempdir()) / "tuturuuu-ai-agent-gateway-spill"
 
 
 def _split_urls(value: str | None) -> tuple[str, ...]:
@@ -33,6 +88,22 @@ def _split_urls(value: str | None) -> tuple[str, ...]:
     )
 
 
+def _positive_float(value: str | None, default: float) -> float:
+    try:
+        parsed = float((value or "").strip())
+    except ValueError:
+        return default
+    return parsed if parsed > 0 else default
+
+
+def _positive_int(value: str | None, default: int) -> int:
+    try:
+        parsed = int((value or "").strip())
+    except ValueError:
+        return default
+    return parsed if parsed > 0 else default
+
+
 def _normalize_platform_url(value: str | None) -> str | None:
     normalized = (value or "").strip().rstrip("/")
     if not normalized:
@@ -52,9 +123,40 @@ class WatcherConfig:
     webhook_urls: tuple[str, ...] = ()
     gateway_url: str = DISCORD_GATEWAY_URL
     platform_url: str | None = None
-    reconnect_delay_seconds: float = 5.0
+    reconnect_delay_seconds: float = DEFAULT_RECONNECT_DELAY_SECONDS
+    max_reconnect_delay_seconds: float = DEFAULT_MAX_RECONNECT_DELAY_SECONDS
     target_channel_id: str | None = None
     watcher_secret: str | None = None
+    forward_timeout_seconds: float = DEFAULT_FORWARD_TIMEOUT_SECONDS
+    max_in_flight_forwards: int = DEFAULT_MAX_IN_FLIGHT_FORWARDS
+    forward_queue_size: int = DEFAULT_FORWARD_QUEUE_SIZE
+    forward_workers_per_target: int = DEFAULT_FORWARD_WORKERS_PER_TARGET
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    spill_dir: Path = field(default=DEFAULT_SPILL_DIR)
+    session_state_path: Path | None = None
+    event_allowlist: frozenset[str] | None = DEFAULT_FORWARDED_EVENT_TYPES
+    event_denylist: frozenset[str] = frozenset()
+    transport_compression: str | None = None
+    shard_count: int | None = None
+    shard_ids: tuple[int, ...] | None = None
+    identify_lock_dir: Path | None = None
+    batch_max_events: int = 1
+    batch_max_latency_seconds: float = DEFAULT_BATCH_MAX_LATENCY_SECONDS
+    outbox_path: Path | None = None
+    outbox_max_rows: int = DEFAULT_OUTBOX_MAX_ROWS
+    outbox_max_age_seconds: float = DEFAULT_OUTBOX_MAX_AGE_SECONDS
+    outbox_max_attempts: int = DEFAULT_OUTBOX_MAX_ATTEMPTS
+    outbox_poll_interval_seconds: float = 1.0
+    outbox_retention_interval_seconds: float = 60.0
+    target_refresh_interval_seconds: float = DEFAULT_TARGET_REFRESH_INTERVAL_SECONDS
+    metrics_host: str = DEFAULT_METRICS_HOST
+    metrics_port: int | None = None
+    metrics_log_interval_seconds: float = DEFAULT_METRICS_LOG_INTERVAL_SECONDS
+    json_codec: str = AUTO_CODEC
+
+    @property
+    def event_filter(self) -> GatewayEventFilter:
+        return GatewayEventFilter(allowlist=self.event_allowlist, denylist=self.event_denylist)
 
     @property
     def webhook_url(self) -> str:
@@ -90,11 +192,102 @@ class WatcherConfig:
                 "DISCORD_AI_AGENT_GATEWAY_WATCHER_SECRET is required"
             )
 
+        spill_dir = (values.get("DISCORD_AI_AGENT_GATEWAY_SPILL_DIR") or "").strip()
+        event_allowlist = values.get("DISCORD_AI_AGENT_GATEWAY_EVENT_ALLOWLIST")
+        compression = (values.get("DISCORD_AI_AGENT_GATEWAY_COMPRESSION") or "").strip().lower()
+        identify_lock_dir = (values.get("DISCORD_AI_AGENT_GATEWAY_IDENTIFY_LOCK_DIR") or "").strip()
+        shard_count = values.get("DISCORD_AI_AGENT_GATEWAY_SHARD_COUNT")
+        outbox_path = (values.get("DISCORD_AI_AGENT_GATEWAY_OUTBOX_PATH") or "").strip()
+        session_state_path = (
+            values.get("DISCORD_AI_AGENT_GATEWAY_SESSION_STATE_PATH") or ""
+        ).strip()
+
         return cls(
+            batch_max_events=min(
+                _positive_int(values.get("DISCORD_AI_AGENT_GATEWAY_BATCH_MAX_EVENTS"), 1),
+                MAX_BATCH_EVENTS,
+            ),
+            batch_max_latency_seconds=_positive_float(
+                values.get("DISCORD_AI_AGENT_GATEWAY_BATCH_MAX_LATENCY_MS"),
+                DEFAULT_BATCH_MAX_LATENCY_SECONDS * 1000,
+            )
+            / 1000,
             bot_token=bot_token,
+            event_allowlist=parse_event_types(event_allowlist)
+            if (event_allowlist or "").strip()
+            else DEFAULT_FORWARDED_EVENT_TYPES,
+            event_denylist=parse_event_types(values.get("DISCORD_AI_AGENT_GATEWAY_EVENT_DENYLIST"))
+            or frozenset(),
+            forward_queue_size=_positive_int(
+                values.get("DISCORD_AI_AGENT_GATEWAY_FORWARD_QUEUE_SIZE"),
+                DEFAULT_FORWARD_QUEUE_SIZE,
+            ),
+            forward_timeout_seconds=_positive_float(
+                values.get("DISCORD_AI_AGENT_GATEWAY_FORWARD_TIMEOUT_SECONDS"),
+                DEFAULT_FORWARD_TIMEOUT_SECONDS,
+            ),
+            forward_workers_per_target=_positive_int(
+                values.get("DISCORD_AI_AGENT_GATEWAY_FORWARD_WORKERS_PER_TARGET"),
+                DEFAULT_FORWARD_WORKERS_PER_TARGET,
+            ),
             gateway_url=(values.get("DISCORD_AI_AGENT_GATEWAY_URL") or "").strip()
             or DISCORD_GATEWAY_URL,
+            identify_lock_dir=Path(identify_lock_dir) if identify_lock_dir else None,
+            json_codec=(values.get("DISCORD_AI_AGENT_GATEWAY_JSON_CODEC") or "").strip()
+            or AUTO_CODEC,
+            max_in_flight_forwards=_positive_int(
+                values.get("DISCORD_AI_AGENT_GATEWAY_MAX_IN_FLIGHT_FORWARDS"),
+                DEFAULT_MAX_IN_FLIGHT_FORWARDS,
+            ),
+            metrics_host=(values.get("DISCORD_AI_AGENT_GATEWAY_METRICS_HOST") or "").strip()
+            or DEFAULT_METRICS_HOST,
+            metrics_log_interval_seconds=_positive_float(
+                values.get("DISCORD_AI_AGENT_GATEWAY_METRICS_LOG_INTERVAL_SECONDS"),
+                DEFAULT_METRICS_LOG_INTERVAL_SECONDS,
+            ),
+            metrics_port=_positive_int(values.get("DISCORD_AI_AGENT_GATEWAY_METRICS_PORT"), 0)
+            or None,
+            max_reconnect_delay_seconds=_positive_float(
+                values.get("DISCORD_AI_AGENT_GATEWAY_MAX_RECONNECT_DELAY_SECONDS"),
+                DEFAULT_MAX_RECONNECT_DELAY_SECONDS,
+            ),
+            outbox_max_age_seconds=_positive_float(
+                values.get("DISCORD_AI_AGENT_GATEWAY_OUTBOX_MAX_AGE_SECONDS"),
+                DEFAULT_OUTBOX_MAX_AGE_SECONDS,
+            ),
+            outbox_max_attempts=_positive_int(
+                values.get("DISCORD_AI_AGENT_GATEWAY_OUTBOX_MAX_ATTEMPTS"),
+                DEFAULT_OUTBOX_MAX_ATTEMPTS,
+            ),
+            outbox_max_rows=_positive_int(
+                values.get("DISCORD_AI_AGENT_GATEWAY_OUTBOX_MAX_ROWS"),
+                DEFAULT_OUTBOX_MAX_ROWS,
+            ),
+            # The outbox is on by default; "off" disables it.
+            outbox_path=None
+            if outbox_path.lower() in {"off", "false", "0", "none"}
+            else Path(outbox_path or DEFAULT_OUTBOX_PATH),
+            overflow_policy=OverflowPolicy.parse(
+                values.get("DISCORD_AI_AGENT_GATEWAY_QUEUE_OVERFLOW_POLICY"),
+                OverflowPolicy.DROP_OLDEST,
+            ),
             platform_url=platform_url,
+            reconnect_delay_seconds=_positive_float(
+                values.get("DISCORD_AI_AGENT_GATEWAY_RECONNECT_DELAY_SECONDS"),
+                DEFAULT_RECONNECT_DELAY_SECONDS,
+            ),
+            session_state_path=Path(session_state_path) if session_state_path else None,
+            # "auto" (or unset) uses the count recommended by /gateway/bot.
+            shard_count=_positive_int(shard_count, 0) or None,
+            shard_ids=parse_shard_ids(values.get("DISCORD_AI_AGENT_GATEWAY_SHARD_IDS")),
+            spill_dir=Path(spill_dir) if spill_dir else DEFAULT_SPILL_DIR,
+            target_refresh_interval_seconds=_positive_float(
+                values.get("DISCORD_AI_AGENT_GATEWAY_TARGET_REFRESH_SECONDS"),
+                DEFAULT_TARGET_REFRESH_INTERVAL_SECONDS,
+            ),
+            transport_compression=ZLIB_STREAM
+            if compression.replace("_", "-") in {ZLIB_STREAM, "zlib", "true", "1"}
+            else None,
             target_channel_id=target_channel_id,
             watcher_secret=watcher_secret,
             webhook_urls=webhook_urls,
@@ -114,11 +307,16 @@ class WatcherConfig:
 
 @dataclass(frozen=True)
 class WatcherTarget:
-    """apps/web AI-agent webhook target with optional Discord scope metadata."""
+    """apps/web AI-agent webhook target with optional Discord scope metadata.
+
+    `batch_webhook_url` is set when the target advertises an endpoint that
+    accepts `GATEWAY_BATCH` envelopes.
+    """
 
     webhook_url: str
     discord_guild_id: str | None = None
     external_channel_id: str | None = None
+    batch_webhook_url: str | None = None
 
 
 def build_forwarded_gateway_event(
@@ -137,6 +335,26 @@ def build_forwarded_gateway_event(
     }
 
 
+def build_forwarded_gateway_batch(
+    packets: Sequence[tuple[Mapping[str, Any], int | None]],
+) -> dict[str, Any] | None:
+    """Wrap several `(packet, timestamp_ms)` pairs into one batch envelope."""
+
+    events = [
+        event
+        for packet, timestamp_ms in packets
+        if (event := build_forwarded_gateway_event(packet, timestamp_ms=timestamp_ms))
+    ]
+    if not events:
+        return None
+
+    return {
+        "events": events,
+        "timestamp": int(time.time() * 1000),
+        "type": "GATEWAY_BATCH",
+    }
+
+
 def _string_value(value: Any) -> str | None:
     return value.strip() if isinstance(value, str) and value.strip() else None
 
@@ -174,6 +392,101 @@ def gateway_packet_matches_target(packet: Mapping[str, Any], target: WatcherTarg
     )
 
 
+class TargetRoutingIndex:
+    """Targets compiled into guild/channel lookups so routing does not scan every target.
+
+    Channel-scoped targets are keyed by channel id (matched against the packet's
+    `channel_id` and thread `parent_id`), guild-only targets by guild id, and
+    unscoped targets always match. Routing cost depends on the packet, not on
+    how many targets are deployed. Results agree with
+    `gateway_packet_matches_target`.
+    """
+
+    def __init__(self, targets: Sequence[WatcherTarget]):
+        self.targets = tuple(dict.fromkeys(targets))
+        self._wildcard: tuple[WatcherTarget, ...] = tuple(
+            target
+            for target in self.targets
+            if not target.discord_guild_id and not target.external_channel_id
+        )
+        self._by_guild: dict[str, list[WatcherTarget]] = {}
+        self._by_channel: dict[str, list[WatcherTarget]] = {}
+        for target in self.targets:
+            if target.external_channel_id:
+                self._by_channel.setdefault(target.external_channel_id, []).append(target)
+            elif target.discord_guild_id:
+                self._by_guild.setdefault(target.discord_guild_id, []).append(target)
+
+    def route(self, packet: Mapping[str, Any]) -> tuple[WatcherTarget, ...]:
+        """Targets that should receive `packet`: unscoped, guild-scoped, then channel-scoped."""
+        data = packet.get("d")
+        if not isinstance(data, Mapping) or not (self._by_guild or self._by_channel):
+            return self._wildcard
+
+        guild_id = _string_value(data.get("guild_id"))
+        matched: list[WatcherTarget] = list(self._wildcard)
+        if guild_id:
+            matched.extend(self._by_guild.get(guild_id, ()))
+
+        if self._by_channel:
+            channel_id = _string_value(data.get("channel_id"))
+            thread = data.get("thread")
+            parent_id = (
+                _string_value(thread.get("parent_id")) if isinstance(thread, Mapping) else None
+            )
+            for key in (channel_id, parent_id):
+                if key is None:
+                    continue
+                matched.extend(
+                    target
+                    for target in self._by_channel.get(key, ())
+                    if not target.discord_guild_id or target.discord_guild_id == guild_id
+                )
+
+        if len(matched) > 1:
+            # A thread whose id and parent both map to the same target counts once.
+            return tuple(dict.fromkeys(matched))
+        return tuple(matched)
+
+
+def _forward_headers(bot_token: str) -> dict[str, str]:
+    return {
+        "Content-Type": "application/json",
+        "x-discord-gateway-token": bot_token,
+    }
+
+
+async def post_gateway_envelope(
+    *,
+    bot_token: str,
+    envelope: Mapping[str, Any],
+    session: Any,
+    webhook_url: str,
+    body: bytes | None = None,
+) -> int:
+    """POST one forwarding envelope and return the HTTP status, logging failures.
+
+    `body` is the envelope already encoded; callers posting the same envelope
+    to several targets pass it so the envelope is serialised only once.
+    """
+
+    async with session.post(
+        webhook_url,
+        headers=_forward_headers(bot_token),
+        data=DEFAULT_CODEC.dumps(envelope) if body is None else body,
+    ) as response:
+        if not 200 <= response.status < 300:
+            logger.error(
+                "Failed to forward Discord Gateway event",
+                extra={
+                    "event_type": envelope.get("type"),
+                    "response": await response.text(),
+                    "status": response.status,
+                },
+            )
+        return response.status
+
+
 async def forward_gateway_packet(
     *,
     bot_token: str,
@@ -181,6 +494,7 @@ async def forward_gateway_packet(
     session: Any,
     webhook_url: str,
     timestamp_ms: int | None = None,
+    body: bytes | None = None,
 ) -> bool:
     """Forward one raw Discord Gateway packet to the apps/web AI-agent webhook."""
 
@@ -188,26 +502,52 @@ async def forward_gateway_packet(
     if event is None:
         return False
 
+    status = await post_gateway_envelope(
+        body=body, bot_token=bot_token, envelope=event, session=session, webhook_url=webhook_url
+    )
+    return 200 <= status < 300
+
+
+async def forward_gateway_batch(
+    *,
+    bot_token: str,
+    packets: Sequence[tuple[Mapping[str, Any], int | None]],
+    session: Any,
+    webhook_url: str,
+    codec: JsonCodec = DEFAULT_CODEC,
+) -> int:
+    """Forward several Gateway packets to an apps/web batch webhook in one POST.
+
+    Returns how many events, from the first on, apps/web delivered. The batch
+    route stops at the first event it cannot deliver and reports how many
+    came before it, so only the rest need another attempt.
+    """
+
+    batch = build_forwarded_gateway_batch(packets)
+    if batch is None:
+        return 0
+
     async with session.post(
         webhook_url,
-        headers={
-            "Content-Type": "application/json",
-            "x-discord-gateway-token": bot_token,
-        },
-        json=event,
+        headers=_forward_headers(bot_token),
+        data=codec.dumps(batch),
     ) as response:
         if 200 <= response.status < 300:
-            return True
+            return len(batch["events"])
 
+        text = await response.text()
         logger.error(
-            "Failed to forward Discord Gateway event",
-            extra={
-                "event_type": event["type"],
-                "response": await response.text(),
-                "status": response.status,
-            },
+            "Failed to forward Discord Gateway batch",
+            extra={"events": len(batch["events"]), "response": text, "status": response.status},
         )
-        return False
+
+    try:
+        delivered = codec.loads(text).get("delivered")
+    except (AttributeError, ValueError):
+        return 0
+    if not isinstance(delivered, int) or isinstance(delivered, bool):
+        return 0
+    return min(max(delivered, 0), len(batch["events"]))
 
 
 async def resolve_watcher_webhook_urls(
@@ -228,16 +568,38 @@ async def resolve_watcher_targets(
 ) -> tuple[WatcherTarget, ...]:
     """Resolve apps/web webhook targets for root-internal deployed Discord channels."""
 
+    targets, _etag = await fetch_watcher_targets(config=config, session=session)
+    if targets is None:
+        raise RuntimeError("Discord Gateway watcher configuration was not returned")
+    return targets
+
+
+async def fetch_watcher_targets(
+    *,
+    config: WatcherConfig,
+    session: Any,
+    etag: str | None = None,
+) -> tuple[tuple[WatcherTarget, ...] | None, str | None]:
+    """Fetch watcher targets with a conditional GET.
+
+    Returns `(targets, etag)`; `targets` is None when apps/web answers
+    304 Not Modified for the given `etag`.
+    """
+
     if config.webhook_urls:
-        return tuple(WatcherTarget(webhook_url=url) for url in config.webhook_urls)
+        return tuple(WatcherTarget(webhook_url=url) for url in config.webhook_urls), None
 
     if not config.watcher_secret:
         raise ValueError("DISCORD_AI_AGENT_GATEWAY_WATCHER_SECRET is required")
 
-    async with session.get(
-        config.watcher_config_url(),
-        headers={"Authorization": f"Bearer {config.watcher_secret}"},
-    ) as response:
+    headers = {"Authorization": f"Bearer {config.watcher_secret}"}
+    if etag:
+        headers["If-None-Match"] = etag
+
+    async with session.get(config.watcher_config_url(), headers=headers) as response:
+        if response.status == 304:
+            return None, etag
+
         if not 200 <= response.status < 300:
             raise RuntimeError(
                 "Failed to resolve Discord Gateway watcher configuration: "
@@ -245,10 +607,12 @@ async def resolve_watcher_targets(
             )
 
         payload = await response.json()
+        response_etag = response.headers.get("ETag")
 
     targets = payload.get("targets") if isinstance(payload, dict) else None
     watcher_targets = tuple(
         WatcherTarget(
+            batch_webhook_url=_string_value(target.get("batchWebhookUrl")),
             discord_guild_id=target.get("discordGuildId"),
             external_channel_id=target.get("externalChannelId"),
             webhook_url=target["webhookUrl"],
@@ -263,7 +627,68 @@ async def resolve_watcher_targets(
     if not watcher_targets:
         raise RuntimeError("Discord Gateway watcher configuration did not return webhook targets")
 
-    return watcher_targets
+    return watcher_targets, response_etag
+
+
+async def _forward_gateway_packet_with_limits(
+    *,
+    bot_token: str,
+    packet: Mapping[str, Any],
+    session: Any,
+    target: WatcherTarget,
+    timestamp_ms: int | None,
+    timeout_seconds: float | None,
+    semaphore: asyncio.Semaphore | None,
+    body: bytes | None = None,
+) -> bool:
+    async def forward() -> bool:
+        return await forward_gateway_packet(
+            body=body,
+            bot_token=bot_token,
+            packet=packet,
+            session=session,
+            webhook_url=target.webhook_url,
+            timestamp_ms=timestamp_ms,
+        )
+
+    return await _run_with_forward_limits(
+        forward,
+        event_type=packet.get("t"),
+        webhook_url=target.webhook_url,
+        timeout_seconds=timeout_seconds,
+        semaphore=semaphore,
+    )
+
+
+async def _run_with_forward_limits(
+    forward: Callable[[], Awaitable[bool]],
+    *,
+    event_type: Any,
+    webhook_url: str,
+    timeout_seconds: float | None,
+    semaphore: asyncio.Semaphore | None,
+) -> bool:
+    try:
+        if semaphore is None:
+            return await asyncio.wait_for(forward(), timeout_seconds)
+
+        async with semaphore:
+            return await asyncio.wait_for(forward(), timeout_seconds)
+    except TimeoutError:
+        logger.error(
+            "Timed out forwarding Discord Gateway event",
+            extra={
+                "event_type": event_type,
+                "timeout_seconds": timeout_seconds,
+                "webhook_url": webhook_url,
+            },
+        )
+    except aiohttp.ClientError:
+        logger.exception(
+            "Failed to forward Discord Gateway event",
+            extra={"event_type": event_type, "webhook_url": webhook_url},
+        )
+    return False
 
 
 async def forward_gateway_packet_to_targets(
@@ -274,92 +699,145 @@ async def forward_gateway_packet_to_targets(
     targets: Sequence[WatcherTarget] | None = None,
     webhook_urls: Sequence[str] | None = None,
     timestamp_ms: int | None = None,
+    timeout_seconds: float | None = None,
+    semaphore: asyncio.Semaphore | None = None,
 ) -> bool:
-    """Forward one Gateway packet to every configured apps/web webhook target."""
+    """Forward one Gateway packet to every configured apps/web webhook target.
+
+    Matching targets are posted to concurrently so one slow target does not
+    delay the others. `timeout_seconds` bounds each target's POST and
+    `semaphore` bounds in-flight requests shared across packets.
+    """
 
-    forwarded = False
     resolved_targets = tuple(targets or ()) or tuple(
         WatcherTarget(webhook_url=url) for url in webhook_urls or ()
     )
+    matched_targets = TargetRoutingIndex(resolved_targets).route(packet)
+    if not matched_targets:
+        return False
 
-    for target in resolved_targets:
-        if not gateway_packet_matches_target(packet, target):
-            continue
-
-        forwarded = (
-            await forward_gateway_packet(
+    event = build_forwarded_gateway_event(packet, timestamp_ms=timestamp_ms)
+    body = DEFAULT_CODEC.dumps(event) if event is not None else None
+    results = await asyncio.gather(
+        *(
+            _forward_gateway_packet_with_limits(
+                body=body,
                 bot_token=bot_token,
                 packet=packet,
                 session=session,
-                webhook_url=target.webhook_url,
+                target=target,
                 timestamp_ms=timestamp_ms,
+                timeout_seconds=timeout_seconds,
+                semaphore=semaphore,
             )
-            or forwarded
+            for target in matched_targets
         )
-
-    return forwarded
+    )
+    return any(results)
 
 
 class DiscordAiAgentGatewayWatcher:
-    """Connects to Discord Gateway and forwards raw events to apps/web."""
-
-    def __init__(self, config: WatcherConfig):
+    """Connects to Discord Gateway and forwards raw events to apps/web.
+
+    The read loop only routes packets into per-target `TargetForwarder` queues;
+    worker tasks own the webhook POSTs, so slow targets never hold up Gateway
+    reads or heartbeats.
+    """
+
+    def __init__(
+        self,
+        config: WatcherConfig,
+        *,
+        shard: tuple[int, int] | None = None,
+        identify_limiter: IdentifyLimiter | None = None,
+        metrics: GatewayMetrics | None = None,
+    ):
         self.config = config
-        self._last_sequence: int | None = None
+        self.shard = shard
+        self.metrics = metrics or GatewayMetrics()
+        self._metrics_shard = str(shard[0]) if shard else "0"
+        self.metrics.add_queue_source(self._metrics_shard, self.queue_metrics)
+        self._identify_limiter = identify_limiter
+        self._session_state_path = _shard_path(config.session_state_path, shard)
+        self._session = load_session_state(self._session_state_path)
+        self._event_filter = config.event_filter
+        self._codec = resolve_codec(config.json_codec)
+        self.filtered_events = 0
+        self._heartbeat_acked = True
+        self._heartbeat_sent_at: float | None = None
+        self._reconnect_attempt = 0
+        self._min_reconnect_delay_seconds = 0.0
+        self._forward_semaphore = asyncio.Semaphore(config.max_in_flight_forwards)
+        self._forwarders: dict[WatcherTarget, TargetForwarder] = {}
+        self._routing_index = TargetRoutingIndex(())
+        self._forward_session: aiohttp.ClientSession | None = None
+        outbox_path = _shard_path(config.outbox_path, shard)
+        self._outbox = (
+            GatewayOutbox(
+                outbox_path,
+                max_age_seconds=config.outbox_max_age_seconds,
+                max_attempts=config.outbox_max_attempts,
+                max_rows=config.outbox_max_rows,
+            )
+            if outbox_path is not None
+            else None
+        )
+        self._outbox_task: asyncio.Task[None] | None = None
+        self._targets_etag: str | None = None
+        self._target_refresh_task: asyncio.Task[None] | None = None
 
     async def run_forever(self) -> None:
-        while True:
-            try:
-                await self.run_once()
-            except asyncio.CancelledError:
-                raise
-            except Exception:
-                logger.exception("Discord AI-agent Gateway watcher crashed")
-
-            await asyncio.sleep(self.config.reconnect_delay_seconds)
+        try:
+            while True:
+                try:
+                    await self.run_once()
+                except (asyncio.CancelledError, GatewayFatalCloseError):
+                    raise
+                except Exception:
+                    logger.exception("Discord AI-agent Gateway watcher crashed")
+
+                self.metrics.record_reconnect(self._metrics_shard)
+                await asyncio.sleep(self._next_reconnect_delay())
+        finally:
+            await self.close()
 
     async def run_once(self) -> None:
+        resume = self._session.resumable
+        gateway_url = with_transport_compression(
+            self._session.resume_url(self.config.gateway_url)
+            if resume
+            else self.config.gateway_url,
+            self.config.transport_compression,
+        )
+        # zlib-stream state is per connection, so every connect gets a fresh decoder.
+        decoder = GatewayFrameDecoder(self.config.transport_compression)
         async with (
             aiohttp.ClientSession() as session,
-            session.ws_connect(self.config.gateway_url) as ws,
+            session.ws_connect(gateway_url) as ws,
         ):
-            targets = await resolve_watcher_targets(
-                config=self.config,
-                session=session,
-            )
-            hello = await ws.receive_json()
+            await self.refresh_targets(session)
+            self._start_outbox_retries()
+            self._start_target_refresh()
+            hello = self._codec.loads(await self._receive_frame(ws, decoder))
             heartbeat_interval_ms = hello.get("d", {}).get("heartbeat_interval", 45_000)
+            self._heartbeat_acked = True
             heartbeat_task = asyncio.create_task(self._heartbeat(ws, heartbeat_interval_ms / 1000))
 
             try:
-                await ws.send_json(
-                    {
-                        "d": {
-                            "intents": DISCORD_GATEWAY_INTENTS,
-                            "properties": {
-                                "browser": "tuturuuu-ai-agent-watcher",
-                                "device": "tuturuuu-ai-agent-watcher",
-                                "os": "tuturuuu",
-                            },
-                            "token": self.config.bot_token,
-                        },
-                        "op": 2,
-                    }
-                )
+                if resume:
+                    await ws.send_json(self._resume_payload())
+                else:
+                    if self._identify_limiter is not None:
+                        await self._identify_limiter.wait(self.shard[0] if self.shard else 0)
+                    await ws.send_json(self._identify_payload())
 
                 async for message in ws:
-                    if message.type == aiohttp.WSMsgType.TEXT:
-                        packet = message.json()
-                        sequence = packet.get("s")
-                        if isinstance(sequence, int):
-                            self._last_sequence = sequence
-
-                        await forward_gateway_packet_to_targets(
-                            bot_token=self.config.bot_token,
-                            packet=packet,
-                            session=session,
-                            targets=targets,
-                        )
+                    if message.type in {aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY}:
+                        frame = decoder.feed(message.data)
+                        if frame is None or self._skip_raw_dispatch(frame):
+                            continue
+                        if not await self._handle_gateway_packet(ws, self._codec.loads(frame)):
+                            break
                     elif message.type in {
                         aiohttp.WSMsgType.CLOSED,
                         aiohttp.WSMsgType.ERROR,
@@ -368,16 +846,555 @@ class DiscordAiAgentGatewayWatcher:
             finally:
                 heartbeat_task.cancel()
                 await asyncio.gather(heartbeat_task, return_exceptions=True)
+                self._reconnect_attempt += 1
+                save_session_state(self._session_state_path, self._session)
+
+            self._handle_close_code(ws.close_code)
+
+    @staticmethod
+    async def _receive_frame(
+        ws: aiohttp.ClientWebSocketResponse, decoder: GatewayFrameDecoder
+    ) -> str:
+        while True:
+            message = await ws.receive()
+            if message.type not in {aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY}:
+                raise RuntimeError(f"Discord Gateway closed before HELLO: {message.type}")
+
+            frame = decoder.feed(message.data)
+            if frame is not None:
+                return frame
+
+    async def _handle_gateway_packet(
+        self, ws: aiohttp.ClientWebSocketResponse, packet: Mapping[str, Any]
+    ) -> bool:
+        """Apply one Gateway packet. Returns False when the connection should be dropped."""
+        sequence = packet.get("s")
+        if isinstance(sequence, int):
+            self._session.sequence = sequence
+
+        op = packet.get("op")
+        if op == 0:
+            self._handle_dispatch(packet)
+            event_type = str(packet.get("t"))
+            if self._event_filter.allows(event_type):
+                self.metrics.record_event(self._metrics_shard, event_type)
+                await self.enqueue_packet(packet)
+            else:
+                self.filtered_events += 1
+                self.metrics.record_event(self._metrics_shard, event_type, filtered=True)
+        elif op == 1:
+            await self._send_heartbeat(ws)
+        elif op == 11:
+            self._heartbeat_acked = True
+            if self._heartbeat_sent_at is not None:
+                self.metrics.observe_heartbeat_ack(
+                    self._metrics_shard, time.monotonic() - self._heartbeat_sent_at
+                )
+                self._heartbeat_sent_at = None
+        elif op == 7:
+            logger.info("Discord Gateway requested a reconnect; resuming")
+            await ws.close(code=RESUMABLE_CLOSE_CODE)
+            return False
+        elif op == 9:
+            if not packet.get("d"):
+                self._session.clear()
+                # Discord asks clients to wait 1-5 seconds before identifying again.
+                self._min_reconnect_delay_seconds = random.uniform(1, 5)  # noqa: S311
+            logger.warning(
+                "Discord Gateway session invalidated",
+                extra={"resumable": bool(packet.get("d"))},
+            )
+            await ws.close(code=RESUMABLE_CLOSE_CODE)
+            return False
+        return True
+
+    def _skip_raw_dispatch(self, frame: str) -> bool:
+        """Drop unwanted dispatches from the raw frame, keeping only their sequence."""
+        peeked = peek_dispatch(frame)
+        if peeked is None:
+            return False
+
+        event_type, sequence = peeked
+        if self._event_filter.should_decode(event_type):
+            return False
+
+        self._session.sequence = sequence
+        self.filtered_events += 1
+        self.metrics.record_event(self._metrics_shard, event_type, filtered=True)
+        return True
+
+    def _handle_dispatch(self, packet: Mapping[str, Any]) -> None:
+        event_type = packet.get("t")
+        data = packet.get("d")
+        if event_type == "READY" and isinstance(data, Mapping):
+            self._session.session_id = _string_value(data.get("session_id"))
+            self._session.resume_gateway_url = _string_value(data.get("resume_gateway_url"))
+            self._reconnect_attempt = 0
+            save_session_state(self._session_state_path, self._session)
+        elif event_type == "RESUMED":
+            logger.info("Resumed Discord Gateway session")
+            self._reconnect_attempt = 0
+
+    def _handle_close_code(self, close_code: int | None) -> None:
+        if close_code in FATAL_CLOSE_CODES:
+            self._session.clear()
+            save_session_state(self._session_state_path, self._session)
+            raise GatewayFatalCloseError(close_code)
+        if close_code in SESSION_INVALIDATING_CLOSE_CODES:
+            self._session.clear()
+            save_session_state(self._session_state_path, self._session)
+
+    def _next_reconnect_delay(self) -> float:
+        # A session that reached READY/RESUMED resets the attempt counter, so a
+        # routine reconnect (op 7, zombie connection) waits at most one base delay.
+        delay = reconnect_delay_seconds(
+            self._reconnect_attempt - 1,
+            self.config.reconnect_delay_seconds,
+            self.config.max_reconnect_delay_seconds,
+        )
+        delay = max(delay, self._min_reconnect_delay_seconds)
+        self._min_reconnect_delay_seconds = 0.0
+        return delay
+
+    def _identify_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "d": {
+                "intents": self._event_filter.intents(),
+                "properties": {
+                    "browser": "tuturuuu-ai-agent-watcher",
+                    "device": "tuturuuu-ai-agent-watcher",
+                    "os": "tuturuuu",
+                },
+                "token": self.config.bot_token,
+            },
+            "op": 2,
+        }
+        if self.shard is not None:
+            payload["d"]["shard"] = list(self.shard)
+        return payload
+
+    def _resume_payload(self) -> dict[str, Any]:
+        return {
+            "d": {
+                "seq": self._session.sequence,
+                "session_id": self._session.session_id,
+                "token": self.config.bot_token,
+            },
+            "op": 6,
+        }
+
+    async def enqueue_packet(self, packet: Mapping[str, Any]) -> int:
+        """Route a Gateway packet into every matching target queue.
+
+        Returns how many targets accepted the packet. The timestamp is taken
+        here so queued events keep their Gateway receive time.
+        """
+        if not packet.get("t"):
+            return 0
+
+        # Unrouted packets (presence, typing in other channels, ...) stop here,
+        # before an event is queued or an envelope is serialised.
+        targets = self._routing_index.route(packet)
+        if not targets:
+            return 0
+
+        timestamp_ms = int(time.time() * 1000)
+        # Encode the envelope once; every target posts the same bytes.
+        event = build_forwarded_gateway_event(packet, timestamp_ms=timestamp_ms)
+        body = self._codec.dumps(event) if event is not None else None
+        accepted = 0
+        for target in targets:
+            if await self._forwarders[target].enqueue(
+                QueuedEvent(packet=packet, timestamp_ms=timestamp_ms, body=body)
+            ):
+                accepted += 1
+        return accepted
+
+    def queue_metrics(self) -> list[dict[str, Any]]:
+        """Depth, lag and drop counters for each target queue."""
+        return [forwarder.snapshot() for forwarder in self._forwarders.values()]
+
+    async def refresh_targets(self, session: Any) -> bool:
+        """Re-resolve targets and swap forwarders/routing in place. True if they changed."""
+        targets, etag = await fetch_watcher_targets(
+            config=self.config,
+            session=session,
+            etag=self._targets_etag if self._forwarders else None,
+        )
+        if targets is None:
+            return False
+
+        changed = set(targets) != set(self._forwarders)
+        self._targets_etag = etag
+        await self._sync_forwarders(targets)
+        if changed:
+            logger.info("Discord Gateway watcher targets updated", extra={"targets": len(targets)})
+        return changed
+
+    async def close(self) -> None:
+        """Drain target queues (bounded by the forward timeout) and release HTTP resources."""
+        for task in (self._outbox_task, self._target_refresh_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._outbox_task = None
+        self._target_refresh_task = None
+        self._targets_etag = None
+        forwarders = list(self._forwarders.values())
+        self._forwarders = {}
+        self._routing_index = TargetRoutingIndex(())
+        await asyncio.gather(
+            *(
+                forwarder.stop(drain_timeout_seconds=self.config.forward_timeout_seconds)
+                for forwarder in forwarders
+            )
+        )
+        if self._forward_session is not None:
+            await self._forward_session.close()
+            self._forward_session = None
+        if self._outbox is not None:
+            self._outbox.close()
+            self._outbox = None
+
+    async def retry_outbox_once(self) -> int:
+        """Redeliver due outbox entries, oldest first per target. Returns deliveries."""
+        if self._outbox is None:
+            return 0
+
+        delivered = 0
+        self._outbox.refresh_pending()
+        for target in self._outbox.pending_targets():
+            while (entry := self._outbox.next_due(target)) is not None:
+                if not await self._redeliver(entry):
+                    break
+                self._outbox.mark_delivered(entry)
+                delivered += 1
+        return delivered
+
+    def _start_target_refresh(self) -> None:
+        # Static webhook URLs never change; only apps/web-resolved targets refresh.
+        if self.config.webhook_urls or (
+            self._target_refresh_task and not self._target_refresh_task.done()
+        ):
+            return
+        self._target_refresh_task = asyncio.create_task(self._refresh_targets_forever())
+
+    async def _refresh_targets_forever(self) -> None:
+        """Poll the watcher config so target changes apply without reconnecting."""
+        while True:
+            await asyncio.sleep(self.config.target_refresh_interval_seconds)
+            try:
+                await self.refresh_targets(self._get_forward_session())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Keep forwarding to the last known targets until apps/web recovers.
+                logger.exception("Failed to refresh Discord Gateway watcher targets")
+
+    def _start_outbox_retries(self) -> None:
+        if self._outbox is None or (self._outbox_task and not self._outbox_task.done()):
+            return
+        self._outbox_task = asyncio.create_task(self._retry_outbox_forever())
+
+    async def _retry_outbox_forever(self) -> None:
+        retention_ran_at = time.monotonic()
+        while True:
+            await asyncio.sleep(self.config.outbox_poll_interval_seconds)
+            try:
+                elapsed = time.monotonic() - retention_ran_at
+                if self._outbox is not None and (
+                    elapsed >= self.config.outbox_retention_interval_seconds
+                ):
+                    retention_ran_at = time.monotonic()
+                    self._outbox.enforce_retention()
+                await self.retry_outbox_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Discord Gateway outbox retry failed")
+
+    async def _redeliver(self, entry: OutboxEntry) -> bool:
+        outbox = self._outbox
+        if outbox is None:
+            return False
+
+        status: int | None = None
+
+        async def forward() -> bool:
+            nonlocal status
+            event = build_forwarded_gateway_event(entry.packet, timestamp_ms=entry.timestamp_ms)
+            if event is None:
+                return True
+            status = await post_gateway_envelope(
+                body=self._codec.dumps(event),
+                bot_token=self.config.bot_token,
+                envelope=event,
+                session=self._get_forward_session(),
+                webhook_url=entry.target,
+            )
+            return 200 <= status < 300
+
+        started = time.perf_counter()
+        delivered = await _run_with_forward_limits(
+            forward,
+            event_type=entry.packet.get("t"),
+            webhook_url=entry.target,
+            timeout_seconds=self.config.forward_timeout_seconds,
+            semaphore=self._forward_semaphore,
+        )
+        self.metrics.observe_forward(
+            entry.target, time.perf_counter() - started, delivered=delivered
+        )
+        if delivered:
+            return True
+
+        outbox.mark_failed(
+            entry,
+            status=status,
+            error=f"HTTP {status}" if status is not None else "network error or timeout",
+        )
+        return False
+
+    def _defer_to_outbox(self, target: WatcherTarget, events: Sequence[QueuedEvent]) -> bool:
+        """Queue events behind a target's pending outbox entries to keep its order."""
+        if self._outbox is None or not self._outbox.has_pending(target.webhook_url):
+            return False
+        for event in events:
+            self._outbox.add(target.webhook_url, event.packet, event.timestamp_ms)
+        return True
+
+    def _store_failed(self, target: WatcherTarget, events: Sequence[QueuedEvent]) -> None:
+        if self._outbox is None:
+            return
+        for event in events:
+            self._outbox.add(
+                target.webhook_url, event.packet, event.timestamp_ms, error="live delivery failed"
+            )
+
+    async def _sync_forwarders(self, targets: Sequence[WatcherTarget]) -> None:
+        """Start forwarders for new targets and stop the ones no longer configured."""
+        for target in targets:
+            if target in self._forwarders:
+                continue
+
+            forwarder = TargetForwarder(
+                name=target.webhook_url,
+                send=self._sender_for(target),
+                max_queue_size=self.config.forward_queue_size,
+                workers=self.config.forward_workers_per_target,
+                overflow_policy=self.config.overflow_policy,
+                spill_dir=self._spill_dir()
+                if self.config.overflow_policy is OverflowPolicy.SPILL
+                else None,
+                # A re-scoped target starts a new forwarder before the old one
+                # stops, so the scope is part of the spill file's identity.
+                spill_key=repr(target),
+                send_batch=self._batch_sender_for(target),
+                batch_max_size=self.config.batch_max_events,
+                batch_max_latency_seconds=self.config.batch_max_latency_seconds,
+            )
+            forwarder.start()
+            self._forwarders[target] = forwarder
+
+        # Swap the index before awaiting anything so routing never sees a
+        # target whose forwarder is being stopped.
+        self._routing_index = TargetRoutingIndex(targets)
+        wanted = set(self._routing_index.targets)
+        removed = [target for target in self._forwarders if target not in wanted]
+        await asyncio.gather(
+            *(
+                self._forwarders.pop(target).stop(
+                    drain_timeout_seconds=self.config.forward_timeout_seconds
+                )
+                for target in removed
+            )
+        )
+        if self.config.overflow_policy is OverflowPolicy.SPILL:
+            await self._remove_orphaned_spill_files()
+
+    async def _remove_orphaned_spill_files(self) -> None:
+        # Spill files of targets that are gone (or were re-scoped) would
+        # otherwise stay on disk forever; nothing can deliver them any more.
+        keep = {forwarder.spill_path for forwarder in self._forwarders.values()}
+        removed = await asyncio.to_thread(
+            remove_orphaned_spill_files,
+            self._spill_dir(),
+            {path for path in keep if path is not None},
+        )
+        if removed:
+            logger.warning(
+                "Discarded spilled events of targets that are no longer configured",
+                extra={"files": [path.name for path in removed]},
+            )
+
+    def _spill_dir(self) -> Path:
+        # Shards forward to the same targets, so each needs its own spill files.
+        if self.shard is None:
+            return self.config.spill_dir
+        return self.config.spill_dir / f"shard-{self.shard[0]}"
+
+    def _sender_for(self, target: WatcherTarget) -> SendEvent:
+        # Events that are not delivered live go to the outbox; the forwarder
+        # still counts them as failed so its metrics reflect live delivery.
+        async def send(event: QueuedEvent) -> bool:
+            if self._defer_to_outbox(target, [event]):
+                return False
+
+            started = time.perf_counter()
+            delivered = await _forward_gateway_packet_with_limits(
+                body=event.body,
+                bot_token=self.config.bot_token,
+                packet=event.packet,
+                session=self._get_forward_session(),
+                target=target,
+                timestamp_ms=event.timestamp_ms,
+                timeout_seconds=self.config.forward_timeout_seconds,
+                semaphore=self._forward_semaphore,
+            )
+            self.metrics.observe_forward(
+                target.webhook_url, time.perf_counter() - started, delivered=delivered
+            )
+            if not delivered:
+                self._store_failed(target, [event])
+            return delivered
+
+        return send
+
+    def _batch_sender_for(self, target: WatcherTarget) -> SendBatch | None:
+        # Batching is opt-in on our side and negotiated by the target advertising
+        # a batch endpoint; otherwise every event keeps its own POST.
+        batch_webhook_url = target.batch_webhook_url
+        if self.config.batch_max_events <= 1 or batch_webhook_url is None:
+            return None
+
+        async def send_batch(events: Sequence[QueuedEvent]) -> int:
+            if self._defer_to_outbox(target, events):
+                return 0
+
+            delivered = 0
+
+            async def forward() -> bool:
+                nonlocal delivered
+                delivered = await forward_gateway_batch(
+                    bot_token=self.config.bot_token,
+                    codec=self._codec,
+                    packets=[(event.packet, event.timestamp_ms) for event in events],
+                    session=self._get_forward_session(),
+                    webhook_url=batch_webhook_url,
+                )
+                return delivered == len(events)
+
+            started = time.perf_counter()
+            await _run_with_forward_limits(
+                forward,
+                event_type="GATEWAY_BATCH",
+                webhook_url=batch_webhook_url,
+                timeout_seconds=self.config.forward_timeout_seconds,
+                semaphore=self._forward_semaphore,
+            )
+            self.metrics.observe_forward(
+                target.webhook_url,
+                time.perf_counter() - started,
+                delivered=delivered == len(events),
+            )
+            # Events apps/web already handled are not retried.
+            self._store_failed(target, events[delivered:])
+            return delivered
+
+        return send_batch
+
+    def _get_forward_session(self) -> aiohttp.ClientSession:
+        # Forwarders outlive a single Gateway connection, so they get their own
+        # session instead of the one scoped to run_once.
+        if self._forward_session is None or self._forward_session.closed:
+            self._forward_session = aiohttp.ClientSession()
+        return self._forward_session
 
     async def _heartbeat(self, ws: aiohttp.ClientWebSocketResponse, delay: float) -> None:
+        # Jitter the first beat as Discord recommends so reconnect storms spread out.
+        await asyncio.sleep(delay * random.random())  # noqa: S311
         while True:
+            if not self._heartbeat_acked:
+                # No op 11 since the last beat: the connection is a zombie. Close
+                # with a non-1000 code so the session can still be resumed.
+                logger.warning("Discord Gateway heartbeat was not acknowledged; reconnecting")
+                await ws.close(code=RESUMABLE_CLOSE_CODE)
+                return
+
+            self._heartbeat_acked = False
+            await self._send_heartbeat(ws)
             await asyncio.sleep(delay)
-            await ws.send_json({"d": self._last_sequence, "op": 1})
+
+    async def _send_heartbeat(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        self._heartbeat_sent_at = time.monotonic()
+        await ws.send_json({"d": self._session.sequence, "op": 1})
+
+
+def _shard_path(path: Path | None, shard: tuple[int, int] | None) -> Path | None:
+    # Each shard has its own Gateway session and retry loop, so each needs its
+    # own state and outbox files.
+    if path is None or shard is None:
+        return path
+    return path.with_name(f"{path.stem}.shard-{shard[0]}-of-{shard[1]}{path.suffix}")
+
+
+async def create_shard_watchers(
+    config: WatcherConfig, *, session: Any, metrics: GatewayMetrics | None = None
+) -> list[DiscordAiAgentGatewayWatcher]:
+    """One watcher per shard this process runs, sharing one IDENTIFY limiter and metrics."""
+    plan = await resolve_shard_plan(
+        bot_token=config.bot_token,
+        session=session,
+        shard_count=config.shard_count,
+        shard_ids=config.shard_ids,
+    )
+    limiter = IdentifyLimiter(plan.max_concurrency, lock_dir=config.identify_lock_dir)
+    metrics = metrics or GatewayMetrics()
+    if not plan.sharded:
+        return [DiscordAiAgentGatewayWatcher(config, identify_limiter=limiter, metrics=metrics)]
+
+    logger.info(
+        "Starting Discord Gateway shards",
+        extra={
+            "max_concurrency": plan.max_concurrency,
+            "shard_count": plan.shard_count,
+            "shard_ids": plan.shard_ids,
+        },
+    )
+    return [
+        DiscordAiAgentGatewayWatcher(
+            config,
+            shard=(shard_id, plan.shard_count),
+            identify_limiter=limiter,
+            metrics=metrics,
+        )
+        for shard_id in plan.shard_ids
+    ]
 
 
 async def amain() -> None:
     logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
-    await DiscordAiAgentGatewayWatcher(WatcherConfig.from_env()).run_forever()
+    config = WatcherConfig.from_env()
+    metrics = GatewayMetrics()
+    async with aiohttp.ClientSession() as session:
+        watchers = await create_shard_watchers(config, session=session, metrics=metrics)
+
+    runner = (
+        await start_metrics_server(metrics, host=config.metrics_host, port=config.metrics_port)
+        if config.metrics_port
+        else None
+    )
+    summary_task = asyncio.create_task(
+        log_metrics_forever(metrics, config.metrics_log_interval_seconds)
+    )
+    try:
+        await asyncio.gather(*(watcher.run_forever() for watcher in watchers))
+    finally:
+        summary_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await summary_task
+        if runner is not None:
+            await runner.cleanup()
 
 
 if __name__ == "__main__":
@@ -4,7 +4,8 @@ import json
 import logging
 import os
 import traceback
-from typing import cast
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping, Sequence
+from typing import Any, Literal, cast
 
 import modal
 import requests
@@ -12,7 +13,8 @@ import requests
 from auth import DiscordAuth
 from commands import CommandHandler
 from config import DiscordInteractionType, DiscordResponseType
-from markitdown_service import handle_markitdown
+from discord_client import DiscordClient
+from markitdown_sections import iter_ndjson_as_completed
 from utils import get_supabase_client
 
 logger = logging.getLogger(__name__)
@@ -27,7 +29,6 @@ image = (
         "nanoid",
         "pytz",
         "aiohttp",
-        "markitdown[all]",
     )
     .add_local_python_source(
         "auth",
@@ -35,13 +36,48 @@ image = (
         "config",
         "discord_client",
         "link_shortener",
-        "markitdown_service",
+        "markitdown_sections",
+        "task_cache",
         "utils",
         "daily_report",
         "wol_reminder",
     )
 )
 
+# MarkItDown and its converters are heavy, so they only ship in the image of the
+# dedicated converter class; the interaction web app calls it remotely.
+markitdown_image = (
+    modal.Image.debian_slim(python_version="3.13")
+    .pip_install(
+        "fastapi[standard]",
+        "aiohttp",
+        "markitdown[all]",
+    )
+    .add_local_python_source(
+        "markitdown_cache",
+        "markitdown_executor",
+        "markitdown_formats",
+        "markitdown_sections",
+        "markitdown_service",
+    )
+)
+
+with markitdown_image.imports():
+    from markitdown_formats import ConversionLimits
+    from markitdown_service import handle_markitdown, warm_markitdown_converters
+
+# Converter scaling is read at deploy time. Set MARKITDOWN_MODAL_MIN_CONTAINERS
+# to keep a warm pool of converters when cold starts matter more than idle cost.
+MARKITDOWN_MODAL_MIN_CONTAINERS = int(os.getenv("MARKITDOWN_MODAL_MIN_CONTAINERS") or 0)
+MARKITDOWN_MODAL_MAX_CONTAINERS = int(os.getenv("MARKITDOWN_MODAL_MAX_CONTAINERS") or 10)
+MARKITDOWN_MODAL_SCALEDOWN_SECONDS = int(os.getenv("MARKITDOWN_MODAL_SCALEDOWN_SECONDS") or 300)
+MARKITDOWN_MODAL_CPU = float(os.getenv("MARKITDOWN_MODAL_CPU") or 2)
+MARKITDOWN_MODAL_MEMORY_MB = int(os.getenv("MARKITDOWN_MODAL_MEMORY_MB") or 4096)
+MARKITDOWN_MODAL_TIMEOUT_SECONDS = int(os.getenv("MARKITDOWN_MODAL_TIMEOUT_SECONDS") or 300)
+# Inputs per converter container. Matching the in-container conversion limit
+# lets Modal scale out instead of the container answering 429.
+MARKITDOWN_MODAL_MAX_INPUTS = int(os.getenv("MARKITDOWN_MODAL_MAX_INPUTS") or 2)
+
 app = modal.App("tuturuuu-discord-bot", image=image)
 
 # Add Supabase secret
@@ -295,6 +331,7 @@ async def reply_ticket(
     interaction_token: str,
     user_id: str | None = None,
     guild_id: str | None = None,
+    bulk: bool = False,
 ):
     """Handle boards list command with authorization."""
     handler = CommandHandler()
@@ -322,7 +359,7 @@ async def reply_ticket(
         user_info = handler.get_user_workspace_info(user_id, guild_id or "")
 
     try:
-        await handler.handle_boards_command(app_id, interaction_token, user_info)
+        await handler.handle_boards_command(app_id, interaction_token, user_info, bulk)
     except Exception as e:
         traceback.print_exc()
         await handler.discord_client.send_response(
@@ -464,6 +501,7 @@ async def handle_board_selection_interaction(
     user_id: str | None = None,
     guild_id: str | None = None,
     selected_board_id: str | None = None,
+    bulk: bool = False,
 ):
     """Handle board selection interaction with authorization."""
     handler = CommandHandler()
@@ -500,7 +538,7 @@ async def handle_board_selection_interaction(
 
     try:
         await handler.handle_board_selection_interaction(
-            app_id, interaction_token, selected_board_id, user_info
+            app_id, interaction_token, selected_board_id, user_info, bulk
         )
     except Exception as e:
         traceback.print_exc()
@@ -573,6 +611,8 @@ async def handle_ticket_modal_submission(
     guild_id: str | None = None,
     list_id: str | None = None,
     components: list | None = None,
+    board_id: str | None = None,
+    bulk: bool = False,
 ):
     """Handle ticket modal submission with authorization."""
     handler = CommandHandler()
@@ -629,29 +669,31 @@ async def handle_ticket_modal_submission(
         print(f"Error extracting form data: {e}")
         form_data = {}
 
-    # Extract board_id from the custom_id of the modal
-    # The interaction data should contain the custom_id in the format:
-    # "ticket_form" pipe-separated with board_id and list_id
-    board_id = ""
-    try:
-        # Get the modal's custom_id from the interaction metadata
-        # This is a bit tricky since we're in the Modal function context
-        # We'll extract the board_id from the list relationship instead
-        if list_id:
+    # The board_id comes from the modal custom_id ("ticket_form|board_id|list_id").
+    # It is untrusted input: the handler re-validates that the board belongs to the
+    # user's workspace and that the list belongs to the board before inserting.
+    # Older modals without a board_id fall back to the list relationship.
+    if not board_id:
+        try:
             supabase = get_supabase_client()
             list_result = (
                 supabase.table("task_lists").select("board_id").eq("id", list_id).execute()
             )
             if list_result.data:
                 board_id = list_result.data[0].get("board_id", "")
-    except Exception as e:
-        print(f"Error extracting board_id: {e}")
-        board_id = ""
+        except Exception as e:
+            print(f"Error extracting board_id: {e}")
+            board_id = ""
 
     try:
-        await handler.handle_ticket_modal_submission(
-            app_id, interaction_token, board_id, list_id, form_data, user_info
-        )
+        if bulk:
+            await handler.handle_bulk_ticket_modal_submission(
+                app_id, interaction_token, board_id or "", list_id, form_data, user_info
+            )
+        else:
+            await handler.handle_ticket_modal_submission(
+                app_id, interaction_token, board_id or "", list_id, form_data, user_info
+            )
     except Exception as e:
         traceback.print_exc()
         await handler.discord_client.send_response(
@@ -850,6 +892,95 @@ def create_slash_command(force: bool = False):
         print("🤖: Non-force registration complete — new commands (if any) created.")
 
 
+@app.cls(
+    image=markitdown_image,
+    secrets=[supabase_secret],
+    cpu=MARKITDOWN_MODAL_CPU,
+    memory=MARKITDOWN_MODAL_MEMORY_MB,
+    timeout=MARKITDOWN_MODAL_TIMEOUT_SECONDS,
+    min_containers=MARKITDOWN_MODAL_MIN_CONTAINERS,
+    max_containers=MARKITDOWN_MODAL_MAX_CONTAINERS,
+    scaledown_window=MARKITDOWN_MODAL_SCALEDOWN_SECONDS,
+    env={
+        "MARKITDOWN_MAX_CONCURRENT_CONVERSIONS": str(MARKITDOWN_MODAL_MAX_INPUTS),
+        "MARKITDOWN_PROCESS_WORKERS": str(MARKITDOWN_MODAL_MAX_INPUTS),
+    },
+)
+@modal.concurrent(max_inputs=MARKITDOWN_MODAL_MAX_INPUTS)
+class MarkItDownConverter:
+    """MarkItDown conversions, scaled separately from the interaction web app."""
+
+    @modal.enter()
+    def warm(self):
+        warm_markitdown_converters()
+
+    @modal.method()
+    async def convert(
+        self,
+        signed_url: str | None,
+        filename: str | None,
+        enable_plugins: bool,
+        url: str | None = None,
+        max_pages: int | None = None,
+        max_rows: int | None = None,
+        max_bytes: int | None = None,
+    ) -> dict[str, object]:
+        """Return `{"result": ...}`, or `{"error": ...}` for an HTTP error to re-raise."""
+        from fastapi import HTTPException
+
+        limits = ConversionLimits(max_pages=max_pages, max_rows=max_rows, max_bytes=max_bytes)
+        try:
+            result = await handle_markitdown(
+                signed_url, filename, enable_plugins, url=url, limits=limits
+            )
+        except HTTPException as error:
+            return {
+                "error": {
+                    "status_code": error.status_code,
+                    "detail": error.detail,
+                    "headers": error.headers,
+                }
+            }
+        return {"result": result}
+
+
+async def stream_markitdown_batch_remote(
+    items: Sequence[Mapping[str, Any]],
+    convert: Callable[..., Awaitable[dict[str, Any]]],
+) -> AsyncIterator[bytes]:
+    """Fan a `/markitdown/batch` request out as one converter call per item.
+
+    Every item is its own Modal input, so the autoscaler spreads a batch over
+    converter containers instead of queueing all of it behind one container's
+    admission limits. Lines match `markitdown_service.stream_markitdown_batch`.
+    """
+
+    async def convert_item(index: int, item: Mapping[str, Any]) -> dict[str, object]:
+        try:
+            response = await convert(**item)
+        except Exception:
+            logger.exception("markitdown conversion failed")
+            return {
+                "index": index,
+                "ok": False,
+                "status_code": 500,
+                "error": "Failed to convert file",
+            }
+        if "error" in response:
+            return {
+                "index": index,
+                "ok": False,
+                "status_code": response["error"]["status_code"],
+                "error": response["error"]["detail"],
+            }
+        return {"index": index, **response["result"]}
+
+    async for line in iter_ndjson_as_completed(
+        convert_item(index, item) for index, item in enumerate(items)
+    ):
+        yield line
+
+
 @app.function(secrets=[discord_secret, supabase_secret], min_containers=1, image=image)
 @modal.concurrent(max_inputs=1000)
 @modal.asgi_app()
@@ -857,7 +988,10 @@ def web_app():
     """Main web application for handling Discord interactions."""
     from fastapi import FastAPI, HTTPException, Request
     from fastapi.middleware.cors import CORSMiddleware
-    from pydantic import BaseModel
+    from fastapi.responses import StreamingResponse
+    from pydantic import BaseModel, Field
+
+    from markitdown_sections import SplitBy, iter_markdown_ndjson, iter_markdown_text
 
     web_app = FastAPI()
 
@@ -971,7 +1105,12 @@ def web_app():
                 options = data["data"].get("options", [])
                 reply_tumeet_plan.spawn(app_id, interaction_token, options, user_id, guild_id)
             elif command_name == "ticket":
-                reply_ticket.spawn(app_id, interaction_token, user_id, guild_id)
+                options = data["data"].get("options", [])
+                bulk = any(
+                    option.get("name") == "bulk" and option.get("value") is True
+                    for option in options
+                )
+                reply_ticket.spawn(app_id, interaction_token, user_id, guild_id, bulk)
             elif command_name == "assign":
                 options = data["data"].get("options", [])
                 reply_assign.spawn(app_id, interaction_token, options, user_id, guild_id)
@@ -1027,44 +1166,45 @@ def web_app():
 
             # Handle different component interactions asynchronously
             # Support both legacy boards listing select id and ticket flow specific id
-            if custom_id in ("select_board_for_lists", "select_board_for_ticket"):
+            if custom_id in (
+                "select_board_for_lists",
+                "select_board_for_ticket",
+                "select_board_for_bulk_ticket",
+            ):
                 selected_board_id = data["data"]["values"][0]
                 print(f"🤖: selected board ID: {selected_board_id}")
                 handle_board_selection_interaction.spawn(
-                    app_id, interaction_token, user_id, guild_id, selected_board_id
+                    app_id,
+                    interaction_token,
+                    user_id,
+                    guild_id,
+                    selected_board_id,
+                    custom_id == "select_board_for_bulk_ticket",
                 )
-            elif custom_id == "select_list_for_ticket":
-                # Handle list selection synchronously to return modal
+            elif custom_id in ("select_list_for_ticket", "select_list_for_bulk_ticket"):
+                # Handle list selection synchronously to return modal. The select
+                # option value already carries the IDs and list name, so the modal
+                # is built in memory without touching the database.
                 selected_value = data["data"]["values"][0]
                 print(f"🤖: selected list value: {selected_value}")
 
-                try:
-                    if "|" in selected_value:
-                        _board_id, list_id = selected_value.split("|", 1)
-                    else:
-                        # Fallback if format is unexpected
-                        return {
-                            "type": DiscordResponseType.CHANNEL_MESSAGE_WITH_SOURCE,
-                            "data": {
-                                "content": "❌ **Error:** Invalid list selection format.",
-                                "flags": 64,  # EPHEMERAL flag
-                            },
-                        }
-                    # Show modal immediately WITHOUT pre-checking user permissions/workspace.
-                    # Authorization & workspace validation will be enforced on modal submission.
-                    handler = CommandHandler()
-                    return handler.create_ticket_form_modal(list_id, None)
-
-                except Exception as e:
-                    print(f"🤖: Error creating modal: {e}")
-                    traceback.print_exc()
+                parsed_selection = DiscordClient.parse_list_selection_value(selected_value)
+                if not parsed_selection:
                     return {
                         "type": DiscordResponseType.CHANNEL_MESSAGE_WITH_SOURCE,
                         "data": {
-                            "content": f"❌ **Error:** Failed to create ticket form: {e!s}",
+                            "content": "❌ **Error:** Invalid list selection format.",
                             "flags": 64,  # EPHEMERAL flag
                         },
                     }
+
+                # Show modal immediately WITHOUT pre-checking user permissions/workspace.
+                # Authorization, workspace, board and list validation are enforced
+                # on modal submission.
+                board_id, list_id, list_name = parsed_selection
+                if custom_id == "select_list_for_bulk_ticket":
+                    return DiscordClient.create_bulk_ticket_form_modal(board_id, list_id, list_name)
+                return DiscordClient.create_ticket_form_modal(board_id, list_id, "", list_name)
             else:
                 print(f"🤖: unknown component interaction: {custom_id}")
                 handler = CommandHandler()
@@ -1101,13 +1241,13 @@ def web_app():
             )
 
             # Handle modal submissions asynchronously
-            if custom_id.startswith("ticket_form|"):
+            if custom_id.startswith(("ticket_form|", "bulk_ticket_form|")):
                 # Extract the board_id and list_id from the custom_id
-                # Format: "ticket_form" pipe-separated with board_id and list_id
+                # Format: "ticket_form" / "bulk_ticket_form" pipe-separated with
+                # board_id and list_id
                 parts = custom_id.split("|")
                 if len(parts) >= 3:
-                    # Skip parts[1] (board_id) since we'll get it from list relationship
-                    list_id = parts[2]
+                    board_id, list_id = parts[1], parts[2]
                     handle_ticket_modal_submission.spawn(
                         app_id,
                         interaction_token,
@@ -1115,6 +1255,8 @@ def web_app():
                         guild_id,
                         list_id,
                         data["data"]["components"],
+                        board_id,
+                        parts[0] == "bulk_ticket_form",
                     )
                 else:
                     print(f"🤖: invalid modal custom_id format: {custom_id}")
@@ -1220,6 +1362,13 @@ def web_app():
         url: str | None = None
         filename: str | None = None
         enable_plugins: bool = True
+        # `markdown` streams the text; `ndjson` streams sections, optionally split.
+        response_format: Literal["json", "markdown", "ndjson"] = "json"
+        split_by: SplitBy | None = None
+        # Partial conversion for previews: first pages, spreadsheet rows or text bytes.
+        max_pages: int | None = Field(default=None, ge=1)
+        max_rows: int | None = Field(default=None, ge=1)
+        max_bytes: int | None = Field(default=None, ge=1)
 
     @web_app.post("/markitdown")
     async def markitdown_endpoint(request: Request, payload: MarkitdownRequest):
@@ -1228,16 +1377,48 @@ def web_app():
             raise HTTPException(status_code=401, detail="Unauthorized")
 
         try:
-            return await handle_markitdown(
+            response = await MarkItDownConverter().convert.remote.aio(
                 payload.signed_url.strip() if payload.signed_url else None,
                 payload.filename,
                 payload.enable_plugins,
                 url=payload.url.strip() if payload.url else None,
+                max_pages=payload.max_pages,
+                max_rows=payload.max_rows,
+                max_bytes=payload.max_bytes,
             )
-        except HTTPException:
-            raise
         except Exception as error:
             logger.exception("markitdown conversion failed")
             raise HTTPException(status_code=500, detail="Failed to convert file") from error
 
+        if "error" in response:
+            raise HTTPException(**response["error"])
+        result = response["result"]
+        if payload.response_format == "markdown":
+            return StreamingResponse(
+                iter_markdown_text(str(result["markdown"])),
+                media_type="text/markdown; charset=utf-8",
+            )
+        if payload.response_format == "ndjson":
+            return StreamingResponse(
+                iter_markdown_ndjson(result, payload.split_by),
+                media_type="application/x-ndjson",
+            )
+        return result
+
+    class MarkitdownBatchRequest(BaseModel):
+        # markitdown_service.MAX_MARKITDOWN_BATCH_ITEMS; that module is not in this image.
+        items: list[MarkitdownRequest] = Field(min_length=1, max_length=50)
+
+    @web_app.post("/markitdown/batch")
+    async def markitdown_batch_endpoint(request: Request, payload: MarkitdownBatchRequest):
+        """Convert many sources, streaming one NDJSON result per source as it finishes."""
+        if not _is_cron_request_authorized(request):
+            raise HTTPException(status_code=401, detail="Unauthorized")
+
+        lines = stream_markitdown_batch_remote(
+            [item.model_dump(exclude={"response_format", "split_by"}) for item in payload.items],
+            MarkItDownConverter().convert.remote.aio,
+        )
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
     return web_app
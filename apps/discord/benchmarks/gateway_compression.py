@@ -0,0 +1,109 @@
+"""Compare plain JSON and zlib-stream Gateway transport on recorded traffic.
+
+Usage:
+    uv run python benchmarks/gateway_compression.py [recorded_frames.jsonl]
+
+The recording holds one raw Gateway frame (a JSON object) per line. Without
+one, a synthetic burst of MESSAGE_CREATE / TYPING_START / PRESENCE_UPDATE
+frames is used. Frames are compressed the way Discord sends them (one zlib
+stream per connection, Z_SYNC_FLUSH after each frame) and then decoded through
+`GatewayFrameDecoder`, reporting wire bytes and decode time for both paths.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai_agent_gateway_transport import ZLIB_STREAM, GatewayFrameDecoder
+
+
+def synthetic_frames(count: int = 5000) -> list[str]:
+    frames = []
+    for index in range(count):
+        kind = index % 4
+        if kind in {0, 1}:
+            event_type = "MESSAGE_CREATE"
+            data = {
+                "attachments": [],
+                "author": {"avatar": "a" * 32, "id": str(10**17 + index % 50), "username": "user"},
+                "channel_id": str(2 * 10**17 + index % 8),
+                "content": f"message {index} " + "lorem ipsum dolor sit amet " * (1 + index % 5),
+                "embeds": [],
+                "guild_id": str(3 * 10**17),
+                "id": str(4 * 10**17 + index),
+                "mentions": [],
+                "timestamp": "2026-01-01T00:00:00.000000+00:00",
+                "type": 0,
+            }
+        elif kind == 2:
+            event_type = "TYPING_START"
+            data = {
+                "channel_id": str(2 * 10**17 + index % 8),
+                "guild_id": str(3 * 10**17),
+                "timestamp": 1_700_000_000 + index,
+                "user_id": str(10**17 + index % 50),
+            }
+        else:
+            event_type = "PRESENCE_UPDATE"
+            data = {
+                "activities": [],
+                "client_status": {"desktop": "online"},
+                "guild_id": str(3 * 10**17),
+                "status": "online",
+                "user": {"id": str(10**17 + index % 50)},
+            }
+        frames.append(
+            json.dumps({"t": event_type, "s": index + 1, "op": 0, "d": data}, separators=(",", ":"))
+        )
+    return frames
+
+
+def load_frames(path: Path) -> list[str]:
+    with path.open(encoding="utf-8") as recording:
+        return [line.strip() for line in recording if line.strip()]
+
+
+def zlib_stream_messages(frames: list[str]) -> list[bytes]:
+    compressor = zlib.compressobj()
+    return [
+        compressor.compress(frame.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        for frame in frames
+    ]
+
+
+def decode_all(messages: list[str] | list[bytes], compression: str | None) -> float:
+    decoder = GatewayFrameDecoder(compression)
+    started = time.perf_counter()
+    for message in messages:
+        frame = decoder.feed(message)
+        if frame is not None:
+            json.loads(frame)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    frames = load_frames(Path(sys.argv[1])) if len(sys.argv) > 1 else synthetic_frames()
+    compressed = zlib_stream_messages(frames)
+
+    plain_bytes = sum(len(frame.encode()) for frame in frames)
+    compressed_bytes = sum(len(message) for message in compressed)
+    plain_seconds = decode_all(frames, None)
+    compressed_seconds = decode_all(compressed, ZLIB_STREAM)
+
+    print(f"frames:               {len(frames)}")
+    print(f"json bytes:           {plain_bytes}")
+    print(
+        f"zlib-stream bytes:    {compressed_bytes} ({compressed_bytes / plain_bytes:.1%} of json)"
+    )
+    print(f"json decode:          {plain_seconds * 1000:.1f} ms")
+    print(f"zlib-stream decode:   {compressed_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
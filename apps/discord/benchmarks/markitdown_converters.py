@@ -0,0 +1,84 @@
+"""Compare MarkItDown converter start-up cost with conversion time.
+
+Usage:
+    uv run python benchmarks/markitdown_converters.py [document ...] [--runs N]
+
+Without documents, a small CSV and HTML page are generated in memory, which is
+representative of most /markitdown traffic. For each document this reports
+the time to build a `MarkItDown` (per `enable_plugins` setting), a conversion
+on a fresh converter per request (the old behaviour) and a conversion through
+the service's shared converter pool.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from markitdown import MarkItDown, StreamInfo
+
+from markitdown_service import _convert_stream_sync, warm_markitdown_converters
+
+SAMPLE_DOCUMENTS = {
+    "sample.csv": b"name,count,notes\n"
+    + b"".join(f"row {index},{index},lorem ipsum\n".encode() for index in range(200)),
+    "sample.html": b"<html><head><title>Sample</title></head><body>"
+    + b"".join(f"<h2>Section {index}</h2><p>Lorem ipsum dolor.</p>".encode() for index in range(50))
+    + b"</body></html>",
+}
+
+
+def median_ms(run: Callable[[], object], runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("documents", nargs="*", type=Path)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    documents = (
+        {path.name: path.read_bytes() for path in args.documents}
+        if args.documents
+        else SAMPLE_DOCUMENTS
+    )
+
+    for enable_plugins in (False, True):
+        startup_ms = median_ms(partial(MarkItDown, enable_plugins=enable_plugins), args.runs)
+        print(f"MarkItDown(enable_plugins={enable_plugins}) start-up: {startup_ms:.1f} ms")
+
+    warm_markitdown_converters()
+    for name, content in documents.items():
+        stream_info = StreamInfo(extension=Path(name).suffix or None, filename=name)
+
+        def fresh_converter(content: bytes = content, stream_info: StreamInfo = stream_info):
+            converter = MarkItDown(enable_plugins=True)
+            return converter.convert_stream(io.BytesIO(content), stream_info=stream_info)
+
+        def pooled_converter(content: bytes = content, name: str = name):
+            return _convert_stream_sync(io.BytesIO(content), name, enable_plugins=True)
+
+        fresh_ms = median_ms(fresh_converter, args.runs)
+        pooled_ms = median_ms(pooled_converter, args.runs)
+        print(
+            f"{name} ({len(content)} bytes): fresh converter {fresh_ms:.1f} ms, "
+            f"pooled converter {pooled_ms:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
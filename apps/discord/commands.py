@@ -2,8 +2,11 @@
 
 import asyncio
 import contextlib
+import csv
 import datetime
+import io
 import re
+import time
 from datetime import datetime as dt
 from typing import Any
 from zoneinfo import ZoneInfo
@@ -11,13 +14,14 @@ from zoneinfo import ZoneInfo
 import aiohttp
 import pytz
 
-from config import ALLOWED_GUILD_IDS, DiscordResponseType
+from config import ALLOWED_GUILD_IDS
 from discord_client import (
     DiscordAPIError,
     DiscordClient,
     DiscordMissingAccessError,
 )
 from link_shortener import LinkShortener
+from task_cache import TaskOwnership, task_ownership_cache, task_ownership_from_row
 from utils import (
     get_base_url,
     get_supabase_client,
@@ -28,12 +32,118 @@ from utils import (
 from wol_reminder import trigger_wol_reminder
 
 
+# ---- Priority Mapping (Legacy numeric -> New enum) ----
+# Database migration history:
+#   Original schema stored a smallint priority (1..4).
+#   Later migrations introduced enum task_priority
+#   ('low','normal','high','critical') and finally replaced the numeric
+#   column with the enum (renaming user_defined_priority -> priority).
+#   Legacy UI / Discord modal still sends numeric values 1..4
+#   representing severity from lowest to highest.
+#   We preserve user-facing labels (Low, Medium, High, Urgent)
+#   while storing the canonical enum.
+# Mapping we apply here (ascending severity):
+#   1 -> 'low'
+#   2 -> 'normal'   (displayed as Medium)
+#   3 -> 'high'
+#   4 -> 'critical' (displayed as Urgent)
+# We also accept historical textual inputs ('urgent','medium') just in case.
+def normalize_priority(value: str) -> str:
+    """Map numeric/legacy priority input to the task_priority enum."""
+    value_lc = value.lower().strip()
+    # Accept direct enum values
+    if value_lc in {"low", "normal", "high", "critical"}:
+        return value_lc
+    # Accept legacy textual synonyms
+    synonyms = {
+        "medium": "normal",
+        "urgent": "critical",
+    }
+    if value_lc in synonyms:
+        return synonyms[value_lc]
+    # Numeric mapping fallback
+    try:
+        num = int(value_lc)
+    except ValueError:
+        num = 2  # default medium/normal
+    num = max(1, min(4, num))
+    numeric_map = {1: "low", 2: "normal", 3: "high", 4: "critical"}
+    return numeric_map.get(num, "normal")
+
+
+# Display labels aligned with original numeric UI while DB keeps canonical enums
+PRIORITY_DISPLAY_LABELS = {
+    "low": "Low 🐢",
+    "normal": "Medium 🐰",
+    "high": "High 🐴",
+    "critical": "Urgent 🦄",
+}
+
+# Upper bound for tickets created from one bulk modal submission
+BULK_TICKET_MAX_ROWS = 50
+# Matches the single-ticket modal title limit
+TICKET_TITLE_MAX_LENGTH = 100
+_BULK_LINE_PREFIX = re.compile(r"^\s*(?:[-*•]|\d+[.)]|\[[ xX]?\])\s+")
+
+
+def parse_bulk_ticket_input(text: str, default_priority: str = "2") -> list[dict[str, Any]]:
+    """Parse bulk ticket text into rows of {title, description, priority}.
+
+    Two formats are accepted:
+      - CSV with a header row containing `title` (or `name`) and optional
+        `description` and `priority` columns.
+      - One ticket per line, optionally bulleted/numbered, with optional
+        `title | priority | description` fields.
+    Priorities are normalized with `normalize_priority`; blank lines are skipped.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return []
+
+    rows: list[dict[str, Any]] = []
+    header = [column.strip().lower() for column in next(csv.reader([lines[0]]))]
+    if "title" in header or "name" in header:
+        for record in csv.DictReader(io.StringIO("\n".join(lines))):
+            normalized = {
+                (key or "").strip().lower(): (value or "").strip() for key, value in record.items()
+            }
+            rows.append(
+                {
+                    "title": normalized.get("title") or normalized.get("name") or "",
+                    "description": normalized.get("description") or None,
+                    "priority": normalized.get("priority") or default_priority,
+                }
+            )
+    else:
+        for line in lines:
+            fields = [field.strip() for field in _BULK_LINE_PREFIX.sub("", line).split("|", 2)]
+            rows.append(
+                {
+                    "title": fields[0],
+                    "priority": (fields[1] if len(fields) > 1 else "") or default_priority,
+                    "description": (fields[2] if len(fields) > 2 else "") or None,
+                }
+            )
+
+    return [
+        {
+            "title": row["title"][:TICKET_TITLE_MAX_LENGTH],
+            "description": row["description"],
+            "priority": normalize_priority(row["priority"]),
+        }
+        for row in rows
+        if row["title"]
+    ]
+
+
 class CommandHandler:
     """Handles Discord slash commands."""
 
     def __init__(self):
         self.discord_client = DiscordClient()
         self.link_shortener = LinkShortener()
+        # Per-stage timings (milliseconds) of the last task/user validation run
+        self.last_validation_timings: dict[str, float] = {}
 
     def get_command_definitions(self) -> list[dict]:
         """Get all slash command definitions."""
@@ -85,7 +195,14 @@ class CommandHandler:
             {
                 "name": "ticket",
                 "description": "Create a new task ticket using interactive selection",
-                "options": [],
+                "options": [
+                    {
+                        "name": "bulk",
+                        "description": "Create many tickets at once from lines or pasted CSV",
+                        "type": 5,  # BOOLEAN
+                        "required": False,
+                    }
+                ],
             },
             {
                 "name": "assign",
@@ -574,11 +691,9 @@ class CommandHandler:
 
             # Create interactive board selection
             user_name = user_info.get("display_name") or user_info.get("handle") or "User"
-            components = self.discord_client.create_board_selection_components(boards_result.data)
-
-            # Update the custom_id to indicate this is for ticket creation
-            if components and components[0].get("components"):
-                components[0]["components"][0]["custom_id"] = "select_board_for_ticket"
+            components = self.discord_client.create_board_selection_components(
+                boards_result.data, "select_board_for_ticket"
+            )
 
             payload = {
                 "content": (
@@ -605,8 +720,12 @@ class CommandHandler:
         app_id: str,
         interaction_token: str,
         user_info: dict | None = None,
+        bulk: bool = False,
     ) -> None:
-        """Handle the /boards command to list available task boards."""
+        """Handle the /boards command to list available task boards.
+
+        When `bulk` is set the selection continues into the bulk ticket modal.
+        """
         if not user_info:
             await self.discord_client.send_response(
                 {"content": "❌ **Error:** Unable to identify user/workspace."},
@@ -652,7 +771,10 @@ class CommandHandler:
 
             # Create interactive board selection
             user_name = user_info.get("display_name") or user_info.get("handle") or "User"
-            components = self.discord_client.create_board_selection_components(boards_result.data)
+            components = self.discord_client.create_board_selection_components(
+                boards_result.data,
+                "select_board_for_bulk_ticket" if bulk else "select_board_for_lists",
+            )
 
             payload = {
                 "content": (
@@ -794,7 +916,12 @@ class CommandHandler:
             )
 
     async def handle_board_selection_interaction(
-        self, app_id: str, interaction_token: str, board_id: str, user_info: dict | None = None
+        self,
+        app_id: str,
+        interaction_token: str,
+        board_id: str,
+        user_info: dict | None = None,
+        bulk: bool = False,
     ) -> None:
         """Handle board selection from select menu."""
         if not user_info:
@@ -863,11 +990,14 @@ class CommandHandler:
 
             # Create interactive list selection
             components = self.discord_client.create_list_selection_components(
-                lists_result.data, board_id
+                lists_result.data,
+                board_id,
+                "select_list_for_bulk_ticket" if bulk else "select_list_for_ticket",
             )
             content = (
-                f"🎫 **Create Ticket - Step 2/2**\n\n**Board:** {board_name}\n\n"
-                "Choose a list to create your ticket in:"
+                f"🎫 **Create Ticket{'s' if bulk else ''} - Step 2/2**\n\n"
+                f"**Board:** {board_name}\n\n"
+                f"Choose a list to create your ticket{'s' if bulk else ''} in:"
             )
 
             payload = {"content": content, "components": components}
@@ -982,44 +1112,6 @@ class CommandHandler:
             description = form_data.get("ticket_description", "").strip() or None
             priority_raw = form_data.get("ticket_priority", "2").strip()
 
-            # ---- Priority Mapping (Legacy numeric -> New enum) ----
-            # Database migration history:
-            #   Original schema stored a smallint priority (1..4).
-            #   Later migrations introduced enum task_priority
-            #   ('low','normal','high','critical') and finally replaced the numeric
-            #   column with the enum (renaming user_defined_priority -> priority).
-            #   Legacy UI / Discord modal still sends numeric values 1..4
-            #   representing severity from lowest to highest.
-            #   We preserve user-facing labels (Low, Medium, High, Urgent)
-            #   while storing the canonical enum.
-            # Mapping we apply here (ascending severity):
-            #   1 -> 'low'
-            #   2 -> 'normal'   (displayed as Medium)
-            #   3 -> 'high'
-            #   4 -> 'critical' (displayed as Urgent)
-            # We also accept historical textual inputs ('urgent','medium') just in case.
-
-            def normalize_priority(value: str) -> str:
-                value_lc = value.lower().strip()
-                # Accept direct enum values
-                if value_lc in {"low", "normal", "high", "critical"}:
-                    return value_lc
-                # Accept legacy textual synonyms
-                synonyms = {
-                    "medium": "normal",
-                    "urgent": "critical",
-                }
-                if value_lc in synonyms:
-                    return synonyms[value_lc]
-                # Numeric mapping fallback
-                try:
-                    num = int(value_lc)
-                except ValueError:
-                    num = 2  # default medium/normal
-                num = max(1, min(4, num))
-                numeric_map = {1: "low", 2: "normal", 3: "high", 4: "critical"}
-                return numeric_map.get(num, "normal")
-
             priority_enum = normalize_priority(priority_raw)
 
             if not title:
@@ -1031,41 +1123,17 @@ class CommandHandler:
                 return
 
             # Validate board and list still exist
-            board_result = (
-                supabase.table("workspace_boards")
-                .select("id, name")
-                .eq("id", board_id)
-                .eq("ws_id", workspace_id)
-                .eq("deleted", False)
-                .execute()
+            error_msg, board_name, list_name = self._validate_ticket_target(
+                supabase, workspace_id, board_id, list_id
             )
-            if not board_result.data:
-                await self.discord_client.send_response(
-                    {"content": "❌ **Error:** Board not found or access denied."},
-                    app_id,
-                    interaction_token,
-                )
-                return
-
-            list_result = (
-                supabase.table("task_lists")
-                .select("id, name")
-                .eq("id", list_id)
-                .eq("board_id", board_id)
-                .eq("deleted", False)
-                .execute()
-            )
-            if not list_result.data:
+            if error_msg:
                 await self.discord_client.send_response(
-                    {"content": "❌ **Error:** List not found or access denied."},
+                    {"content": error_msg},
                     app_id,
                     interaction_token,
                 )
                 return
 
-            board_name = board_result.data[0].get("name", "Unknown Board")
-            list_name = list_result.data[0].get("name", "Unknown List")
-
             # Create the task
             task_payload = {
                 "name": title,
@@ -1089,15 +1157,7 @@ class CommandHandler:
 
             # Format success message
             user_name = user_info.get("display_name") or user_info.get("handle") or "User"
-            # Display labels aligned with original numeric UI
-            # while DB keeps canonical enums
-            display_labels = {
-                "low": "Low 🐢",
-                "normal": "Medium 🐰",
-                "high": "High 🐴",
-                "critical": "Urgent 🦄",
-            }
-            priority_name = display_labels.get(priority_enum, "Medium")
+            priority_name = PRIORITY_DISPLAY_LABELS.get(priority_enum, "Medium")
 
             message = (
                 f"🎫 **Task ticket created by {user_name}!**\n\n"
@@ -1126,6 +1186,169 @@ class CommandHandler:
                 interaction_token,
             )
 
+    @staticmethod
+    def _validate_ticket_target(
+        supabase, workspace_id: str, board_id: str, list_id: str
+    ) -> tuple[str | None, str, str]:
+        """Check the board belongs to the workspace and the list to the board.
+
+        Returns (error_msg, board_name, list_name).
+        """
+        board_result = (
+            supabase.table("workspace_boards")
+            .select("id, name")
+            .eq("id", board_id)
+            .eq("ws_id", workspace_id)
+            .eq("deleted", False)
+            .execute()
+        )
+        if not board_result.data:
+            return ("❌ **Error:** Board not found or access denied.", "", "")
+
+        list_result = (
+            supabase.table("task_lists")
+            .select("id, name")
+            .eq("id", list_id)
+            .eq("board_id", board_id)
+            .eq("deleted", False)
+            .execute()
+        )
+        if not list_result.data:
+            return ("❌ **Error:** List not found or access denied.", "", "")
+
+        return (
+            None,
+            board_result.data[0].get("name", "Unknown Board"),
+            list_result.data[0].get("name", "Unknown List"),
+        )
+
+    async def handle_bulk_ticket_modal_submission(
+        self,
+        app_id: str,
+        interaction_token: str,
+        board_id: str,
+        list_id: str,
+        form_data: dict[str, str],
+        user_info: dict | None = None,
+    ) -> None:
+        """Create many tasks in one list from a bulk ticket modal submission.
+
+        The `ticket_lines` field holds one ticket per line or CSV text (see
+        `parse_bulk_ticket_input`). All tasks are created with a single
+        multi-row insert and reported back in one summary message.
+        """
+        if not user_info:
+            await self.discord_client.send_response(
+                {"content": "❌ **Error:** Unable to identify user/workspace."},
+                app_id,
+                interaction_token,
+            )
+            return
+
+        workspace_id = user_info.get("workspace_id")
+        creator_id = user_info.get("platform_user_id")
+        if not workspace_id or not creator_id:
+            await self.discord_client.send_response(
+                {"content": "❌ **Error:** Missing workspace context."},
+                app_id,
+                interaction_token,
+            )
+            return
+
+        try:
+            tickets = parse_bulk_ticket_input(
+                form_data.get("ticket_lines", ""),
+                form_data.get("ticket_priority", "").strip() or "2",
+            )
+            if not tickets:
+                await self.discord_client.send_response(
+                    {"content": "❌ **Error:** Add at least one ticket title."},
+                    app_id,
+                    interaction_token,
+                )
+                return
+            if len(tickets) > BULK_TICKET_MAX_ROWS:
+                await self.discord_client.send_response(
+                    {
+                        "content": (
+                            f"❌ **Error:** Too many tickets ({len(tickets)}). "
+                            f"Create at most {BULK_TICKET_MAX_ROWS} at a time."
+                        )
+                    },
+                    app_id,
+                    interaction_token,
+                )
+                return
+
+            supabase = get_supabase_client()
+            error_msg, board_name, list_name = self._validate_ticket_target(
+                supabase, workspace_id, board_id, list_id
+            )
+            if error_msg:
+                await self.discord_client.send_response(
+                    {"content": error_msg},
+                    app_id,
+                    interaction_token,
+                )
+                return
+
+            task_payloads = [
+                {
+                    "name": ticket["title"],
+                    "description": ticket["description"],
+                    "list_id": list_id,
+                    "priority": ticket["priority"],
+                    "creator_id": creator_id,
+                    "deleted": False,
+                    "completed": False,
+                    "archived": False,
+                }
+                for ticket in tickets
+            ]
+            task_result = supabase.table("tasks").insert(task_payloads).execute()
+            created = task_result.data or []
+            if not created:
+                raise Exception("Failed to create tasks - empty result")
+
+            user_name = user_info.get("display_name") or user_info.get("handle") or "User"
+            header = (
+                f"🎫 **{len(created)} task ticket(s) created by {user_name}!**\n\n"
+                f"**Board:** {board_name}\n"
+                f"**List:** {list_name}\n\n"
+            )
+            footer = f"\n\n**Link:** https://tuturuuu.com/{workspace_id}/tasks/boards/{board_id}"
+            lines = [
+                f"• {row.get('name')} "
+                f"({PRIORITY_DISPLAY_LABELS.get(row.get('priority'), 'Medium')}) "
+                f"`{row.get('id')}`"
+                for row in created
+            ]
+
+            # Keep the summary within Discord's 2000 character limit
+            available = 1900 - len(header) - len(footer)
+            body_lines: list[str] = []
+            used = 0
+            for index, line in enumerate(lines):
+                if used + len(line) + 1 > available:
+                    body_lines.append(f"… and {len(lines) - index} more")
+                    break
+                body_lines.append(line)
+                used += len(line) + 1
+
+            await self.discord_client.send_response(
+                {"content": header + "\n".join(body_lines) + footer},
+                app_id,
+                interaction_token,
+            )
+
+        except Exception as e:
+            print(f"Error creating bulk tickets: {e}")
+            await self.discord_client.send_response(
+                {"content": f"❌ **Error:** Failed to create task tickets: {e!s}"},
+                app_id,
+                interaction_token,
+            )
+
     def _validate_assign_inputs(
         self, options: list[dict[str, Any]], user_info: dict | None
     ) -> tuple[str | None, str, str, list[str], str]:
@@ -1167,6 +1390,37 @@ class CommandHandler:
 
         return (None, task_id, users_raw, mentioned_ids, workspace_id)
 
+    @staticmethod
+    def _task_ownership_query(supabase, task_id: str):
+        """Build the tasks -> task_lists -> workspace_boards ownership query."""
+        return (
+            supabase.table("tasks")
+            .select(
+                "id, list_id, task_lists!inner(id, board_id, workspace_boards!inner(id, ws_id))"
+            )
+            .eq("id", task_id)
+            .eq("deleted", False)
+        )
+
+    @staticmethod
+    def _remember_task_ownership(task_id: str, rows: list | None) -> TaskOwnership | None:
+        """Parse ownership query rows and update the shared ownership cache."""
+        ownership = task_ownership_from_row(rows[0]) if rows else None
+        if ownership is None:
+            task_ownership_cache.invalidate(task_id)
+        else:
+            task_ownership_cache.set(ownership)
+        return ownership
+
+    async def _get_task_ownership(self, supabase, task_id: str) -> TaskOwnership | None:
+        """Resolve task ownership, served from the cache when possible."""
+        ownership = task_ownership_cache.get(task_id)
+        if ownership is not None:
+            return ownership
+
+        task_result = await asyncio.to_thread(self._task_ownership_query(supabase, task_id).execute)
+        return self._remember_task_ownership(task_id, task_result.data)
+
     async def _validate_task_and_get_users(
         self,
         supabase,
@@ -1176,69 +1430,97 @@ class CommandHandler:
     ) -> tuple[str | None, list[str], dict]:
         """Validate task and get valid user IDs.
 
+        The task ownership check and the mention -> workspace member mapping are
+        independent, so both queries run concurrently. Workspace membership is
+        resolved inside the mapping query through the shared users relation.
+        Callers write to task_assignees next, so ownership is always re-read
+        instead of served from the cache: a task deleted or moved since it was
+        cached must not pick up new assignments. The fresh row still refreshes
+        the cache for read-only commands.
+        Per-stage timings are logged and kept in `last_validation_timings`.
+
         Returns (error_msg, valid_user_ids, member_rows_data).
         If error_msg is not None, validation failed.
         """
-        # Validate task and derive workspace via joins
-        task_result = (
-            supabase.table("tasks")
+        timings: dict[str, float] = {}
+
+        async def run_timed(stage: str, query):
+            started = time.perf_counter()
+            try:
+                # supabase-py is synchronous; run queries in threads to overlap them
+                return await asyncio.to_thread(query.execute)
+            finally:
+                timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+
+        # Map discord_user_ids -> platform_user_ids that are members of this workspace
+        member_query = (
+            supabase.table("discord_guild_members")
             .select(
-                "id, list_id, task_lists!inner(id, board_id, workspace_boards!inner(id, ws_id))"
+                "discord_user_id, platform_user_id, users!inner(workspace_members!inner(ws_id))"
             )
-            .eq("id", task_id)
-            .eq("deleted", False)
-            .execute()
+            .in_("discord_user_id", mentioned_ids)
+            .eq("users.workspace_members.ws_id", workspace_id)
         )
-        if not task_result.data:
-            return ("❌ **Error:** Task not found or deleted.", [], {})
 
-        task_row = task_result.data[0]
-        # Extract ws_id safely
-        ws_via_task = ((task_row.get("task_lists") or {}).get("workspace_boards") or {}).get(
-            "ws_id"
+        started = time.perf_counter()
+        task_result, member_rows = await asyncio.gather(
+            run_timed("task_ms", self._task_ownership_query(supabase, task_id)),
+            run_timed("members_ms", member_query),
         )
-        if not ws_via_task or ws_via_task != workspace_id:
-            return ("❌ **Error:** Task does not belong to your workspace.", [], {})
+        ownership = self._remember_task_ownership(task_id, task_result.data)
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self.last_validation_timings = timings
+        print(f"🤖: assign validation timings (ms): {timings}")
 
-        # Map discord_user_ids -> platform_user_ids in same workspace
-        member_rows = (
-            supabase.table("discord_guild_members")
-            .select("discord_user_id, platform_user_id, discord_guild_id")
-            .in_("discord_user_id", mentioned_ids)
-            .execute()
-        )
+        if ownership is None:
+            return ("❌ **Error:** Task not found or deleted.", [], {})
+        if ownership.ws_id != workspace_id:
+            return ("❌ **Error:** Task does not belong to your workspace.", [], {})
 
-        if not member_rows.data:
-            return (
-                "❌ **Error:** None of the mentioned users are linked to any workspace.",
-                [],
-                {},
+        valid_user_ids = list(
+            dict.fromkeys(
+                r.get("platform_user_id")
+                for r in (member_rows.data or [])
+                if r.get("platform_user_id")
             )
-
-        # Filter those belonging to the same workspace via workspace_members
-        platform_ids = [
-            r.get("platform_user_id") for r in member_rows.data if r.get("platform_user_id")
-        ]
-        if not platform_ids:
-            return ("❌ **Error:** Unable to resolve mentioned users.", [], {})
-
-        wm_rows = (
-            supabase.table("workspace_members")
-            .select("user_id")
-            .eq("ws_id", workspace_id)
-            .in_("user_id", platform_ids)
-            .execute()
         )
-        valid_user_ids = [r.get("user_id") for r in (wm_rows.data or []) if r.get("user_id")]
         if not valid_user_ids:
             return (
-                "❌ **Error:** Mentioned users are not members of this workspace.",
+                "❌ **Error:** Mentioned users are not linked members of this workspace.",
                 [],
                 {},
             )
 
         return (None, valid_user_ids, member_rows.data)
 
+    @staticmethod
+    def _platform_to_discord_map(member_rows_data: list[dict[str, Any]]) -> dict[str, str]:
+        """Build a platform_user_id -> discord_user_id map from guild member rows."""
+        return {
+            r["platform_user_id"]: r["discord_user_id"]
+            for r in (member_rows_data or [])
+            if r.get("platform_user_id") and r.get("discord_user_id")
+        }
+
+    @staticmethod
+    def _format_user_mentions(user_ids: list[str], discord_map: dict[str, str]) -> str:
+        """Render platform user IDs as Discord mentions where a mapping exists."""
+        mentions = [f"<@{discord_map[uid]}>" for uid in user_ids if uid in discord_map]
+        return ", ".join(mentions) if mentions else "(no resolvable mentions)"
+
+    @staticmethod
+    def _unresolved_mentions(
+        mentioned_ids: list[str], valid_user_ids: list[str], member_rows_data: list[dict[str, Any]]
+    ) -> list[str]:
+        """Return mentions that did not resolve to a member of the workspace."""
+        valid = set(valid_user_ids)
+        resolved = {
+            r.get("discord_user_id")
+            for r in (member_rows_data or [])
+            if r.get("platform_user_id") in valid
+        }
+        return [f"<@{did}>" for did in dict.fromkeys(mentioned_ids) if did not in resolved]
+
     async def handle_assign_command(
         self,
         app_id: str,
@@ -1258,8 +1540,8 @@ class CommandHandler:
           3. Parse mentions -> discord_user_ids
           4. Map discord_user_ids -> platform_user_ids
              (must belong to same workspace)
-          5. Insert rows into task assignments table (assumed schema).
-             If table absent, respond with informative error.
+          5. Insert all rows into task_assignees in one upsert that ignores
+             existing (task_id, user_id) pairs, then report per-user outcomes.
         """
         # Validate inputs
         error_msg, task_id, _users_raw, mentioned_ids, workspace_id = self._validate_assign_inputs(
@@ -1288,52 +1570,55 @@ class CommandHandler:
                 )
                 return
 
-            # Insert assignments. Assume a table task_assignees
-            # (task_id uuid, user_id uuid, created_at timestamptz, unique(task_id,user_id))
-            # We'll upsert-like by ignoring conflicts if Supabase configured with unique constraint
-            # (client lacks native upsert for simple ignore w/out update in python, so try/except
-            # duplicates)
-            inserted = 0
-            new_mentions: list[str] = []
-            # Build map discord_user_id -> platform_user_id for quick reverse lookup
-            discord_to_platform = {
-                r.get("platform_user_id"): r.get("discord_user_id")
-                for r in (member_rows_data or [])
-                if r.get("platform_user_id") and r.get("discord_user_id")
-            }
-            for uid in valid_user_ids:
-                try:
-                    res = (
-                        supabase.table("task_assignees")
-                        .insert({"task_id": task_id, "user_id": uid})
-                        .execute()
-                    )
-                    if res.data:
-                        inserted += 1
-                        discord_id = discord_to_platform.get(uid)
-                        if discord_id:
-                            new_mentions.append(f"<@{discord_id}>")
-                except Exception as e:  # likely duplicate
-                    print(f"Assign duplicate or error for user {uid}: {e}")
-                    continue
+            discord_map = self._platform_to_discord_map(member_rows_data)
+            user_ids = list(dict.fromkeys(valid_user_ids))
+
+            # Single set-based insert. task_assignees has PK (task_id, user_id), so
+            # ignore_duplicates turns existing assignments into no-ops and PostgREST
+            # returns only the rows that were actually inserted. Any other error
+            # (FK violation, permissions, ...) propagates instead of being treated
+            # as a duplicate.
+            insert_result = (
+                supabase.table("task_assignees")
+                .upsert(
+                    [{"task_id": task_id, "user_id": uid} for uid in user_ids],
+                    on_conflict="task_id,user_id",
+                    ignore_duplicates=True,
+                )
+                .execute()
+            )
+            inserted_ids = {r.get("user_id") for r in (insert_result.data or [])}
+            added = [uid for uid in user_ids if uid in inserted_ids]
+            already_assigned = [uid for uid in user_ids if uid not in inserted_ids]
 
-            # Prepare response
-            if inserted == 0:
-                message = "i No new assignees added (they might already be assigned)."
+            # Prepare response with per-user outcomes
+            lines: list[str] = []
+            if added:
+                lines.append(
+                    f"✅ Added {len(added)} assignee(s) to task `{task_id}`: "
+                    f"{self._format_user_mentions(added, discord_map)}"
+                )
             else:
-                mention_list = (
-                    ", ".join(new_mentions) if new_mentions else "(no resolvable mentions)"
+                lines.append(f"i No new assignees added to task `{task_id}`.")
+            if already_assigned:
+                lines.append(
+                    "i Already assigned: "
+                    f"{self._format_user_mentions(already_assigned, discord_map)}"
                 )
-                message = f"✅ Added {inserted} assignee(s) to task `{task_id}`: {mention_list}"
+            skipped = self._unresolved_mentions(mentioned_ids, user_ids, member_rows_data)
+            if skipped:
+                lines.append(f"⚠️ Not in this workspace: {', '.join(skipped)}")
 
             await self.discord_client.send_response(
-                {"content": message},
+                {"content": "\n".join(lines)},
                 app_id,
                 interaction_token,
             )
 
         except Exception as e:
             print(f"Error in assign command: {e}")
+            # The task may have been deleted or moved since it was cached
+            task_ownership_cache.invalidate(task_id)
             await self.discord_client.send_response(
                 {"content": f"❌ **Error:** Failed to assign users: {e}"},
                 app_id,
@@ -1349,7 +1634,7 @@ class CommandHandler:
     ) -> None:
         """Handle the /unassign command to remove users from a task.
 
-        Logic mirrors /assign but deletes rows from task_assignees.
+        Logic mirrors /assign but deletes rows from task_assignees in one query.
         """
         # Validate inputs
         error_msg, task_id, _users_raw, mentioned_ids, workspace_id = self._validate_assign_inputs(
@@ -1378,52 +1663,46 @@ class CommandHandler:
                 )
                 return
 
-            # Delete assignments
-            removed = 0
-            removed_mentions: list[str] = []
-            # Build map platform_user_id -> discord_user_id for mention reconstruction
-            discord_map = {
-                r.get("platform_user_id"): r.get("discord_user_id")
-                for r in (member_rows_data or [])
-                if r.get("platform_user_id") and r.get("discord_user_id")
-            }
-            for uid in valid_user_ids:
-                try:
-                    # Delete where matches task & user
-                    del_res = (
-                        supabase.table("task_assignees")
-                        .delete()
-                        .eq("task_id", task_id)
-                        .eq("user_id", uid)
-                        .execute()
-                    )
-                    if del_res.data:
-                        removed += len(del_res.data)
-                        discord_id = discord_map.get(uid)
-                        if discord_id:
-                            removed_mentions.append(f"<@{discord_id}>")
-                except Exception as e:
-                    print(f"Unassign error for user {uid}: {e}")
-                    continue
+            discord_map = self._platform_to_discord_map(member_rows_data)
+            user_ids = list(dict.fromkeys(valid_user_ids))
 
-            if removed == 0:
-                message = "i No assignees were removed (they may not have been assigned)."
-            else:
-                mention_list = (
-                    ", ".join(removed_mentions) if removed_mentions else "(no resolvable mentions)"
+            # Single set-based delete; PostgREST returns the rows actually removed.
+            delete_result = (
+                supabase.table("task_assignees")
+                .delete()
+                .eq("task_id", task_id)
+                .in_("user_id", user_ids)
+                .execute()
+            )
+            removed_ids = {r.get("user_id") for r in (delete_result.data or [])}
+            removed = [uid for uid in user_ids if uid in removed_ids]
+            not_assigned = [uid for uid in user_ids if uid not in removed_ids]
+
+            lines: list[str] = []
+            if removed:
+                lines.append(
+                    f"✅ Removed {len(removed)} assignment(s) from task `{task_id}`: "
+                    f"{self._format_user_mentions(removed, discord_map)}"
                 )
-                message = (
-                    f"✅ Removed {removed} assignment(s) from task `{task_id}`: {mention_list}"
+            else:
+                lines.append(f"i No assignees were removed from task `{task_id}`.")
+            if not_assigned:
+                lines.append(
+                    f"i Not assigned: {self._format_user_mentions(not_assigned, discord_map)}"
                 )
+            skipped = self._unresolved_mentions(mentioned_ids, user_ids, member_rows_data)
+            if skipped:
+                lines.append(f"⚠️ Not in this workspace: {', '.join(skipped)}")
 
             await self.discord_client.send_response(
-                {"content": message},
+                {"content": "\n".join(lines)},
                 app_id,
                 interaction_token,
             )
 
         except Exception as e:
             print(f"Error in unassign command: {e}")
+            task_ownership_cache.invalidate(task_id)
             await self.discord_client.send_response(
                 {"content": f"❌ **Error:** Failed to unassign users: {e}"},
                 app_id,
@@ -1476,16 +1755,8 @@ class CommandHandler:
             supabase = get_supabase_client()
 
             # Validate task belongs to workspace
-            task_result = (
-                supabase.table("tasks")
-                .select(
-                    "id, list_id, task_lists!inner(id, board_id, workspace_boards!inner(id, ws_id))"
-                )
-                .eq("id", task_id)
-                .eq("deleted", False)
-                .execute()
-            )
-            if not task_result.data:
+            ownership = await self._get_task_ownership(supabase, task_id)
+            if ownership is None:
                 await self.discord_client.send_response(
                     {"content": "❌ **Error:** Task not found or deleted."},
                     app_id,
@@ -1493,11 +1764,7 @@ class CommandHandler:
                 )
                 return
 
-            task_row = task_result.data[0]
-            ws_via_task = ((task_row.get("task_lists") or {}).get("workspace_boards") or {}).get(
-                "ws_id"
-            )
-            if not ws_via_task or ws_via_task != workspace_id:
+            if ownership.ws_id != workspace_id:
                 await self.discord_client.send_response(
                     {"content": "❌ **Error:** Task does not belong to your workspace."},
                     app_id,
@@ -2106,56 +2373,3 @@ class CommandHandler:
         except Exception as e:
             print(f"Error in board selection: {e}")
             return {"content": f"❌ **Error:** Failed to load lists: {e!s}", "components": []}
-
-    def create_ticket_form_modal(self, list_id: str, _user_info: dict | None = None) -> dict:
-        """Create ticket form modal data."""
-        try:
-            supabase = get_supabase_client()
-
-            # Get list information including board details
-            list_result = (
-                supabase.table("task_lists")
-                .select("id, name, board_id, workspace_boards!inner(id, name)")
-                .eq("id", list_id)
-                .eq("deleted", False)
-                .execute()
-            )
-
-            if not list_result.data:
-                # Return error instead of invalid modal
-                return {
-                    "type": DiscordResponseType.CHANNEL_MESSAGE_WITH_SOURCE,
-                    "data": {
-                        "content": "❌ **Error:** List not found.",
-                        "flags": 64,  # EPHEMERAL flag
-                    },
-                }
-
-            list_data = list_result.data[0]
-            list_name = list_data.get("name", "Unknown List")
-            board_id = list_data.get("board_id")
-            board_name = list_data.get("workspace_boards", {}).get("name", "Unknown Board")
-
-            if not board_id:
-                return {
-                    "type": DiscordResponseType.CHANNEL_MESSAGE_WITH_SOURCE,
-                    "data": {
-                        "content": "❌ **Error:** Board information not found.",
-                        "flags": 64,  # EPHEMERAL flag
-                    },
-                }
-
-            return self.discord_client.create_ticket_form_modal(
-                board_id, list_id, board_name, list_name
-            )
-
-        except Exception as e:
-            print(f"Error creating modal: {e}")
-            # Return error instead of invalid modal
-            return {
-                "type": DiscordResponseType.CHANNEL_MESSAGE_WITH_SOURCE,
-                "data": {
-                    "content": f"❌ **Error:** Failed to create ticket form: {e!s}",
-                    "flags": 64,  # EPHEMERAL flag
-                },
-            }
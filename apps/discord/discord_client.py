@@ -6,6 +6,11 @@ from typing import Any
 
 import aiohttp
 
+# Discord caps select option values and custom_ids at 100 characters.
+SELECT_OPTION_VALUE_MAX_LENGTH = 100
+# Discord caps modal titles at 45 characters.
+MODAL_TITLE_MAX_LENGTH = 45
+
 
 class DiscordAPIError(RuntimeError):
     """Base exception for Discord API failures."""
@@ -114,7 +119,9 @@ class DiscordClient:
             raise
 
     @staticmethod
-    def create_board_selection_components(boards: list) -> list:
+    def create_board_selection_components(
+        boards: list, custom_id: str = "select_board_for_lists"
+    ) -> list:
         """Create interactive components for board selection."""
         if not boards:
             return []
@@ -139,7 +146,7 @@ class DiscordClient:
 
         select_menu = {
             "type": 3,  # SELECT_MENU
-            "custom_id": "select_board_for_lists",
+            "custom_id": custom_id,
             "placeholder": "Choose a board to see its lists...",
             "options": options,
         }
@@ -206,7 +213,9 @@ class DiscordClient:
                 )
 
     @staticmethod
-    def create_list_selection_components(lists: list, board_id: str) -> list:
+    def create_list_selection_components(
+        lists: list, board_id: str, custom_id: str = "select_list_for_ticket"
+    ) -> list:
         """Create interactive components for list selection."""
         if not lists:
             return []
@@ -236,14 +245,17 @@ class DiscordClient:
             options.append(
                 {
                     "label": display_name,
-                    "value": f"{board_id}|{list_id}",  # Encode both IDs
+                    # Encode IDs and name so the modal can be built without a DB lookup
+                    "value": DiscordClient.encode_list_selection_value(
+                        board_id, list_id, list_name
+                    ),
                     "description": f"Status: {status.replace('_', ' ').title()}",
                 }
             )
 
         select_menu = {
             "type": 3,  # SELECT_MENU
-            "custom_id": "select_list_for_ticket",
+            "custom_id": custom_id,
             "placeholder": "Choose a list to create a ticket...",
             "options": options,
         }
@@ -255,16 +267,49 @@ class DiscordClient:
             }
         ]
 
+    @staticmethod
+    def encode_list_selection_value(board_id: str, list_id: str, list_name: str) -> str:
+        """Encode board/list IDs and the list name into a select option value.
+
+        The list name is truncated to fit Discord's option value limit; it is only
+        used for display, so IDs are always kept intact.
+        """
+        prefix = f"{board_id}|{list_id}|"
+        available = max(0, SELECT_OPTION_VALUE_MAX_LENGTH - len(prefix))
+        return prefix + list_name.strip()[:available]
+
+    @staticmethod
+    def parse_list_selection_value(value: str) -> tuple[str, str, str] | None:
+        """Parse a list select option value into (board_id, list_id, list_name).
+
+        Accepts both the current `board|list|name` format and the legacy
+        `board|list` format. Returns None when the value cannot be parsed.
+        """
+        parts = value.split("|", 2)
+        if len(parts) < 2:
+            return None
+
+        board_id, list_id = parts[0].strip(), parts[1].strip()
+        if not board_id or not list_id:
+            return None
+
+        list_name = parts[2].strip() if len(parts) == 3 else ""
+        return board_id, list_id, list_name or "Selected List"
+
     @staticmethod
     def create_ticket_form_modal(
         board_id: str, list_id: str, _board_name: str, list_name: str
     ) -> dict:
         """Create a modal form for ticket creation."""
+        title = f"Create Ticket: {list_name}"
+        if len(title) > MODAL_TITLE_MAX_LENGTH:
+            title = title[: MODAL_TITLE_MAX_LENGTH - 3] + "..."
+
         return {
             "type": 9,  # MODAL
             "data": {
                 "custom_id": f"ticket_form|{board_id}|{list_id}",
-                "title": f"Create Ticket: {list_name}",
+                "title": title,
                 "components": [
                     {
                         "type": 1,  # ACTION_ROW
@@ -312,3 +357,52 @@ class DiscordClient:
                 ],
             },
         }
+
+    @staticmethod
+    def create_bulk_ticket_form_modal(board_id: str, list_id: str, list_name: str) -> dict:
+        """Create a modal form for creating many tickets in one list."""
+        title = f"Bulk Tickets: {list_name}"
+        if len(title) > MODAL_TITLE_MAX_LENGTH:
+            title = title[: MODAL_TITLE_MAX_LENGTH - 3] + "..."
+
+        return {
+            "type": 9,  # MODAL
+            "data": {
+                "custom_id": f"bulk_ticket_form|{board_id}|{list_id}",
+                "title": title,
+                "components": [
+                    {
+                        "type": 1,  # ACTION_ROW
+                        "components": [
+                            {
+                                "type": 4,  # TEXT_INPUT
+                                "custom_id": "ticket_lines",
+                                "label": "One ticket per line, or CSV with a header",
+                                "style": 2,  # PARAGRAPH
+                                "placeholder": (
+                                    "Fix login bug | 3 | Users get logged out\n"
+                                    "Update onboarding docs"
+                                ),
+                                "required": True,
+                                "max_length": 4000,
+                            }
+                        ],
+                    },
+                    {
+                        "type": 1,  # ACTION_ROW
+                        "components": [
+                            {
+                                "type": 4,  # TEXT_INPUT
+                                "custom_id": "ticket_priority",
+                                "label": "Default priority (1=Low ... 4=Urgent)",
+                                "style": 1,  # SHORT
+                                "placeholder": "2",
+                                "required": False,
+                                "min_length": 1,
+                                "max_length": 1,
+                            }
+                        ],
+                    },
+                ],
+            },
+        }
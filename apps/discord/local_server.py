@@ -1,18 +1,36 @@
 import logging
+from contextlib import asynccontextmanager
+from typing import Literal
 
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
-from markitdown_service import handle_markitdown
+from markitdown_formats import ConversionLimits
+from markitdown_sections import SplitBy, iter_markdown_ndjson, iter_markdown_text
+from markitdown_service import (
+    MAX_MARKITDOWN_BATCH_ITEMS,
+    MarkitdownSource,
+    handle_markitdown,
+    stream_markitdown_batch,
+    warm_markitdown_converters,
+)
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Local MarkItDown Service")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    warm_markitdown_converters()
+    yield
+
+
+app = FastAPI(title="Local MarkItDown Service", lifespan=lifespan)
 
 
 class MarkitdownRequest(BaseModel):
@@ -20,6 +38,22 @@ class MarkitdownRequest(BaseModel):
     url: str | None = None
     filename: str | None = None
     enable_plugins: bool = True
+    # `markdown` streams the text; `ndjson` streams sections, optionally split.
+    response_format: Literal["json", "markdown", "ndjson"] = "json"
+    split_by: SplitBy | None = None
+    # Partial conversion for previews: first pages, spreadsheet rows or text bytes.
+    max_pages: int | None = Field(default=None, ge=1)
+    max_rows: int | None = Field(default=None, ge=1)
+    max_bytes: int | None = Field(default=None, ge=1)
+
+    def limits(self) -> ConversionLimits:
+        return ConversionLimits(
+            max_pages=self.max_pages, max_rows=self.max_rows, max_bytes=self.max_bytes
+        )
+
+
+class MarkitdownBatchRequest(BaseModel):
+    items: list[MarkitdownRequest] = Field(min_length=1, max_length=MAX_MARKITDOWN_BATCH_ITEMS)
 
 
 @app.get("/health")
@@ -31,11 +65,12 @@ async def health_endpoint():
 async def markitdown_endpoint(payload: MarkitdownRequest):
     """Convert a Supabase signed file URL into markdown using MarkItDown."""
     try:
-        return await handle_markitdown(
+        result = await handle_markitdown(
             payload.signed_url.strip() if payload.signed_url else None,
             payload.filename,
             payload.enable_plugins,
             url=payload.url.strip() if payload.url else None,
+            limits=payload.limits(),
         )
     except HTTPException:
         raise
@@ -43,6 +78,35 @@ async def markitdown_endpoint(payload: MarkitdownRequest):
         logger.exception("markitdown conversion failed")
         raise HTTPException(status_code=500, detail="Failed to convert file") from error
 
+    if payload.response_format == "markdown":
+        return StreamingResponse(
+            iter_markdown_text(str(result["markdown"])),
+            media_type="text/markdown; charset=utf-8",
+        )
+    if payload.response_format == "ndjson":
+        return StreamingResponse(
+            iter_markdown_ndjson(result, payload.split_by), media_type="application/x-ndjson"
+        )
+    return result
+
+
+@app.post("/markitdown/batch")
+async def markitdown_batch_endpoint(payload: MarkitdownBatchRequest):
+    """Convert many sources, streaming one NDJSON result per source as it finishes."""
+    sources = [
+        MarkitdownSource(
+            signed_url=item.signed_url,
+            url=item.url,
+            filename=item.filename,
+            enable_plugins=item.enable_plugins,
+            max_pages=item.max_pages,
+            max_rows=item.max_rows,
+            max_bytes=item.max_bytes,
+        )
+        for item in payload.items
+    ]
+    return StreamingResponse(stream_markitdown_batch(sources), media_type="application/x-ndjson")
+
 
 if __name__ == "__main__":
     print("🚀 Starting local MarkItDown service on http://localhost:8000")
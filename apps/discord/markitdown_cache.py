@@ -0,0 +1,222 @@
+"""Memory and disk LRU cache of MarkItDown conversion results."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MARKITDOWN_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_MARKITDOWN_CACHE_DISK_BYTES = 512 * 1024 * 1024
+DEFAULT_MARKITDOWN_CACHE_DIR = Path(tempfile.gettempdir()) / "tuturuuu-markitdown-cache"
+
+
+@dataclass(frozen=True)
+class CachedConversion:
+    markdown: str
+    title: str | None
+    partial: bool = False
+
+
+def conversion_cache_key(identity: str, *, enable_plugins: bool, extension: str = "") -> str:
+    """Hash a source identity with the settings that change the converted output."""
+    material = f"{identity}\0{int(enable_plugins)}\0{extension.lower()}"
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class MarkdownConversionCache:
+    """Thread-safe two-level LRU cache keyed by `conversion_cache_key`.
+
+    AI workflows re-request the same Supabase objects and YouTube videos, so
+    results are kept in memory and on local disk, each bounded by the total
+    size of the stored markdown. A memory miss that hits disk is promoted back
+    into memory.
+
+    The disk directory is scanned once, oldest mtime first, into an index of
+    file sizes that writes and hits keep up to date, so eviction never lists
+    the directory again. Hits still touch the file so a restart sees the same
+    recency. Async callers use `aget` and `aset`, which answer memory hits
+    inline and run disk I/O in a worker thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory_max_bytes: int = DEFAULT_MARKITDOWN_CACHE_MEMORY_BYTES,
+        disk_max_bytes: int = DEFAULT_MARKITDOWN_CACHE_DISK_BYTES,
+        disk_dir: Path | None = DEFAULT_MARKITDOWN_CACHE_DIR,
+    ):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_dir = disk_dir if disk_max_bytes > 0 else None
+        self._entries: OrderedDict[str, CachedConversion] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_entries: OrderedDict[str, int] | None = None
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+
+    def get(self, key: str) -> CachedConversion | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def set(self, key: str, entry: CachedConversion) -> None:
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    async def aget(self, key: str) -> CachedConversion | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if self.disk_dir is None:
+            return None
+        entry = await asyncio.to_thread(self._read_disk, key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    async def aset(self, key: str, entry: CachedConversion) -> None:
+        self._remember(key, entry)
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _remember(self, key: str, entry: CachedConversion) -> None:
+        size = _entry_size(entry)
+        if size > self.memory_max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= _entry_size(previous)
+            self._entries[key] = entry
+            self._memory_bytes += size
+            while self._memory_bytes > self.memory_max_bytes:
+                _evicted_key, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= _entry_size(evicted)
+
+    def _disk_path(self, key: str) -> Path | None:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> CachedConversion | None:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            raw = path.read_bytes()
+            payload = json.loads(raw)
+            path.touch()
+        except (OSError, ValueError):
+            self._forget_disk(key)
+            return None
+        self._track_disk(key, len(raw))
+        return CachedConversion(
+            markdown=payload["markdown"],
+            title=payload.get("title"),
+            partial=payload.get("partial", False),
+        )
+
+    def _write_disk(self, key: str, entry: CachedConversion) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        content = json.dumps(
+            {"markdown": entry.markdown, "title": entry.title, "partial": entry.partial}
+        ).encode()
+        if len(content) > self.disk_max_bytes:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            temporary_path.write_bytes(content)
+            temporary_path.replace(path)
+        except OSError:
+            logger.exception("markitdown cache write failed")
+            return
+
+        for evicted_key in self._track_disk(key, len(content)):
+            evicted_path = self._disk_path(evicted_key)
+            if evicted_path is not None:
+                evicted_path.unlink(missing_ok=True)
+
+    def _load_disk_entries(self) -> OrderedDict[str, int]:
+        # Called with `_disk_lock` held; only the first disk access scans.
+        if self._disk_entries is None:
+            files = []
+            if self.disk_dir is not None:
+                for path in self.disk_dir.glob("*.json"):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, path.stem, stat.st_size))
+            self._disk_entries = OrderedDict((key, size) for _mtime, key, size in sorted(files))
+            self._disk_bytes = sum(self._disk_entries.values())
+        return self._disk_entries
+
+    def _track_disk(self, key: str, size: int) -> list[str]:
+        """Record `key` as the most recent disk entry; return keys to evict."""
+        with self._disk_lock:
+            entries = self._load_disk_entries()
+            self._disk_bytes += size - entries.pop(key, 0)
+            entries[key] = size
+            evicted = []
+            while self._disk_bytes > self.disk_max_bytes and len(entries) > 1:
+                evicted_key, evicted_size = entries.popitem(last=False)
+                self._disk_bytes -= evicted_size
+                evicted.append(evicted_key)
+            return evicted
+
+    def _forget_disk(self, key: str) -> None:
+        with self._disk_lock:
+            if self._disk_entries is not None:
+                self._disk_bytes -= self._disk_entries.pop(key, 0)
+
+
+def _entry_size(entry: CachedConversion) -> int:
+    return len(entry.markdown) + len(entry.title or "")
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+markitdown_cache = MarkdownConversionCache(
+    memory_max_bytes=_int_env(
+        "MARKITDOWN_CACHE_MEMORY_BYTES", DEFAULT_MARKITDOWN_CACHE_MEMORY_BYTES
+    ),
+    disk_max_bytes=_int_env("MARKITDOWN_CACHE_DISK_BYTES", DEFAULT_MARKITDOWN_CACHE_DISK_BYTES),
+    disk_dir=Path(os.getenv("MARKITDOWN_CACHE_DIR") or DEFAULT_MARKITDOWN_CACHE_DIR),
+)
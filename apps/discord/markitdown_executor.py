@@ -0,0 +1,216 @@
+"""Admission control and process-pool execution for MarkItDown conversions.
+
+PDF, Office and audio conversions are CPU-bound and hold the GIL, so running
+them on threads in the web container starves the Discord interaction endpoint
+served by the same event loop. Conversions instead run in a small process
+pool, behind a limit on conversions in flight (optionally per format). A
+request that cannot get a slot within the queue timeout, or arrives while the
+wait queue is full, gets a 429 so callers back off instead of piling up.
+"""
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from collections.abc import AsyncIterator, Callable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MARKITDOWN_MAX_CONCURRENT_CONVERSIONS = min(4, os.cpu_count() or 1)
+DEFAULT_MARKITDOWN_QUEUE_TIMEOUT_SECONDS = 30.0
+SPOOL_COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def parse_format_limits(value: str | None) -> dict[str, int]:
+    """Parse `pdf=2,mp3=1` into per-extension concurrency limits."""
+    limits: dict[str, int] = {}
+    for raw_entry in (value or "").split(","):
+        name, _, limit = raw_entry.partition("=")
+        name = name.strip().lower().lstrip(".")
+        try:
+            parsed = int(limit)
+        except ValueError:
+            continue
+        if name and parsed > 0:
+            limits[name] = parsed
+    return limits
+
+
+class ConversionAdmission:
+    """Bounds conversions in flight, overall and per format, with a bounded wait."""
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int = DEFAULT_MARKITDOWN_MAX_CONCURRENT_CONVERSIONS,
+        max_queued: int | None = None,
+        queue_timeout_seconds: float = DEFAULT_MARKITDOWN_QUEUE_TIMEOUT_SECONDS,
+        format_limits: Mapping[str, int] | None = None,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = self.max_in_flight * 4 if max_queued is None else max_queued
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._format_slots = {
+            name: asyncio.Semaphore(limit) for name, limit in (format_limits or {}).items()
+        }
+        self.waiting = 0
+        self.rejected = 0
+
+    @contextlib.asynccontextmanager
+    async def admit(
+        self, conversion_format: str, *, queue_limits: bool = True
+    ) -> AsyncIterator[None]:
+        """Hold a conversion slot for the duration of the block.
+
+        Batch items pass `queue_limits=False`: their batch already caps how
+        many of them wait, so they are neither turned away by a full wait
+        queue nor by the queue timeout.
+        """
+        if queue_limits and self._slots.locked() and self.waiting >= self.max_queued:
+            self._reject(conversion_format, "queue full")
+
+        semaphores = [
+            semaphore
+            for semaphore in (self._format_slots.get(conversion_format), self._slots)
+            if semaphore is not None
+        ]
+        acquired: list[asyncio.Semaphore] = []
+        self.waiting += 1
+        try:
+            # The format slot is taken first so a request waiting on its format
+            # limit never holds a global slot that other formats could use.
+            async with asyncio.timeout(self.queue_timeout_seconds if queue_limits else None):
+                for semaphore in semaphores:
+                    await semaphore.acquire()
+                    acquired.append(semaphore)
+        except BaseException as error:
+            # Timed out or cancelled while queued: give back any slot already taken.
+            for semaphore in acquired:
+                semaphore.release()
+            if isinstance(error, TimeoutError):
+                self._reject(conversion_format, "queue timeout")
+            raise
+        finally:
+            self.waiting -= 1
+
+        try:
+            yield
+        finally:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+    def _reject(self, conversion_format: str, reason: str) -> None:
+        self.rejected += 1
+        logger.warning(
+            "markitdown conversion rejected",
+            extra={"format": conversion_format, "reason": reason, "waiting": self.waiting},
+        )
+        raise HTTPException(
+            status_code=429,
+            detail="MarkItDown is busy; retry later",
+            headers={"Retry-After": str(max(1, round(self.queue_timeout_seconds)))},
+        )
+
+
+class ConversionProcessPool:
+    """Lazily started process pool; `workers=0` runs conversions on threads."""
+
+    def __init__(self, workers: int, initializer: Callable[[], None] | None = None):
+        self.workers = workers
+        self._initializer = initializer
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        if self.workers <= 0:
+            return await asyncio.to_thread(function, *args)
+
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self._initializer,
+            )
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        except BrokenProcessPool:
+            # A worker died (usually out of memory); start fresh for the next request.
+            logger.exception("markitdown process pool broke; restarting it")
+            self.shutdown()
+            raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def spool_for_worker(stream: BinaryIO, max_inline_bytes: int) -> bytes | str:
+    """Prepare a download buffer for a conversion worker.
+
+    Inputs up to `max_inline_bytes` are already in memory and are passed as
+    bytes. Larger ones are passed as a file path, so the document is never
+    read whole or pickled through a process pool's pipe. A stream that is
+    already a named file is passed by its own path; anything else is copied in
+    chunks to a named temp file, which the caller deletes.
+    """
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(0)
+    if size <= max_inline_bytes:
+        return stream.read()
+
+    name = getattr(stream, "name", None)
+    if isinstance(name, str) and Path(name).is_file():
+        stream.flush()
+        return name
+
+    spool = tempfile.NamedTemporaryFile(prefix="markitdown-", delete=False)  # noqa: SIM115
+    try:
+        with spool:
+            shutil.copyfileobj(stream, spool, SPOOL_COPY_CHUNK_BYTES)
+    except BaseException:
+        Path(spool.name).unlink(missing_ok=True)
+        raise
+    return spool.name
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+def conversion_admission_from_env() -> ConversionAdmission:
+    max_in_flight = _int_env(
+        "MARKITDOWN_MAX_CONCURRENT_CONVERSIONS", DEFAULT_MARKITDOWN_MAX_CONCURRENT_CONVERSIONS
+    )
+    return ConversionAdmission(
+        max_in_flight=max_in_flight,
+        max_queued=_int_env("MARKITDOWN_MAX_QUEUED_CONVERSIONS", max(1, max_in_flight) * 4),
+        queue_timeout_seconds=_float_env(
+            "MARKITDOWN_QUEUE_TIMEOUT_SECONDS", DEFAULT_MARKITDOWN_QUEUE_TIMEOUT_SECONDS
+        ),
+        format_limits=parse_format_limits(os.getenv("MARKITDOWN_FORMAT_LIMITS")),
+    )
+
+
+def conversion_process_workers_from_env() -> int:
+    return _int_env("MARKITDOWN_PROCESS_WORKERS", DEFAULT_MARKITDOWN_MAX_CONCURRENT_CONVERSIONS)
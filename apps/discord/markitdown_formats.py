@@ -0,0 +1,226 @@
+"""Early format sniffing and partial conversion for MarkItDown requests.
+
+The first downloaded chunk is matched against known magic bytes, so an
+unsupported binary, or a file whose bytes contradict its extension (such as
+an HTML error page saved as `.pdf`), is rejected before the rest is
+downloaded. `ConversionLimits` converts only the start of a document for
+previews: the first pages of a PDF or slide deck, the first rows of a
+spreadsheet or CSV, or the first bytes of a text file.
+"""
+
+import csv
+import io
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO
+
+import pandas as pd
+from fastapi import HTTPException
+from markitdown.converters import HtmlConverter
+from pdfminer.high_level import extract_text
+from pdfminer.pdfpage import PDFPage
+
+from markitdown_sections import split_markdown
+
+_SIGNATURES: tuple[tuple[bytes, str], ...] = (
+    (b"%PDF-", "pdf"),
+    (b"PK\x03\x04", "zip"),  # docx, xlsx, pptx, epub and zip archives
+    (b"PK\x05\x06", "zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),  # doc, xls, ppt and msg
+    (b"\x89PNG\r\n\x1a\n", "image"),
+    (b"\xff\xd8\xff", "image"),
+    (b"GIF87a", "image"),
+    (b"GIF89a", "image"),
+    (b"ID3", "audio"),
+    (b"OggS", "audio"),
+    (b"fLaC", "audio"),
+    (b"\xef\xbb\xbf", "text"),
+    (b"\xff\xfe", "text"),
+    (b"\xfe\xff", "text"),
+)
+_EXPECTED_KINDS = {
+    ".pdf": "pdf",
+    ".docx": "zip",
+    ".xlsx": "zip",
+    ".pptx": "zip",
+    ".epub": "zip",
+    ".zip": "zip",
+    ".doc": "ole",
+    ".xls": "ole",
+    ".ppt": "ole",
+    ".msg": "ole",
+    ".png": "image",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".mp3": "audio",
+    ".wav": "audio",
+    ".m4a": "audio",
+    ".csv": "text",
+    ".txt": "text",
+    ".md": "text",
+    ".html": "text",
+    ".htm": "text",
+    ".json": "text",
+    ".xml": "text",
+    ".ipynb": "text",
+}
+_SPREADSHEET_ENGINES = {".xlsx": "openpyxl", ".xls": "xlrd"}
+
+
+def _sniff_media(head: bytes) -> str | None:
+    if head[:4] == b"RIFF" and head[8:12] in {b"WAVE", b"WEBP"}:
+        return "audio" if head[8:12] == b"WAVE" else "image"
+    if head[4:8] == b"ftyp":
+        return "audio"  # m4a and mp4
+    if len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        return "audio"  # MPEG frame without an ID3 tag
+    return None
+
+
+def _looks_like_text(head: bytes) -> bool:
+    if b"\0" in head:
+        return False
+    try:
+        # Tolerate a multi-byte character cut off at the end of the chunk.
+        (head[:-3] if len(head) > 3 else head).decode()
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_format(head: bytes) -> str | None:
+    """Classify a file from its first bytes; `None` means no supported format."""
+    for signature, kind in _SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    media_kind = _sniff_media(head)
+    if media_kind is None and _looks_like_text(head):
+        return "text"
+    return media_kind
+
+
+def validate_sniffed_format(head: bytes, filename: str) -> str:
+    kind = sniff_format(head)
+    extension = Path(filename).suffix.lower()
+    expected = _EXPECTED_KINDS.get(extension)
+    if kind is None and expected == "text" and b"\0" not in head:
+        kind = "text"  # Legacy-encoded text such as a cp1252 CSV.
+    if kind is None:
+        raise HTTPException(status_code=415, detail="Unsupported file type")
+    if expected is not None and expected != kind:
+        raise HTTPException(
+            status_code=415,
+            detail=f"File content does not match its {extension} extension",
+        )
+    return kind
+
+
+@dataclass(frozen=True)
+class ConversionLimits:
+    """Convert only the start of a document; unset fields are unlimited."""
+
+    max_pages: int | None = None
+    max_rows: int | None = None
+    max_bytes: int | None = None
+
+    def __bool__(self) -> bool:
+        return any(value is not None for value in asdict(self).values())
+
+    @property
+    def cache_suffix(self) -> str:
+        return "".join(
+            f"|{name}={value}" for name, value in asdict(self).items() if value is not None
+        )
+
+
+NO_LIMITS = ConversionLimits()
+
+
+def truncate_text_download(content: bytes, max_bytes: int) -> bytes:
+    """Keep at most `max_bytes`, cut back to the last full line when there is one."""
+    if len(content) <= max_bytes:
+        return content
+    head = content[:max_bytes]
+    line_end = head.rfind(b"\n")
+    return head[: line_end + 1] if line_end > 0 else head
+
+
+def limit_csv_rows(stream: BinaryIO, max_rows: int) -> tuple[BinaryIO, bool]:
+    """Header plus the first `max_rows` records, respecting quoted newlines.
+
+    The flag is True when records were left out.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+    output = io.StringIO()
+    writer = csv.writer(output)
+    truncated = False
+    for index, row in enumerate(csv.reader(text)):
+        if index > max_rows:
+            truncated = True
+            break
+        writer.writerow(row)
+    text.detach()
+    return io.BytesIO(output.getvalue().encode()), truncated
+
+
+def convert_pdf_pages(stream: BinaryIO, max_pages: int) -> tuple[str, bool]:
+    """Text of the first `max_pages` pages; later pages are never parsed.
+
+    The flag is True when the PDF has more pages. Counting them only walks the
+    page tree; no page content is laid out.
+    """
+    text = extract_text(stream, maxpages=max_pages).strip()
+    stream.seek(0)
+    page_count = sum(1 for _page in PDFPage.get_pages(stream, maxpages=max_pages + 1))
+    return text, page_count > max_pages
+
+
+def convert_spreadsheet_rows(stream: BinaryIO, extension: str, max_rows: int) -> tuple[str, bool]:
+    """First `max_rows` rows of every sheet, in MarkItDown's spreadsheet layout.
+
+    One extra row is read per sheet; the flag is True when any sheet had it.
+    """
+    sheets = pd.read_excel(
+        stream, sheet_name=None, nrows=max_rows + 1, engine=_SPREADSHEET_ENGINES[extension]
+    )
+    html_converter = HtmlConverter()
+    markdown = ""
+    truncated = False
+    for name, sheet in sheets.items():
+        truncated = truncated or len(sheet) > max_rows
+        markdown += f"## {name}\n"
+        html_content = sheet.head(max_rows).to_html(index=False)
+        markdown += html_converter.convert_string(html_content).markdown.strip() + "\n\n"
+    return markdown.strip(), truncated
+
+
+def is_spreadsheet(extension: str) -> bool:
+    return extension in _SPREADSHEET_ENGINES
+
+
+def limit_pages(markdown: str, max_pages: int) -> tuple[str, bool]:
+    """First `max_pages` pages or slides of already converted markdown.
+
+    The flag is True when later pages were dropped.
+    """
+    sections = list(islice(split_markdown(markdown, "page"), max_pages + 1))
+    kept = "\n\n".join(section.markdown.strip() for section in sections[:max_pages])
+    return kept, len(sections) > max_pages
+
+
+def limit_table_rows(markdown: str, max_rows: int) -> tuple[str, bool]:
+    """Keep the header, separator and first `max_rows` body rows of each table.
+
+    The flag is True when any table row was dropped.
+    """
+    lines = []
+    table_line = 0
+    truncated = False
+    for line in markdown.splitlines():
+        table_line = table_line + 1 if line.startswith("|") else 0
+        if table_line <= max_rows + 2:
+            lines.append(line)
+        else:
+            truncated = True
+    return "\n".join(lines), truncated
@@ -0,0 +1,155 @@
+"""Streaming renderers for converted markdown.
+
+Large documents are sent as chunked `text/markdown`, or as NDJSON sections
+that can be split at headings or pages for RAG ingestion. Sections are sliced
+from the converted string by offset, and every chunk is encoded on its own, so
+neither the full JSON-escaped response nor a second encoded copy of the
+document is ever held in memory. Batch results are streamed as NDJSON lines
+in the order they finish.
+"""
+
+import asyncio
+import json
+import re
+from collections.abc import AsyncIterator, Awaitable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Literal
+
+MARKDOWN_STREAM_CHUNK_CHARS = 64 * 1024
+
+SplitBy = Literal["heading", "page"]
+
+# Fences toggle code blocks, whose `#` lines are not headings.
+_HEADING_OR_FENCE = re.compile(
+    r"^(?:(?P<fence>```|~~~)|(?P<hashes>#{1,6})[ \t]+(?P<title>[^\n]*))", re.MULTILINE
+)
+# pdfminer separates PDF pages with form feeds; the PPTX converter marks slides.
+_PAGE_BREAK = re.compile(r"\f|^<!-- Slide number: (?P<slide>\d+) -->$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class MarkdownSection:
+    markdown: str
+    heading: str | None = None
+    level: int | None = None
+    page: int | None = None
+
+
+def _heading_sections(markdown: str) -> Iterator[MarkdownSection]:
+    start = 0
+    heading: str | None = None
+    level: int | None = None
+    fence: str | None = None
+    for match in _HEADING_OR_FENCE.finditer(markdown):
+        if match["fence"]:
+            fence = None if fence == match["fence"] else fence or match["fence"]
+            continue
+        if fence is not None:
+            continue
+        if match.start() > start:
+            yield MarkdownSection(markdown[start : match.start()], heading=heading, level=level)
+        start = match.start()
+        heading = match["title"].strip().rstrip("#").strip()
+        level = len(match["hashes"])
+    yield MarkdownSection(markdown[start:], heading=heading, level=level)
+
+
+def _page_sections(markdown: str) -> Iterator[MarkdownSection]:
+    start = 0
+    page = 1
+    for match in _PAGE_BREAK.finditer(markdown):
+        if markdown[start : match.start()].strip():
+            yield MarkdownSection(markdown[start : match.start()], page=page)
+        if match["slide"]:
+            page = int(match["slide"])
+            start = match.start()
+        else:
+            page += 1
+            start = match.end()
+    yield MarkdownSection(markdown[start:], page=page)
+
+
+def _chunk_sections(markdown: str, chunk_chars: int) -> Iterator[MarkdownSection]:
+    for start in range(0, len(markdown), chunk_chars):
+        yield MarkdownSection(markdown[start : start + chunk_chars])
+
+
+def split_markdown(
+    markdown: str,
+    split_by: SplitBy | None = None,
+    *,
+    chunk_chars: int = MARKDOWN_STREAM_CHUNK_CHARS,
+) -> Iterator[MarkdownSection]:
+    """Yield non-empty sections at headings, at pages, or in fixed-size chunks.
+
+    A document without page markers (DOCX, or PDFs laid out as forms) comes
+    back as one page.
+    """
+    if split_by == "heading":
+        sections = _heading_sections(markdown)
+    elif split_by == "page":
+        sections = _page_sections(markdown)
+    else:
+        sections = _chunk_sections(markdown, chunk_chars)
+    for section in sections:
+        if section.markdown.strip():
+            yield section
+
+
+def iter_markdown_text(
+    markdown: str, *, chunk_chars: int = MARKDOWN_STREAM_CHUNK_CHARS
+) -> Iterator[bytes]:
+    """Encode markdown for a chunked `text/markdown` response."""
+    for start in range(0, len(markdown), chunk_chars):
+        yield markdown[start : start + chunk_chars].encode()
+
+
+def iter_markdown_ndjson(
+    result: Mapping[str, object],
+    split_by: SplitBy | None = None,
+    *,
+    chunk_chars: int = MARKDOWN_STREAM_CHUNK_CHARS,
+) -> Iterator[bytes]:
+    """Render a `handle_markitdown` result as NDJSON.
+
+    The first line is `{"type": "metadata", ...}` with every field except the
+    markdown, then one `{"type": "section", "index": ...}` line per section,
+    and finally `{"type": "end", "sections": <count>}`.
+    """
+    markdown = str(result.get("markdown") or "")
+    metadata = {key: value for key, value in result.items() if key != "markdown"}
+    yield ndjson_line({"type": "metadata", **metadata, "split_by": split_by})
+
+    count = 0
+    for section in split_markdown(markdown, split_by, chunk_chars=chunk_chars):
+        line: dict[str, object] = {"type": "section", "index": count}
+        if section.heading is not None:
+            line["heading"] = section.heading
+            line["level"] = section.level
+        if section.page is not None:
+            line["page"] = section.page
+        line["markdown"] = section.markdown
+        yield ndjson_line(line)
+        count += 1
+    yield ndjson_line({"type": "end", "sections": count})
+
+
+def ndjson_line(payload: Mapping[str, object]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode() + b"\n"
+
+
+async def iter_ndjson_as_completed(
+    results: Iterable[Awaitable[Mapping[str, object]]],
+) -> AsyncIterator[bytes]:
+    """Run every awaitable at once and yield each result as an NDJSON line when it finishes.
+
+    If the consumer stops early (the client went away), the rest are cancelled.
+    """
+    tasks = [asyncio.ensure_future(result) for result in results]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield ndjson_line(await finished)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,17 +1,52 @@
 """Utilities for handling MarkItDown file conversion requests."""
 
 import asyncio
+import contextlib
+import hashlib
+import io
 import logging
 import os
 import tempfile
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 from urllib.parse import parse_qs, urlparse
 
 import aiohttp
 from fastapi import HTTPException
-from markitdown import MarkItDown
+from markitdown import MarkItDown, StreamInfo
+
+from markitdown_cache import CachedConversion, conversion_cache_key, markitdown_cache
+from markitdown_executor import (
+    ConversionProcessPool,
+    conversion_admission_from_env,
+    conversion_process_workers_from_env,
+    spool_for_worker,
+)
+from markitdown_formats import (
+    NO_LIMITS,
+    ConversionLimits,
+    convert_pdf_pages,
+    convert_spreadsheet_rows,
+    is_spreadsheet,
+    limit_csv_rows,
+    limit_pages,
+    limit_table_rows,
+    truncate_text_download,
+    validate_sniffed_format,
+)
+from markitdown_sections import iter_ndjson_as_completed
 
 MAX_MARKITDOWN_BYTES = 50 * 1024 * 1024
+# Downloads up to this size stay in memory; larger ones roll over to a temp file.
+MARKITDOWN_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+MAX_MARKITDOWN_BATCH_ITEMS = 50
+# Batch items processed at once, and downloads open against one host at once.
+MARKITDOWN_BATCH_CONCURRENCY = 8
+MARKITDOWN_BATCH_CONNECTIONS_PER_HOST = 4
+MARKITDOWN_DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=60)
 YOUTUBE_HOSTS = {
     "youtube.com",
     "www.youtube.com",
@@ -107,13 +142,31 @@ def _validate_direct_youtube_url(url: str) -> str:
     return url
 
 
+def _youtube_video_id(url: str) -> str | None:
+    """Video id from any accepted YouTube URL shape, so equivalent links share a cache entry."""
+    parsed = urlparse(url)
+    host = parsed.hostname.lower() if parsed.hostname else ""
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    if host in {"youtu.be", "www.youtu.be"}:
+        return segments[0] if segments else None
+    if parsed.path == "/watch":
+        return next(iter(parse_qs(parsed.query).get("v", [])), None)
+    if len(segments) >= 2 and segments[0] in {"shorts", "embed", "live"}:
+        return segments[1]
+    return None
+
+
+def _storage_object_path(signed_url: str) -> str:
+    return urlparse(signed_url).path.removeprefix("/storage/v1/object/sign/")
+
+
 def _normalize_original_name(filename: str | None) -> str:
     return (filename or "upload.bin").strip() or "upload.bin"
 
 
-def _validate_content_length(content_length_raw: str | None) -> None:
+def _validate_content_length(content_length_raw: str | None) -> int | None:
     if not content_length_raw:
-        return
+        return None
     try:
         content_length = int(content_length_raw)
     except ValueError as error:
@@ -123,6 +176,7 @@ def _validate_content_length(content_length_raw: str | None) -> None:
         ) from error
     if content_length > MAX_MARKITDOWN_BYTES:
         raise HTTPException(status_code=413, detail="File exceeds 50MB limit")
+    return content_length
 
 
 def _validate_resolved_response_host(
@@ -134,24 +188,62 @@ def _validate_resolved_response_host(
         raise HTTPException(status_code=400, detail="Invalid signed URL host")
 
 
-async def _download_signed_url_to_temp(
+@dataclass
+class _SignedDownload:
+    buffer: BinaryIO | None
+    size: int
+    etag: str | None
+    content_hash: str | None
+    cached: CachedConversion | None = None
+    truncated: bool = False
+
+
+def _spill_download(buffer: BinaryIO) -> BinaryIO:
+    # Deleted when the download buffer is closed.
+    spool = tempfile.NamedTemporaryFile(prefix="markitdown-")  # noqa: SIM115
+    buffer.seek(0)
+    spool.write(buffer.read())
+    buffer.close()
+    return spool
+
+
+async def _download_signed_url_to_buffer(
     signed_url: str,
-    suffix: str,
     configured_supabase_host: str,
-) -> tuple[str, int]:
-    timeout = aiohttp.ClientTimeout(total=60)
+    *,
+    lookup_etag: Callable[[str], Awaitable[CachedConversion | None]] | None = None,
+    session: aiohttp.ClientSession | None = None,
+    filename: str = "upload.bin",
+    max_bytes: int | None = None,
+) -> _SignedDownload:
+    """Download into a buffer positioned at the start.
+
+    Small files never touch disk. A file larger than the spool threshold (or
+    announced as such by Content-Length) is written to a named temp file that
+    conversion workers open by path, so it is written to disk only once.
+    When `lookup_etag` finds a cached conversion for the response ETag, the
+    body is not downloaded at all. Batches pass a shared `session`; otherwise
+    a session is opened for this download.
+
+    The first chunk is sniffed, so unsupported or mislabelled files fail
+    before the rest is downloaded. `max_bytes` stops a text download early.
+    """
     downloaded_bytes = 0
-    temp_path = ""
+    truncated = False
+    digest = hashlib.sha256()
     signed_url_host = urlparse(signed_url).hostname
     allowed_hosts = {configured_supabase_host}
     if signed_url_host:
         allowed_hosts.add(signed_url_host.lower())
 
+    buffer: BinaryIO = io.BytesIO()
     try:
-        async with (
-            aiohttp.ClientSession(timeout=timeout) as session,
-            session.get(signed_url) as response,
-        ):
+        async with contextlib.AsyncExitStack() as stack:
+            if session is None:
+                session = await stack.enter_async_context(
+                    aiohttp.ClientSession(timeout=MARKITDOWN_DOWNLOAD_TIMEOUT)
+                )
+            response = await stack.enter_async_context(session.get(signed_url))
             if response.status >= 400:
                 raise HTTPException(
                     status_code=400,
@@ -159,65 +251,232 @@ async def _download_signed_url_to_temp(
                 )
 
             _validate_resolved_response_host(response.url.host, allowed_hosts)
-            _validate_content_length(response.headers.get("Content-Length"))
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                temp_path = tmp.name
-                async for chunk in response.content.iter_chunked(1024 * 256):
-                    if not chunk:
-                        continue
-                    downloaded_bytes += len(chunk)
-                    if downloaded_bytes > MAX_MARKITDOWN_BYTES:
-                        raise HTTPException(status_code=413, detail="File exceeds 50MB limit")
-                    tmp.write(chunk)
-
-        return temp_path, downloaded_bytes
+            etag = response.headers.get("ETag")
+            cached = await lookup_etag(etag) if etag and lookup_etag else None
+            if cached is not None:
+                buffer.close()
+                return _SignedDownload(
+                    buffer=None, size=0, etag=etag, content_hash=None, cached=cached
+                )
+
+            content_length = _validate_content_length(response.headers.get("Content-Length"))
+            if content_length is not None and content_length > MARKITDOWN_SPOOL_MAX_BYTES:
+                buffer = _spill_download(buffer)
+
+            async for received in response.content.iter_chunked(1024 * 256):
+                if not received:
+                    continue
+                if downloaded_bytes == 0:
+                    kind = validate_sniffed_format(received, filename)
+                    if max_bytes is not None and kind != "text":
+                        raise HTTPException(
+                            status_code=400, detail="max_bytes only applies to text files"
+                        )
+                chunk = received
+                if max_bytes is not None and downloaded_bytes + len(chunk) > max_bytes:
+                    chunk = truncate_text_download(chunk, max_bytes - downloaded_bytes)
+                    truncated = True
+                downloaded_bytes += len(chunk)
+                if downloaded_bytes > MAX_MARKITDOWN_BYTES:
+                    raise HTTPException(status_code=413, detail="File exceeds 50MB limit")
+                if downloaded_bytes > MARKITDOWN_SPOOL_MAX_BYTES and isinstance(buffer, io.BytesIO):
+                    buffer = _spill_download(buffer)
+                buffer.write(chunk)
+                digest.update(chunk)
+                if truncated:
+                    break
+
+        buffer.seek(0)
+        return _SignedDownload(
+            buffer=buffer,
+            size=downloaded_bytes,
+            etag=etag,
+            content_hash=digest.hexdigest(),
+            truncated=truncated,
+        )
     except Exception:
-        _cleanup_temp_file(temp_path)
+        buffer.close()
         raise
 
 
-def _convert_temp_file_sync(
-    temp_path: str,
+class MarkItDownPool:
+    """Process-wide pool of initialised MarkItDown converters keyed by `enable_plugins`.
+
+    Building a MarkItDown registers every converter and, with plugins,
+    re-discovers entry points. A conversion leases an idle instance (creating
+    one only when all are busy) so concurrent threads never share a converter.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._idle: dict[bool, list[MarkItDown]] = {}
+
+    def warm(self, enable_plugins_options: tuple[bool, ...] = (True, False)) -> None:
+        for enable_plugins in enable_plugins_options:
+            with self.lease(enable_plugins):
+                pass
+
+    @contextlib.contextmanager
+    def lease(self, enable_plugins: bool) -> Iterator[MarkItDown]:
+        with self._lock:
+            idle = self._idle.setdefault(enable_plugins, [])
+            converter = idle.pop() if idle else None
+        if converter is None:
+            converter = MarkItDown(enable_plugins=enable_plugins)
+        try:
+            yield converter
+        finally:
+            with self._lock:
+                self._idle[enable_plugins].append(converter)
+
+
+_converter_pool = MarkItDownPool()
+
+
+def warm_markitdown_converters() -> None:
+    """Build converters at startup so the first requests skip initialisation."""
+    try:
+        _converter_pool.warm()
+    except Exception:
+        logger.exception("markitdown converter warm-up failed")
+
+
+def _convert_partial_sync(
+    stream: BinaryIO,
+    extension: str,
+    limits: ConversionLimits,
+) -> tuple[str, bool] | None:
+    """Convert only the requested pages or rows when the format allows it.
+
+    PDFs go straight to pdfminer, which stops parsing after `max_pages`, and
+    spreadsheets are read with a row limit. Returns the markdown and whether
+    anything was left out. Anything else returns `None` and is converted
+    whole, then trimmed.
+    """
+    if limits.max_pages is not None and extension == ".pdf":
+        return convert_pdf_pages(stream, limits.max_pages)
+    if limits.max_rows is not None and is_spreadsheet(extension):
+        try:
+            return convert_spreadsheet_rows(stream, extension, limits.max_rows)
+        except Exception:
+            logger.warning("partial spreadsheet conversion failed; converting it whole")
+            stream.seek(0)
+    return None
+
+
+def _convert_stream_sync(
+    stream: BinaryIO,
+    filename: str,
     enable_plugins: bool,
-) -> tuple[str, str | None]:
-    converter = MarkItDown(enable_plugins=enable_plugins)
-    result = converter.convert(temp_path)
+    limits: ConversionLimits = NO_LIMITS,
+) -> tuple[str, str | None, bool]:
+    """Convert a file; the flag is True when `limits` cut anything off."""
+    extension = Path(filename).suffix.lower()
+    truncated = False
+    if limits:
+        partial = _convert_partial_sync(stream, extension, limits)
+        if partial is not None:
+            markdown, truncated = partial
+            return markdown.strip(), None, truncated
+        if limits.max_rows is not None and extension == ".csv":
+            stream, truncated = limit_csv_rows(stream, limits.max_rows)
+
+    with _converter_pool.lease(enable_plugins) as converter:
+        result = converter.convert_stream(
+            stream,
+            stream_info=StreamInfo(extension=Path(filename).suffix or None, filename=filename),
+        )
     markdown = (getattr(result, "text_content", "") or "").strip()
     title = getattr(result, "title", None)
-    return markdown, title
+    if limits.max_pages is not None:
+        markdown, pages_dropped = limit_pages(markdown, limits.max_pages)
+        truncated = truncated or pages_dropped
+    if limits.max_rows is not None:
+        markdown, rows_dropped = limit_table_rows(markdown, limits.max_rows)
+        truncated = truncated or rows_dropped
+    return markdown, title, truncated
+
+
+def _convert_worker_input_sync(
+    content: bytes | str,
+    filename: str,
+    enable_plugins: bool,
+    limits: ConversionLimits = NO_LIMITS,
+) -> tuple[str, str | None, bool]:
+    # Entry point in worker processes and threads: small downloads arrive as
+    # bytes, larger ones as the path of a temp file (see `spool_for_worker`).
+    if isinstance(content, bytes):
+        return _convert_stream_sync(io.BytesIO(content), filename, enable_plugins, limits)
+    with Path(content).open("rb") as stream:
+        return _convert_stream_sync(stream, filename, enable_plugins, limits)
 
 
 def _convert_url_sync(
     url: str,
     enable_plugins: bool,
 ) -> tuple[str, str | None]:
-    converter = MarkItDown(enable_plugins=enable_plugins)
-    result = converter.convert_uri(url)
+    with _converter_pool.lease(enable_plugins) as converter:
+        result = converter.convert_uri(url)
     markdown = (getattr(result, "text_content", "") or "").strip()
     title = getattr(result, "title", None)
     return markdown, title
 
 
-async def _convert_temp_file(
-    temp_path: str,
+def _conversion_format(filename: str) -> str:
+    return Path(filename).suffix.lower().lstrip(".") or "unknown"
+
+
+async def _convert_stream(
+    stream: BinaryIO,
+    filename: str,
     enable_plugins: bool,
-) -> tuple[str, str | None]:
-    return await asyncio.to_thread(_convert_temp_file_sync, temp_path, enable_plugins)
+    limits: ConversionLimits = NO_LIMITS,
+    *,
+    queue_limits: bool = True,
+) -> tuple[str, str | None, bool]:
+    async with conversion_admission.admit(_conversion_format(filename), queue_limits=queue_limits):
+        # Threads take the same route as worker processes: MarkItDown's magika
+        # type detection rejects a SpooledTemporaryFile, which is not a
+        # BufferedIOBase, so the input is handed over as bytes or a file path.
+        content = await asyncio.to_thread(spool_for_worker, stream, MARKITDOWN_SPOOL_MAX_BYTES)
+        try:
+            return await conversion_pool.run(
+                _convert_worker_input_sync, content, filename, enable_plugins, limits
+            )
+        finally:
+            # A path that is the stream's own file belongs to the caller.
+            if isinstance(content, str) and content != getattr(stream, "name", None):
+                await asyncio.to_thread(Path(content).unlink, missing_ok=True)
 
 
 async def _convert_url(
     url: str,
     enable_plugins: bool,
+    *,
+    queue_limits: bool = True,
 ) -> tuple[str, str | None]:
-    return await asyncio.to_thread(_convert_url_sync, url, enable_plugins)
+    async with conversion_admission.admit("youtube", queue_limits=queue_limits):
+        return await conversion_pool.run(_convert_url_sync, url, enable_plugins)
+
+
+conversion_admission = conversion_admission_from_env()
+conversion_pool = ConversionProcessPool(
+    conversion_process_workers_from_env(),
+    initializer=warm_markitdown_converters,
+)
+
 
+def _content_identity(download: _SignedDownload, limits: ConversionLimits) -> str:
+    # A download cut at max_bytes gets its own key: the same bytes as a
+    # complete file are not partial.
+    truncated = "|truncated" if download.truncated else ""
+    return f"sha256:{download.content_hash}{limits.cache_suffix}{truncated}"
 
-def _cleanup_temp_file(temp_path: str) -> None:
+
+def _close_buffer(buffer: BinaryIO | None) -> None:
     try:
-        temp_file = Path(temp_path) if temp_path else None
-        if temp_file and temp_file.exists():
-            temp_file.unlink()
+        if buffer is not None:
+            buffer.close()
     except Exception:
         logger.exception("markitdown cleanup failed")
 
@@ -227,8 +486,17 @@ async def handle_markitdown(
     filename: str | None,
     enable_plugins: bool,
     url: str | None = None,
+    *,
+    session: aiohttp.ClientSession | None = None,
+    limits: ConversionLimits = NO_LIMITS,
+    queue_limits: bool = True,
 ) -> dict[str, object]:
-    """Convert a signed Supabase file URL or direct YouTube URL to markdown."""
+    """Convert a signed Supabase file URL or direct YouTube URL to markdown.
+
+    `limits` only apply to files. `partial` is True only when a limit actually
+    cut something off: the download stopped at `max_bytes`, or pages or rows
+    were left out. `queue_limits` is passed on to conversion admission.
+    """
     signed_url = (signed_url or "").strip()
     url = (url or "").strip()
 
@@ -239,19 +507,33 @@ async def handle_markitdown(
         )
 
     original_name = _normalize_original_name(filename)
-    suffix = Path(original_name).suffix
-    temp_path = ""
+    extension = Path(original_name).suffix
+    buffer: BinaryIO | None = None
+
+    def cache_key(identity: str) -> str:
+        return conversion_cache_key(identity, enable_plugins=enable_plugins, extension=extension)
 
     try:
         if url:
             source_url = _validate_direct_youtube_url(url)
-            markdown, title = await _convert_url(source_url, enable_plugins)
+            video_id = _youtube_video_id(source_url)
+            url_key = cache_key(f"youtube:{video_id}" if video_id else f"url:{source_url}")
+            cached = await markitdown_cache.aget(url_key)
+            if cached is None:
+                markdown, title = await _convert_url(
+                    source_url, enable_plugins, queue_limits=queue_limits
+                )
 
-            if not markdown:
-                raise HTTPException(
-                    status_code=422,
-                    detail="MarkItDown returned empty markdown",
+                if not markdown:
+                    raise HTTPException(
+                        status_code=422,
+                        detail="MarkItDown returned empty markdown",
+                    )
+                await markitdown_cache.aset(
+                    url_key, CachedConversion(markdown=markdown, title=title)
                 )
+            else:
+                markdown, title = cached.markdown, cached.title
 
             return {
                 "ok": True,
@@ -259,30 +541,65 @@ async def handle_markitdown(
                 "title": title,
                 "filename": original_name,
                 "url": source_url,
+                "cached": cached is not None,
             }
 
         configured_supabase_host = _require_supabase_hostname()
         _validate_signed_url(signed_url, configured_supabase_host)
+        object_path = _storage_object_path(signed_url)
+
+        def object_key(etag: str) -> str:
+            return cache_key(f"object:{object_path}@{etag}{limits.cache_suffix}")
 
-        temp_path, downloaded_bytes = await _download_signed_url_to_temp(
+        download = await _download_signed_url_to_buffer(
             signed_url,
-            suffix,
             configured_supabase_host,
+            lookup_etag=lambda etag: markitdown_cache.aget(object_key(etag)),
+            session=session,
+            filename=original_name,
+            max_bytes=limits.max_bytes,
         )
+        buffer = download.buffer
+        cached = download.cached
+
+        if cached is None:
+            if buffer is None or download.size == 0:
+                raise HTTPException(status_code=400, detail="File is empty")
+
+            # Same bytes under another path (or without an ETag) still hit.
+            content_key = cache_key(_content_identity(download, limits))
+            cached = await markitdown_cache.aget(content_key)
+            if cached is None:
+                markdown, title, truncated = await _convert_stream(
+                    buffer, original_name, enable_plugins, limits, queue_limits=queue_limits
+                )
 
-        if downloaded_bytes == 0:
-            raise HTTPException(status_code=400, detail="File is empty")
+                if not markdown:
+                    raise HTTPException(
+                        status_code=422, detail="MarkItDown returned empty markdown"
+                    )
 
-        markdown, title = await _convert_temp_file(temp_path, enable_plugins)
+                result = CachedConversion(
+                    markdown=markdown,
+                    title=title,
+                    partial=download.truncated or truncated,
+                )
+                await markitdown_cache.aset(content_key, result)
+            else:
+                result = cached
 
-        if not markdown:
-            raise HTTPException(status_code=422, detail="MarkItDown returned empty markdown")
+            if download.etag:
+                await markitdown_cache.aset(object_key(download.etag), result)
+        else:
+            result = cached
 
         return {
             "ok": True,
-            "markdown": markdown,
-            "title": title,
+            "markdown": result.markdown,
+            "title": result.title,
             "filename": original_name,
+            "cached": cached is not None,
+            "partial": result.partial,
         }
     except HTTPException:
         raise
@@ -290,4 +607,70 @@ async def handle_markitdown(
         logger.exception("markitdown conversion failed")
         raise HTTPException(status_code=500, detail="Failed to convert file") from error
     finally:
-        _cleanup_temp_file(temp_path)
+        _close_buffer(buffer)
+
+
+@dataclass(frozen=True)
+class MarkitdownSource:
+    signed_url: str | None = None
+    url: str | None = None
+    filename: str | None = None
+    enable_plugins: bool = True
+    max_pages: int | None = None
+    max_rows: int | None = None
+    max_bytes: int | None = None
+
+
+async def stream_markitdown_batch(sources: Sequence[MarkitdownSource]) -> AsyncIterator[bytes]:
+    """Convert sources concurrently, yielding one NDJSON line per source as it finishes.
+
+    Every line carries the source `index`. Downloads share one session with a
+    per-host connection limit, and conversions go through the same admission
+    control and process pool as single requests. At most as many sources run
+    at once as admission lets convert, and they wait for a slot without the
+    queue limits, so a large batch takes longer instead of getting 429s. A
+    failed source yields `{"ok": false, "status_code": ..., "error": ...}`
+    without stopping the batch.
+    """
+    if not 0 < len(sources) <= MAX_MARKITDOWN_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provide between 1 and {MAX_MARKITDOWN_BATCH_ITEMS} sources",
+        )
+
+    slots = asyncio.Semaphore(min(MARKITDOWN_BATCH_CONCURRENCY, conversion_admission.max_in_flight))
+    connector = aiohttp.TCPConnector(limit_per_host=MARKITDOWN_BATCH_CONNECTIONS_PER_HOST)
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=MARKITDOWN_DOWNLOAD_TIMEOUT
+    ) as session:
+
+        async def convert(index: int, source: MarkitdownSource) -> dict[str, object]:
+            async with slots:
+                try:
+                    result = await handle_markitdown(
+                        source.signed_url,
+                        source.filename,
+                        source.enable_plugins,
+                        url=source.url,
+                        session=session,
+                        limits=ConversionLimits(
+                            max_pages=source.max_pages,
+                            max_rows=source.max_rows,
+                            max_bytes=source.max_bytes,
+                        ),
+                        queue_limits=False,
+                    )
+                except HTTPException as error:
+                    return {
+                        "index": index,
+                        "ok": False,
+                        "status_code": error.status_code,
+                        "error": error.detail,
+                    }
+            return {"index": index, **result}
+
+        async for line in iter_ndjson_as_completed(
+            convert(index, source) for index, source in enumerate(sources)
+        ):
+            yield line
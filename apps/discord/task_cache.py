@@ -0,0 +1,117 @@
+"""In-process cache of task -> workspace ownership for task-scoped commands."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+DEFAULT_TASK_OWNERSHIP_CACHE_TTL_SECONDS = 30.0
+DEFAULT_TASK_OWNERSHIP_CACHE_MAX_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class TaskOwnership:
+    """Where a task lives: its list, board and workspace."""
+
+    task_id: str
+    list_id: str | None
+    board_id: str | None
+    ws_id: str
+
+
+class TaskOwnershipCache:
+    """Thread-safe LRU cache with TTL for task ownership lookups.
+
+    `/assign`, `/unassign` and `/assignees` all resolve the same
+    tasks -> task_lists -> workspace_boards join, and users tend to run them
+    back to back on one task. Only read-only lookups are served from the
+    cache; commands that write task rows re-read ownership and refresh the
+    entry, so a task deleted or moved outside the bot is never written to.
+    Only positive lookups are cached so newly created tasks are visible
+    immediately, and the TTL bounds how long `/assignees` can see stale data.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TASK_OWNERSHIP_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_TASK_OWNERSHIP_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, TaskOwnership]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, task_id: str) -> TaskOwnership | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is None:
+                return None
+
+            expires_at, ownership = entry
+            if expires_at <= now:
+                del self._entries[task_id]
+                return None
+
+            self._entries.move_to_end(task_id)
+            return ownership
+
+    def set(self, ownership: TaskOwnership) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[ownership.task_id] = (
+                time.monotonic() + self.ttl_seconds,
+                ownership,
+            )
+            self._entries.move_to_end(ownership.task_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, task_id: str) -> None:
+        """Drop a task after it was deleted, moved, or failed a write."""
+        with self._lock:
+            self._entries.pop(task_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+task_ownership_cache = TaskOwnershipCache(
+    ttl_seconds=_float_env(
+        "TASK_OWNERSHIP_CACHE_TTL_SECONDS", DEFAULT_TASK_OWNERSHIP_CACHE_TTL_SECONDS
+    ),
+    max_entries=int(
+        _float_env("TASK_OWNERSHIP_CACHE_MAX_ENTRIES", DEFAULT_TASK_OWNERSHIP_CACHE_MAX_ENTRIES)
+    ),
+)
+
+
+def task_ownership_from_row(row: dict) -> TaskOwnership | None:
+    """Build TaskOwnership from a tasks row joined with task_lists/workspace_boards."""
+    task_lists = row.get("task_lists") or {}
+    ws_id = (task_lists.get("workspace_boards") or {}).get("ws_id")
+    task_id = row.get("id")
+    if not task_id or not ws_id:
+        return None
+
+    return TaskOwnership(
+        task_id=task_id,
+        list_id=row.get("list_id") or task_lists.get("id"),
+        board_id=task_lists.get("board_id"),
+        ws_id=ws_id,
+    )
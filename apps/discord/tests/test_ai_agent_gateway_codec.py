@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from ai_agent_gateway_codec import ORJSON_CODEC, STDLIB_CODEC, resolve_codec
+from ai_agent_gateway_watcher import DiscordAiAgentGatewayWatcher, WatcherConfig, WatcherTarget
+
+BOT_TOKEN = "bot-token"  # noqa: S105
+
+
+def test_resolve_codec_prefers_orjson_and_honours_overrides():
+    assert resolve_codec("json") is STDLIB_CODEC
+    assert resolve_codec(None) is (ORJSON_CODEC or STDLIB_CODEC)
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        resolve_codec("yaml")
+
+
+@pytest.mark.parametrize("codec", [STDLIB_CODEC, ORJSON_CODEC], ids=["json", "orjson"])
+def test_codecs_round_trip_gateway_packets(codec):
+    if codec is None:
+        pytest.skip("orjson is not installed")
+
+    packet = {"d": {"content": "xin chào 👋", "id": "1"}, "op": 0, "s": 7, "t": "MESSAGE_CREATE"}
+    encoded = codec.dumps(packet)
+
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == packet
+    assert codec.loads(encoded.decode()) == packet
+
+
+@pytest.mark.asyncio
+async def test_enqueue_packet_encodes_the_envelope_once_for_all_targets():
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(bot_token=BOT_TOKEN, forward_timeout_seconds=0.01, json_codec="json")
+    )
+    targets = (
+        WatcherTarget(webhook_url="https://example.com/webhook/a"),
+        WatcherTarget(webhook_url="https://example.com/webhook/b"),
+    )
+    await watcher._sync_forwarders(targets)
+    for forwarder in watcher._forwarders.values():
+        await forwarder.stop(drain_timeout_seconds=0)
+
+    try:
+        accepted = await watcher.enqueue_packet(
+            {"d": {"id": "message-1"}, "op": 0, "t": "MESSAGE_CREATE"}
+        )
+        bodies = [forwarder._queue.get_nowait().body for forwarder in watcher._forwarders.values()]
+    finally:
+        await watcher.close()
+
+    assert accepted == 2
+    assert bodies[0] is bodies[1]
+    assert json.loads(bodies[0])["type"] == "GATEWAY_MESSAGE_CREATE"
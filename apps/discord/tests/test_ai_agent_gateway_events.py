@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from ai_agent_gateway_events import (
+    ALL_FORWARDED_INTENTS,
+    CHAT_SDK_EVENT_TYPES,
+    GUILD_PRESENCES_INTENT,
+    GUILDS_INTENT,
+    GatewayEventFilter,
+    parse_event_types,
+    peek_dispatch,
+)
+from ai_agent_gateway_watcher import DiscordAiAgentGatewayWatcher, WatcherConfig
+
+
+def test_peek_dispatch_reads_type_and_sequence_from_frame_prefix():
+    frame = json.dumps(
+        {"t": "TYPING_START", "s": 42, "op": 0, "d": {"t": "MESSAGE_CREATE"}},
+        separators=(",", ":"),
+    )
+
+    assert peek_dispatch(frame) == ("TYPING_START", 42)
+    assert peek_dispatch('{"t":null,"s":null,"op":11,"d":null}') is None
+    assert peek_dispatch('{"op":0,"d":{"t":"MESSAGE_CREATE","s":1,"x":0}}') is None
+
+
+def test_parse_event_types_supports_wildcard():
+    assert parse_event_types("message_create,\nTYPING_START, ") == frozenset(
+        {"MESSAGE_CREATE", "TYPING_START"}
+    )
+    assert parse_event_types("*") is None
+
+
+def test_gateway_event_filter_derives_intents_from_allowlist():
+    assert GatewayEventFilter().intents() == ALL_FORWARDED_INTENTS
+    assert GatewayEventFilter(allowlist=CHAT_SDK_EVENT_TYPES).intents() == ALL_FORWARDED_INTENTS
+    assert GatewayEventFilter(allowlist=None).intents() == ALL_FORWARDED_INTENTS
+    assert GatewayEventFilter(allowlist=frozenset({"PRESENCE_UPDATE"})).intents() == (
+        GUILDS_INTENT | GUILD_PRESENCES_INTENT
+    )
+
+    deny_reactions = GatewayEventFilter(
+        allowlist=CHAT_SDK_EVENT_TYPES, denylist=frozenset({"MESSAGE_REACTION_ADD"})
+    )
+    assert deny_reactions.allows("MESSAGE_CREATE") is True
+    assert deny_reactions.allows("MESSAGE_REACTION_ADD") is False
+    assert deny_reactions.should_decode("READY") is True
+    assert deny_reactions.should_decode("GUILD_CREATE") is False
+
+
+def test_watcher_config_reads_event_lists_from_env():
+    config = WatcherConfig.from_env(
+        {
+            "DISCORD_AI_AGENT_GATEWAY_BOT_TOKEN": "bot-token",
+            "DISCORD_AI_AGENT_GATEWAY_EVENT_ALLOWLIST": "*",
+            "DISCORD_AI_AGENT_GATEWAY_EVENT_DENYLIST": "presence_update",
+            "DISCORD_AI_AGENT_GATEWAY_WEBHOOK_URL": "https://example.com/webhook",
+        }
+    )
+
+    assert config.event_allowlist is None
+    assert config.event_denylist == frozenset({"PRESENCE_UPDATE"})
+    assert WatcherConfig.from_env(
+        {
+            "DISCORD_AI_AGENT_GATEWAY_BOT_TOKEN": "bot-token",
+            "DISCORD_AI_AGENT_GATEWAY_WEBHOOK_URL": "https://example.com/webhook",
+        }
+    ).event_filter.allows("GUILD_CREATE")
+
+
+@pytest.mark.asyncio
+async def test_watcher_skips_unwanted_frames_but_keeps_their_sequence():
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(bot_token="bot-token", event_allowlist=CHAT_SDK_EVENT_TYPES)  # noqa: S106
+    )
+
+    assert watcher._skip_raw_dispatch('{"t":"GUILD_CREATE","s":3,"op":0,"d":{}}') is True
+    assert watcher._session.sequence == 3
+    assert watcher._skip_raw_dispatch('{"t":"READY","s":1,"op":0,"d":{}}') is False
+    assert watcher._skip_raw_dispatch('{"t":"MESSAGE_CREATE","s":4,"op":0,"d":{}}') is False
+    assert watcher.filtered_events == 1
+
+    # Frames in an unexpected shape are still filtered after decoding.
+    assert await watcher._handle_gateway_packet(None, {"op": 0, "s": 5, "t": "GUILD_CREATE"})
+    assert watcher._session.sequence == 5
+    assert watcher.filtered_events == 2
@@ -0,0 +1,133 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+import ai_agent_gateway_watcher
+from ai_agent_gateway_events import CHAT_SDK_EVENT_TYPES
+from ai_agent_gateway_metrics import GatewayMetrics, start_metrics_server
+from ai_agent_gateway_watcher import DiscordAiAgentGatewayWatcher, WatcherConfig
+
+BOT_TOKEN = "bot-token"  # noqa: S105
+
+
+class _WebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+
+def test_render_emits_prometheus_histograms_and_queue_gauges():
+    metrics = GatewayMetrics()
+    metrics.add_queue_source(
+        "0",
+        lambda: [
+            {
+                "depth": 3,
+                "dropped": 1,
+                "last_lag_seconds": 0.5,
+                "spill_depth": 0,
+                "target": "https://example.com/webhook",
+            }
+        ],
+    )
+    metrics.record_event("0", "MESSAGE_CREATE")
+    metrics.observe_heartbeat_ack("0", 0.04)
+    metrics.observe_heartbeat_ack("0", 3.0)
+
+    text = metrics.render()
+
+    assert "# TYPE discord_gateway_heartbeat_ack_seconds histogram" in text
+    assert 'discord_gateway_heartbeat_ack_seconds_bucket{shard="0",le="0.05"} 1' in text
+    assert 'discord_gateway_heartbeat_ack_seconds_bucket{shard="0",le="+Inf"} 2' in text
+    assert 'discord_gateway_heartbeat_ack_seconds_count{shard="0"} 2' in text
+    assert 'discord_gateway_events_total{shard="0",type="MESSAGE_CREATE"} 1' in text
+    assert 'discord_gateway_queue_depth{shard="0",target="https://example.com/webhook"} 3' in text
+    assert text.endswith("\n")
+
+
+def test_summary_reports_rates_and_latency_since_previous_summary():
+    metrics = GatewayMetrics()
+    metrics.summary(now=0.0)
+    for _ in range(10):
+        metrics.record_event("0", "MESSAGE_CREATE")
+    metrics.observe_forward("https://example.com/webhook", 0.1, delivered=True)
+    metrics.observe_forward("https://example.com/webhook", 0.3, delivered=False)
+    metrics.record_reconnect("0")
+
+    summary = metrics.summary(now=5.0)
+
+    assert summary["events_per_second"] == {"MESSAGE_CREATE": 2.0}
+    assert summary["forward_mean_ms"] == {"https://example.com/webhook": 200.0}
+    assert summary["reconnects"] == 1
+    assert metrics.summary(now=10.0)["events_per_second"] == {}
+
+
+@pytest.mark.asyncio
+async def test_watcher_records_heartbeat_ack_latency_and_dispatch_types():
+    metrics = GatewayMetrics()
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(bot_token=BOT_TOKEN, event_allowlist=CHAT_SDK_EVENT_TYPES),
+        shard=(1, 2),
+        metrics=metrics,
+    )
+    ws = _WebSocket()
+
+    await watcher._handle_gateway_packet(ws, {"d": None, "op": 1})
+    await watcher._handle_gateway_packet(ws, {"op": 11})
+    await watcher._handle_gateway_packet(ws, {"d": {}, "op": 0, "s": 1, "t": "TYPING_START"})
+
+    assert ws.sent == [{"d": None, "op": 1}]
+    assert metrics.heartbeat_latency.totals()[(("shard", "1"),)][0] == 1
+    assert metrics.filtered_events[(("shard", "1"), ("type", "TYPING_START"))] == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_prometheus_text():
+    metrics = GatewayMetrics()
+    metrics.record_reconnect("0")
+    runner = await start_metrics_server(metrics, port=0)
+    try:
+        host, port = runner.addresses[0][:2]
+        async with (
+            aiohttp.ClientSession() as session,
+            session.get(f"http://{host}:{port}/metrics") as response,
+        ):
+            body = await response.text()
+    finally:
+        await runner.cleanup()
+
+    assert response.status == 200
+    assert response.content_type == "text/plain"
+    assert 'discord_gateway_reconnects_total{shard="0"} 1' in body
+
+
+@pytest.mark.asyncio
+async def test_amain_waits_for_the_summary_task_to_finish(monkeypatch):
+    summary_finished = []
+
+    class _Watcher:
+        async def run_forever(self):
+            await asyncio.sleep(0)
+
+    async def create_watchers(_config, **_kwargs):
+        return [_Watcher()]
+
+    async def log_forever(_metrics, _interval):
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await asyncio.sleep(0)
+            summary_finished.append(True)
+
+    monkeypatch.setattr(
+        WatcherConfig, "from_env", classmethod(lambda cls: cls(bot_token=BOT_TOKEN))
+    )
+    monkeypatch.setattr(ai_agent_gateway_watcher, "create_shard_watchers", create_watchers)
+    monkeypatch.setattr(ai_agent_gateway_watcher, "log_metrics_forever", log_forever)
+
+    await ai_agent_gateway_watcher.amain()
+
+    assert summary_finished == [True]
@@ -0,0 +1,187 @@
+import json
+
+import pytest
+
+import ai_agent_gateway_outbox
+import ai_agent_gateway_watcher
+from ai_agent_gateway_outbox import GatewayOutbox
+from ai_agent_gateway_queue import QueuedEvent
+from ai_agent_gateway_watcher import DiscordAiAgentGatewayWatcher, WatcherConfig, WatcherTarget
+
+TARGET = "https://example.com/webhook/root-discord"
+
+
+def _packet(index):
+    return {"d": {"id": f"message-{index}"}, "op": 0, "t": "MESSAGE_CREATE"}
+
+
+def test_outbox_only_exposes_due_head_entry_per_target(tmp_path):
+    outbox = GatewayOutbox(tmp_path / "outbox.sqlite3", retry_base_seconds=10)
+    outbox.add(TARGET, _packet(1), 1)
+    outbox.add(TARGET, _packet(2), 2)
+    outbox.add("https://example.com/other", _packet(3), 3)
+
+    assert outbox.next_due(TARGET) is None  # still backing off
+    head = outbox.next_due(TARGET, now=float("inf"))
+    assert head is not None
+    assert head.packet == _packet(1)
+
+    outbox.mark_delivered(head)
+    head = outbox.next_due(TARGET, now=float("inf"))
+    assert head is not None
+    assert head.packet == _packet(2)
+    assert sorted(outbox.pending_targets()) == ["https://example.com/other", TARGET]
+    outbox.close()
+
+
+def test_outbox_backs_off_then_dead_letters_and_replays(tmp_path):
+    path = tmp_path / "outbox.sqlite3"
+    outbox = GatewayOutbox(path, max_attempts=2, retry_base_seconds=10)
+    outbox.add(TARGET, _packet(1), 1)
+
+    entry = outbox.next_due(TARGET, now=float("inf"))
+    outbox.mark_failed(entry, status=503, error="HTTP 503")
+    entry = outbox.next_due(TARGET, now=float("inf"))
+    assert entry.attempts == 1
+    outbox.mark_failed(entry, status=None, error="timeout")
+
+    assert outbox.has_pending(TARGET) is False
+    [stats] = outbox.stats()
+    assert (stats["target"], stats["pending"], stats["dead"]) == (TARGET, 0, 1)
+    assert outbox.replay(dead_only=True) == 1
+    assert outbox.next_due(TARGET).attempts == 0
+
+    outbox.mark_failed(outbox.next_due(TARGET), status=404, error="HTTP 404")
+    assert outbox.has_pending(TARGET) is False  # 4xx is not retried
+    assert outbox.purge(dead_only=True) == 1
+    outbox.close()
+
+    # Pending counts survive a restart.
+    outbox = GatewayOutbox(path)
+    outbox.add(TARGET, _packet(2), 2)
+    outbox.close()
+    assert GatewayOutbox(path).has_pending(TARGET) is True
+
+
+def test_outbox_retention_caps_rows(tmp_path):
+    outbox = GatewayOutbox(tmp_path / "outbox.sqlite3", max_rows=2)
+    for index in range(4):
+        outbox.add(TARGET, _packet(index), index)
+
+    assert len(outbox.list_entries()) == 4  # retention does not run per insert
+    assert outbox.enforce_retention() == 2
+    assert [entry["timestamp_ms"] for entry in outbox.list_entries()] == [2, 3]
+    assert outbox.enforce_retention(now=float("inf")) == 2
+    assert outbox.has_pending(TARGET) is False
+    outbox.close()
+
+
+def test_outbox_cli_prints_stats(tmp_path, capsys):
+    path = tmp_path / "outbox.sqlite3"
+    outbox = GatewayOutbox(path)
+    outbox.add(TARGET, _packet(1), 1)
+    outbox.close()
+
+    ai_agent_gateway_outbox.main(["--path", str(path), "list"])
+
+    [entry] = json.loads(capsys.readouterr().out)
+    assert (entry["event_type"], entry["target"], entry["dead"]) == (
+        "MESSAGE_CREATE",
+        TARGET,
+        False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_watcher_stores_failed_forwards_and_redelivers_in_order(tmp_path, monkeypatch):
+    live_results = [False]
+    posted = []
+
+    async def forward_with_limits(**_kwargs):
+        return live_results.pop(0)
+
+    async def post_gateway_envelope(**kwargs):
+        posted.append(kwargs["envelope"]["data"]["id"])
+        return 204
+
+    monkeypatch.setattr(
+        ai_agent_gateway_watcher, "_forward_gateway_packet_with_limits", forward_with_limits
+    )
+    monkeypatch.setattr(ai_agent_gateway_watcher, "post_gateway_envelope", post_gateway_envelope)
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(bot_token="bot-token", outbox_path=tmp_path / "outbox.sqlite3")  # noqa: S106
+    )
+    watcher._outbox.retry_base_seconds = 0
+    send = watcher._sender_for(WatcherTarget(webhook_url=TARGET))
+
+    assert await send(QueuedEvent(packet=_packet(1), timestamp_ms=1)) is False
+    # Later events queue behind the failed one instead of overtaking it.
+    assert await send(QueuedEvent(packet=_packet(2), timestamp_ms=2)) is False
+    assert live_results == []
+
+    assert await watcher.retry_outbox_once() == 2
+    assert posted == ["message-1", "message-2"]
+    assert watcher._outbox.has_pending(TARGET) is False
+    await watcher.close()
+
+
+@pytest.mark.asyncio
+async def test_watcher_delivers_entries_replayed_by_another_process(tmp_path, monkeypatch):
+    posted = []
+
+    async def post_gateway_envelope(**kwargs):
+        posted.append(kwargs["envelope"]["data"]["id"])
+        return 204
+
+    monkeypatch.setattr(ai_agent_gateway_watcher, "post_gateway_envelope", post_gateway_envelope)
+    path = tmp_path / "outbox.sqlite3"
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(bot_token="bot-token", outbox_path=path)  # noqa: S106
+    )
+    watcher._outbox.add(TARGET, _packet(1), 1)
+    watcher._outbox.mark_failed(
+        watcher._outbox.next_due(TARGET, now=float("inf")), status=404, error="HTTP 404"
+    )
+    assert watcher._outbox.pending_targets() == []
+
+    cli_outbox = GatewayOutbox(path)
+    assert cli_outbox.replay(dead_only=True) == 1
+    cli_outbox.close()
+
+    assert await watcher.retry_outbox_once() == 1
+    assert posted == ["message-1"]
+    await watcher.close()
+
+
+@pytest.mark.asyncio
+async def test_watcher_stores_only_undelivered_batch_events(tmp_path, monkeypatch):
+    posted = []
+
+    async def forward_gateway_batch(**_kwargs):
+        return 1
+
+    async def post_gateway_envelope(**kwargs):
+        posted.append(kwargs["envelope"]["data"]["id"])
+        return 204
+
+    monkeypatch.setattr(ai_agent_gateway_watcher, "forward_gateway_batch", forward_gateway_batch)
+    monkeypatch.setattr(ai_agent_gateway_watcher, "post_gateway_envelope", post_gateway_envelope)
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(
+            batch_max_events=3,
+            bot_token="bot-token",  # noqa: S106
+            outbox_path=tmp_path / "outbox.sqlite3",
+        )
+    )
+    watcher._outbox.retry_base_seconds = 0
+    send_batch = watcher._batch_sender_for(
+        WatcherTarget(webhook_url=TARGET, batch_webhook_url=f"{TARGET}/batch")
+    )
+
+    assert send_batch is not None
+    events = [QueuedEvent(packet=_packet(index), timestamp_ms=index) for index in range(3)]
+    assert await send_batch(events) == 1
+
+    assert await watcher.retry_outbox_once() == 2
+    assert posted == ["message-1", "message-2"]
+    await watcher.close()
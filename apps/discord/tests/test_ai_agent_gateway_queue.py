@@ -0,0 +1,334 @@
+import asyncio
+import threading
+
+import pytest
+
+from ai_agent_gateway_queue import OverflowPolicy, QueuedEvent, TargetForwarder
+from ai_agent_gateway_watcher import DiscordAiAgentGatewayWatcher, WatcherConfig, WatcherTarget
+
+
+def _event(index):
+    return QueuedEvent(
+        packet={"d": {"id": f"message-{index}"}, "op": 0, "t": "MESSAGE_CREATE"},
+        timestamp_ms=index,
+    )
+
+
+def _packet_ids(events):
+    return [event.packet["d"]["id"] for event in events]
+
+
+def test_overflow_policy_parse_falls_back_to_default():
+    assert OverflowPolicy.parse("Drop-Oldest", OverflowPolicy.BLOCK) is OverflowPolicy.DROP_OLDEST
+    assert OverflowPolicy.parse("spill", OverflowPolicy.BLOCK) is OverflowPolicy.SPILL
+    assert OverflowPolicy.parse("unknown", OverflowPolicy.BLOCK) is OverflowPolicy.BLOCK
+
+
+@pytest.mark.asyncio
+async def test_target_forwarder_drops_oldest_events_when_full():
+    release = asyncio.Event()
+    delivered = []
+
+    async def send(event):
+        await release.wait()
+        delivered.append(event)
+        return True
+
+    forwarder = TargetForwarder(name="target", send=send, max_queue_size=2)
+    forwarder.start()
+    await forwarder.enqueue(_event(0))
+    await asyncio.sleep(0)  # worker picks up event 0 and waits on release
+    for index in range(1, 5):
+        assert await forwarder.enqueue(_event(index)) is True
+
+    release.set()
+    await forwarder.join()
+    await forwarder.stop()
+
+    assert _packet_ids(delivered) == ["message-0", "message-3", "message-4"]
+    snapshot = forwarder.snapshot()
+    assert snapshot["dropped"] == 2
+    assert snapshot["forwarded"] == 3
+    assert snapshot["depth"] == 0
+    assert snapshot["max_lag_seconds"] >= snapshot["last_lag_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_target_forwarder_spills_overflow_to_disk_in_order(tmp_path):
+    release = asyncio.Event()
+    delivered = []
+
+    async def send(event):
+        await release.wait()
+        delivered.append(event)
+        return event.packet["d"]["id"] != "message-2"
+
+    forwarder = TargetForwarder(
+        name="target",
+        send=send,
+        max_queue_size=1,
+        overflow_policy=OverflowPolicy.SPILL,
+        spill_dir=tmp_path,
+    )
+    forwarder.start()
+    for index in range(5):
+        await forwarder.enqueue(_event(index))
+        await asyncio.sleep(0)
+
+    assert forwarder.metrics.spilled == 3
+    assert list(tmp_path.iterdir())
+
+    release.set()
+    await forwarder.join()
+    await forwarder.stop()
+
+    assert _packet_ids(delivered) == [f"message-{index}" for index in range(5)]
+    assert [event.timestamp_ms for event in delivered] == list(range(5))
+    assert forwarder.metrics.forwarded == 4
+    assert forwarder.metrics.failed == 1
+    assert forwarder.metrics.spill_depth == 0
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_target_forwarder_resumes_spill_after_delivered_events(tmp_path):
+    spilled = asyncio.Event()
+    stalled = asyncio.Event()
+    release = asyncio.Event()
+    delivered = []
+    append_threads = []
+
+    async def send_three(event):
+        await spilled.wait()
+        if len(delivered) == 3:
+            stalled.set()
+            await release.wait()
+        delivered.append(event)
+        return True
+
+    first = TargetForwarder(
+        name="target",
+        send=send_three,
+        max_queue_size=1,
+        overflow_policy=OverflowPolicy.SPILL,
+        spill_dir=tmp_path,
+    )
+    append_spill = first._append_spill
+
+    def record_append(line):
+        append_threads.append(threading.get_ident())
+        append_spill(line)
+
+    first._append_spill = record_append
+    first.start()
+    for index in range(6):
+        await first.enqueue(_event(index))
+        await asyncio.sleep(0)
+    spilled.set()
+    await stalled.wait()
+    await first.stop()
+
+    assert _packet_ids(delivered) == ["message-0", "message-1", "message-2"]
+    assert len(append_threads) == 4
+    assert threading.get_ident() not in append_threads
+
+    second = TargetForwarder(
+        name="target",
+        send=send_three,
+        max_queue_size=1,
+        overflow_policy=OverflowPolicy.SPILL,
+        spill_dir=tmp_path,
+    )
+    release.set()
+    second.start()
+    await second.join()
+    await second.stop()
+
+    # message-3 was in flight when the first forwarder stopped.
+    assert _packet_ids(delivered) == [f"message-{index}" for index in range(6)]
+    assert not list(tmp_path.iterdir())
+
+
+def test_target_forwarder_requires_spill_dir_for_spill_policy():
+    with pytest.raises(ValueError, match="spill_dir"):
+        TargetForwarder(
+            name="target",
+            send=lambda _event: asyncio.sleep(0, result=True),
+            overflow_policy=OverflowPolicy.SPILL,
+        )
+
+
+@pytest.mark.asyncio
+async def test_watcher_gives_rescoped_targets_their_own_spill_files(tmp_path):
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(
+            bot_token="token",  # noqa: S106
+            overflow_policy=OverflowPolicy.SPILL,
+            spill_dir=tmp_path,
+        )
+    )
+    guild_scope = WatcherTarget(
+        webhook_url="https://example.com/webhook", discord_guild_id="guild-1"
+    )
+    channel_scope = WatcherTarget(
+        webhook_url="https://example.com/webhook",
+        discord_guild_id="guild-1",
+        external_channel_id="channel-1",
+    )
+
+    await watcher._sync_forwarders((guild_scope,))
+    old_forwarder = watcher._forwarders[guild_scope]
+    await watcher._sync_forwarders((channel_scope,))
+    new_forwarder = watcher._forwarders[channel_scope]
+
+    assert old_forwarder.name == new_forwarder.name
+    assert old_forwarder.spill_path != new_forwarder.spill_path
+    await watcher.close()
+
+
+@pytest.mark.asyncio
+async def test_watcher_removes_spill_files_of_targets_no_longer_configured(tmp_path):
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(
+            bot_token="token",  # noqa: S106
+            overflow_policy=OverflowPolicy.SPILL,
+            spill_dir=tmp_path,
+        )
+    )
+    kept = WatcherTarget(webhook_url="https://example.com/webhook/kept")
+    gone = WatcherTarget(webhook_url="https://example.com/webhook/gone")
+    await watcher._sync_forwarders((kept, gone))
+    kept_path = watcher._forwarders[kept].spill_path
+    gone_path = watcher._forwarders[gone].spill_path
+    for path in (kept_path, gone_path, tmp_path / "0123456789abcdef.jsonl"):
+        path.write_text('{"packet":{},"timestamp_ms":0}\n')
+    gone_path.with_suffix(".offset").write_text("0")
+    (tmp_path / "shard-0").mkdir()
+
+    await watcher._sync_forwarders((kept,))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [kept_path.name, "shard-0"]
+    await watcher.close()
+
+
+@pytest.mark.asyncio
+async def test_watcher_enqueue_does_not_wait_for_slow_targets(monkeypatch):
+    release = asyncio.Event()
+    sent = []
+
+    async def slow_forward(**kwargs):
+        await release.wait()
+        sent.append((kwargs["target"].webhook_url, kwargs["timestamp_ms"]))
+        return True
+
+    monkeypatch.setattr(
+        "ai_agent_gateway_watcher._forward_gateway_packet_with_limits", slow_forward
+    )
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(bot_token="token", forward_queue_size=10)  # noqa: S106
+    )
+    await watcher._sync_forwarders(
+        (
+            WatcherTarget(
+                webhook_url="https://example.com/webhook/guild-1",
+                discord_guild_id="guild-1",
+                external_channel_id="channel-1",
+            ),
+            WatcherTarget(
+                webhook_url="https://example.com/webhook/guild-2",
+                discord_guild_id="guild-2",
+                external_channel_id="channel-2",
+            ),
+        )
+    )
+
+    packet = {
+        "d": {"channel_id": "channel-1", "guild_id": "guild-1"},
+        "op": 0,
+        "t": "MESSAGE_CREATE",
+    }
+    for _ in range(3):
+        assert await asyncio.wait_for(watcher.enqueue_packet(packet), 0.1) == 1
+    assert await watcher.enqueue_packet({"d": 41, "op": 11}) == 0
+
+    metrics = {entry["target"]: entry for entry in watcher.queue_metrics()}
+    assert metrics["https://example.com/webhook/guild-1"]["enqueued"] == 3
+    assert metrics["https://example.com/webhook/guild-2"]["enqueued"] == 0
+
+    release.set()
+    await watcher.close()
+
+    assert [url for url, _timestamp in sent] == ["https://example.com/webhook/guild-1"] * 3
+    assert watcher.queue_metrics() == []
+
+
+@pytest.mark.asyncio
+async def test_target_forwarder_batches_bursts_and_sends_lone_events_individually():
+    singles = []
+    batches = []
+
+    async def send(event):
+        singles.append(event)
+        return True
+
+    async def send_batch(events):
+        batches.append(list(events))
+        return len(events)
+
+    forwarder = TargetForwarder(
+        name="target",
+        send=send,
+        send_batch=send_batch,
+        batch_max_size=3,
+        batch_max_latency_seconds=0.01,
+    )
+    for index in range(5):
+        await forwarder.enqueue(_event(index))
+    forwarder.start()
+    await forwarder.join()
+
+    # A lone event is not held back for the latency window.
+    forwarder.batch_max_latency_seconds = 60
+    await forwarder.enqueue(_event(5))
+    await asyncio.wait_for(forwarder.join(), 1)
+    await forwarder.stop()
+
+    assert [_packet_ids(batch) for batch in batches] == [
+        ["message-0", "message-1", "message-2"],
+        ["message-3", "message-4"],
+    ]
+    assert _packet_ids(singles) == ["message-5"]
+    assert forwarder.metrics.batches == 2
+    assert forwarder.metrics.forwarded == 6
+
+
+@pytest.mark.asyncio
+async def test_target_forwarder_counts_partly_delivered_batches(tmp_path):
+    batches = []
+
+    async def send(_event):
+        return True
+
+    async def send_batch(events):
+        batches.append(_packet_ids(events))
+        return 1
+
+    forwarder = TargetForwarder(
+        name="target",
+        send=send,
+        send_batch=send_batch,
+        batch_max_size=3,
+        max_queue_size=1,
+        overflow_policy=OverflowPolicy.SPILL,
+        spill_dir=tmp_path,
+    )
+    for index in range(3):
+        await forwarder.enqueue(_event(index))
+    forwarder.start()
+    await asyncio.wait_for(forwarder.join(), 1)
+    await forwarder.stop()
+
+    # Spilled events are collected into the batch behind the queued one.
+    assert batches == [["message-0", "message-1", "message-2"]]
+    assert (forwarder.metrics.forwarded, forwarder.metrics.failed) == (1, 2)
+    assert not await asyncio.to_thread(forwarder.spill_path.exists)
@@ -0,0 +1,136 @@
+import pytest
+
+from ai_agent_gateway_session import (
+    RESUMABLE_CLOSE_CODE,
+    GatewayFatalCloseError,
+    GatewaySessionState,
+    load_session_state,
+    reconnect_delay_seconds,
+    save_session_state,
+)
+from ai_agent_gateway_watcher import DiscordAiAgentGatewayWatcher, WatcherConfig
+
+BOT_TOKEN = "bot-token"  # noqa: S105
+
+
+class _WebSocket:
+    def __init__(self):
+        self.sent = []
+        self.close_codes = []
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+    async def close(self, *, code):
+        self.close_codes.append(code)
+
+
+def _watcher(tmp_path, **kwargs):
+    return DiscordAiAgentGatewayWatcher(
+        WatcherConfig(
+            bot_token=BOT_TOKEN,
+            session_state_path=tmp_path / "session.json",
+            **kwargs,
+        )
+    )
+
+
+def test_session_state_round_trips_through_disk(tmp_path):
+    path = tmp_path / "state" / "session.json"
+    state = GatewaySessionState(
+        session_id="session-1",
+        resume_gateway_url="wss://gateway-us-east1-b.discord.gg",
+        sequence=42,
+    )
+
+    save_session_state(path, state)
+
+    assert load_session_state(path) == state
+    assert load_session_state(tmp_path / "missing.json") == GatewaySessionState()
+    path.write_text("{not json", encoding="utf-8")
+    assert load_session_state(path) == GatewaySessionState()
+
+
+def test_session_state_resume_url_keeps_gateway_query():
+    state = GatewaySessionState(
+        session_id="session-1",
+        resume_gateway_url="wss://gateway-us-east1-b.discord.gg/",
+        sequence=0,
+    )
+
+    assert state.resumable is True
+    assert (
+        state.resume_url("wss://gateway.discord.gg/?v=10&encoding=json")
+        == "wss://gateway-us-east1-b.discord.gg/?v=10&encoding=json"
+    )
+    state.clear()
+    assert state.resumable is False
+
+
+def test_reconnect_delay_seconds_grows_exponentially_up_to_maximum():
+    for attempt, ceiling in [(0, 1), (1, 2), (3, 8), (10, 30)]:
+        delays = [reconnect_delay_seconds(attempt, 1, 30) for _ in range(50)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+
+
+@pytest.mark.asyncio
+async def test_watcher_tracks_ready_session_and_builds_resume_payload(tmp_path):
+    watcher = _watcher(tmp_path)
+    ws = _WebSocket()
+
+    await watcher._handle_gateway_packet(
+        ws,
+        {
+            "d": {
+                "resume_gateway_url": "wss://gateway-us-east1-b.discord.gg",
+                "session_id": "session-1",
+            },
+            "op": 0,
+            "s": 1,
+            "t": "READY",
+        },
+    )
+    await watcher._handle_gateway_packet(ws, {"d": {}, "op": 0, "s": 7, "t": "TYPING_START"})
+
+    assert watcher._resume_payload() == {
+        "d": {"seq": 7, "session_id": "session-1", "token": BOT_TOKEN},
+        "op": 6,
+    }
+    # READY is persisted immediately; a new process picks the session up.
+    restored = _watcher(tmp_path)
+    assert restored._session.session_id == "session-1"
+    assert restored._session.resumable is True
+
+
+@pytest.mark.asyncio
+async def test_watcher_handles_reconnect_invalid_session_and_heartbeat_ops(tmp_path):
+    watcher = _watcher(tmp_path)
+    watcher._session = GatewaySessionState("session-1", "wss://resume.discord.gg", 5)
+    ws = _WebSocket()
+
+    watcher._heartbeat_acked = False
+    assert await watcher._handle_gateway_packet(ws, {"op": 11}) is True
+    assert watcher._heartbeat_acked is True
+    assert await watcher._handle_gateway_packet(ws, {"op": 1}) is True
+    assert ws.sent == [{"d": 5, "op": 1}]
+
+    assert await watcher._handle_gateway_packet(ws, {"op": 7}) is False
+    assert watcher._session.resumable is True
+    assert await watcher._handle_gateway_packet(ws, {"d": True, "op": 9}) is False
+    assert watcher._session.resumable is True
+    assert await watcher._handle_gateway_packet(ws, {"d": False, "op": 9}) is False
+    assert watcher._session.resumable is False
+    assert ws.close_codes == [RESUMABLE_CLOSE_CODE] * 3
+    assert 1 <= watcher._next_reconnect_delay() <= 5
+
+
+def test_watcher_close_codes_invalidate_session_or_stop(tmp_path):
+    watcher = _watcher(tmp_path)
+    watcher._session = GatewaySessionState("session-1", "wss://resume.discord.gg", 5)
+
+    watcher._handle_close_code(RESUMABLE_CLOSE_CODE)
+    assert watcher._session.resumable is True
+    watcher._handle_close_code(4009)
+    assert watcher._session.resumable is False
+    with pytest.raises(GatewayFatalCloseError):
+        watcher._handle_close_code(4004)
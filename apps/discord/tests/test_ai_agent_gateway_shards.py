@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from ai_agent_gateway_shards import IdentifyLimiter, parse_shard_ids, resolve_shard_plan
+from ai_agent_gateway_watcher import WatcherConfig, create_shard_watchers
+
+BOT_TOKEN = "bot-token"  # noqa: S105
+
+
+class _GatewayBotResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+
+    async def json(self):
+        return self.payload
+
+    async def text(self):
+        return "error"
+
+
+class _GatewayBotContext:
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self.response
+
+    async def __aexit__(self, _exc_type, _exc, _tb):
+        return None
+
+
+class _Session:
+    def __init__(self, payload, status=200):
+        self.response = _GatewayBotResponse(payload, status)
+        self.calls = []
+
+    def get(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return _GatewayBotContext(self.response)
+
+
+def test_parse_shard_ids_accepts_lists_and_ranges():
+    assert parse_shard_ids("0, 2-4,\n3") == (0, 2, 3, 4)
+    assert parse_shard_ids("") is None
+    with pytest.raises(ValueError, match="range"):
+        parse_shard_ids("4-2")
+
+
+@pytest.mark.asyncio
+async def test_resolve_shard_plan_uses_gateway_bot_recommendation():
+    session = _Session({"session_start_limit": {"max_concurrency": 2}, "shards": 3})
+
+    plan = await resolve_shard_plan(bot_token=BOT_TOKEN, session=session)
+
+    assert (plan.shard_count, plan.shard_ids, plan.max_concurrency) == (3, (0, 1, 2), 2)
+    [(_args, kwargs)] = session.calls
+    assert kwargs["headers"] == {"Authorization": f"Bot {BOT_TOKEN}"}
+
+
+@pytest.mark.asyncio
+async def test_resolve_shard_plan_falls_back_to_configured_shards():
+    session = _Session({}, status=500)
+
+    plan = await resolve_shard_plan(
+        bot_token=BOT_TOKEN, session=session, shard_count=4, shard_ids=(1, 3)
+    )
+
+    assert (plan.shard_count, plan.shard_ids, plan.max_concurrency) == (4, (1, 3), 1)
+    with pytest.raises(ValueError, match="below the shard count"):
+        await resolve_shard_plan(
+            bot_token=BOT_TOKEN, session=session, shard_count=2, shard_ids=(2,)
+        )
+
+
+@pytest.mark.asyncio
+async def test_identify_limiter_spaces_identifies_per_bucket():
+    limiter = IdentifyLimiter(2, interval_seconds=0.05)
+    loop = asyncio.get_running_loop()
+    finished = {}
+
+    async def identify(shard_id):
+        await limiter.wait(shard_id)
+        finished[shard_id] = loop.time()
+
+    started = loop.time()
+    await asyncio.gather(*(identify(shard_id) for shard_id in range(4)))
+
+    # Shards 0/1 use separate buckets and go immediately; 2/3 wait one interval.
+    assert finished[0] - started < 0.04
+    assert finished[1] - started < 0.04
+    assert finished[2] - finished[0] >= 0.04
+    assert finished[3] - finished[1] >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_identify_limiter_coordinates_through_lock_files(tmp_path):
+    first = IdentifyLimiter(1, interval_seconds=0.05, lock_dir=tmp_path)
+    second = IdentifyLimiter(1, interval_seconds=0.05, lock_dir=tmp_path)
+    loop = asyncio.get_running_loop()
+
+    await first.wait(0)
+    started = loop.time()
+    await second.wait(0)
+
+    assert loop.time() - started >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_create_shard_watchers_identifies_with_shard_and_own_session_state(tmp_path):
+    config = WatcherConfig(
+        bot_token=BOT_TOKEN,
+        session_state_path=tmp_path / "session.json",
+        shard_ids=(1, 2),
+    )
+
+    watchers = await create_shard_watchers(
+        config, session=_Session({"session_start_limit": {"max_concurrency": 1}, "shards": 3})
+    )
+
+    assert [watcher.shard for watcher in watchers] == [(1, 3), (2, 3)]
+    assert watchers[0]._identify_payload()["d"]["shard"] == [1, 3]
+    assert watchers[0]._session_state_path == tmp_path / "session.shard-1-of-3.json"
+    assert watchers[0]._identify_limiter is watchers[1]._identify_limiter
+
+
+@pytest.mark.asyncio
+async def test_create_shard_watchers_keeps_single_connection_unsharded():
+    [watcher] = await create_shard_watchers(
+        WatcherConfig(bot_token=BOT_TOKEN), session=_Session({"shards": 1})
+    )
+
+    assert watcher.shard is None
+    assert "shard" not in watcher._identify_payload()["d"]
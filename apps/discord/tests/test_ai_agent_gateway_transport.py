@@ -0,0 +1,63 @@
+import json
+import zlib
+
+from ai_agent_gateway_transport import (
+    ZLIB_STREAM,
+    GatewayFrameDecoder,
+    with_transport_compression,
+)
+from ai_agent_gateway_watcher import WatcherConfig
+
+
+def test_with_transport_compression_sets_or_removes_query_parameter():
+    url = "wss://gateway.discord.gg/?v=10&encoding=json"
+
+    assert (
+        with_transport_compression(url, ZLIB_STREAM)
+        == "wss://gateway.discord.gg/?v=10&encoding=json&compress=zlib-stream"
+    )
+    assert with_transport_compression(f"{url}&compress=zlib-stream", None) == url
+
+
+def test_gateway_frame_decoder_inflates_split_zlib_stream_messages():
+    frames = [
+        json.dumps({"t": "MESSAGE_CREATE", "s": index, "op": 0, "d": {"content": "hi" * index}})
+        for index in range(1, 4)
+    ]
+    compressor = zlib.compressobj()
+    messages = [
+        compressor.compress(frame.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        for frame in frames
+    ]
+    decoder = GatewayFrameDecoder(ZLIB_STREAM)
+
+    decoded = [decoder.feed(messages[0])]
+    # Discord may split one compressed frame across websocket messages.
+    decoded.append(decoder.feed(messages[1][:5]))
+    decoded.append(decoder.feed(messages[1][5:]))
+    decoded.append(decoder.feed(messages[2]))
+
+    assert decoded == [frames[0], None, frames[1], frames[2]]
+    assert decoder.compressed_bytes == sum(len(message) for message in messages)
+
+
+def test_gateway_frame_decoder_passes_plain_frames_through():
+    decoder = GatewayFrameDecoder()
+
+    assert decoder.feed('{"op":11}') == '{"op":11}'
+    assert decoder.feed(b'{"op":11}') == '{"op":11}'
+
+
+def test_watcher_config_reads_transport_compression_from_env():
+    env = {
+        "DISCORD_AI_AGENT_GATEWAY_BOT_TOKEN": "bot-token",
+        "DISCORD_AI_AGENT_GATEWAY_WEBHOOK_URL": "https://example.com/webhook",
+    }
+
+    assert WatcherConfig.from_env(env).transport_compression is None
+    assert (
+        WatcherConfig.from_env(
+            {**env, "DISCORD_AI_AGENT_GATEWAY_COMPRESSION": "zlib-stream"}
+        ).transport_compression
+        == ZLIB_STREAM
+    )
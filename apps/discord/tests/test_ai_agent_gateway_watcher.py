@@ -1,9 +1,18 @@
+import asyncio
+import json
+from typing import ClassVar
+
 import pytest
 
 from ai_agent_gateway_watcher import (
+    DiscordAiAgentGatewayWatcher,
+    TargetRoutingIndex,
     WatcherConfig,
     WatcherTarget,
+    build_forwarded_gateway_batch,
     build_forwarded_gateway_event,
+    fetch_watcher_targets,
+    forward_gateway_batch,
     forward_gateway_packet,
     forward_gateway_packet_to_targets,
     gateway_packet_matches_target,
@@ -90,12 +99,14 @@ class _PostContext:
 
 class _GetResponse:
     status = 200
+    headers: ClassVar[dict[str, str]] = {"ETag": '"targets-v1"'}
 
     async def json(self):
         return {
             "targets": [
                 {
                     "channelId": "root-discord",
+                    "batchWebhookUrl": "https://example.com/webhook/root-discord/batch",
                     "discordGuildId": "guild-1",
                     "externalChannelId": "discord-channel-1",
                     "webhookUrl": "https://example.com/webhook/root-discord",
@@ -113,6 +124,10 @@ class _GetResponse:
         return ""
 
 
+class _NotModifiedResponse(_GetResponse):
+    status = 304
+
+
 class _GetContext:
     def __init__(self, calls, *args, **kwargs):
         self.calls = calls
@@ -121,6 +136,8 @@ class _GetContext:
 
     async def __aenter__(self):
         self.calls.append((self.args, self.kwargs))
+        if self.kwargs["headers"].get("If-None-Match") == _GetResponse.headers["ETag"]:
+            return _NotModifiedResponse()
         return _GetResponse()
 
     async def __aexit__(self, _exc_type, _exc, _tb):
@@ -159,11 +176,12 @@ async def test_forward_gateway_packet_posts_chat_sdk_gateway_contract():
             "Content-Type": "application/json",
             "x-discord-gateway-token": credential,
         },
-        "json": {
-            "data": {"id": "message-1"},
-            "timestamp": 1_718_000_000_000,
-            "type": "GATEWAY_MESSAGE_CREATE",
-        },
+        "data": kwargs["data"],
+    }
+    assert json.loads(kwargs["data"]) == {
+        "data": {"id": "message-1"},
+        "timestamp": 1_718_000_000_000,
+        "type": "GATEWAY_MESSAGE_CREATE",
     }
 
 
@@ -214,6 +232,7 @@ async def test_resolve_watcher_targets_preserves_apps_web_discord_scope():
 
     assert targets == (
         WatcherTarget(
+            batch_webhook_url="https://example.com/webhook/root-discord/batch",
             discord_guild_id="guild-1",
             external_channel_id="discord-channel-1",
             webhook_url="https://example.com/webhook/root-discord",
@@ -221,6 +240,54 @@ async def test_resolve_watcher_targets_preserves_apps_web_discord_scope():
     )
 
 
+@pytest.mark.asyncio
+async def test_fetch_watcher_targets_sends_etag_and_handles_not_modified():
+    session = _Session()
+    config = WatcherConfig(
+        bot_token="bot-token",  # noqa: S106
+        platform_url="https://tuturuuu.com",
+        target_channel_id="root-discord",
+        watcher_secret="watcher-secret",  # noqa: S106
+    )
+
+    targets, etag = await fetch_watcher_targets(config=config, session=session)
+    unchanged, same_etag = await fetch_watcher_targets(config=config, session=session, etag=etag)
+
+    assert targets is not None
+    assert len(targets) == 1
+    assert etag == '"targets-v1"'
+    assert unchanged is None
+    assert same_etag == etag
+    assert session.calls[1][1]["headers"]["If-None-Match"] == '"targets-v1"'
+
+
+@pytest.mark.asyncio
+async def test_refresh_targets_swaps_routing_without_reconnecting():
+    session = _Session()
+    watcher = DiscordAiAgentGatewayWatcher(
+        WatcherConfig(
+            bot_token="bot-token",  # noqa: S106
+            outbox_path=None,
+            platform_url="https://tuturuuu.com",
+            target_channel_id="root-discord",
+            watcher_secret="watcher-secret",  # noqa: S106
+        )
+    )
+    stale = WatcherTarget(webhook_url="https://example.com/webhook/stale")
+    await watcher._sync_forwarders((stale,))
+
+    try:
+        assert await watcher.refresh_targets(session) is True
+        assert [target.webhook_url for target in watcher._routing_index.targets] == [
+            "https://example.com/webhook/root-discord"
+        ]
+        assert stale not in watcher._forwarders
+        assert await watcher.refresh_targets(session) is False
+        assert session.calls[-1][1]["headers"]["If-None-Match"] == '"targets-v1"'
+    finally:
+        await watcher.close()
+
+
 def test_gateway_packet_matches_configured_target_scope():
     target = WatcherTarget(
         discord_guild_id="guild-1",
@@ -298,3 +365,177 @@ async def test_forward_gateway_packet_to_targets_skips_unmatched_discord_scope()
 
     assert forwarded is False
     assert session.calls == []
+
+
+class _SlowPostContext(_PostContext):
+    def __init__(self, calls, delays, *args, **kwargs):
+        super().__init__(calls, *args, **kwargs)
+        self.delay = delays.get(args[0], 0)
+
+    async def __aenter__(self):
+        response = await super().__aenter__()
+        await asyncio.sleep(self.delay)
+        return response
+
+
+class _SlowSession(_Session):
+    def __init__(self, delays):
+        super().__init__()
+        self.delays = delays
+
+    def post(self, *args, **kwargs):
+        return _SlowPostContext(self.calls, self.delays, *args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_forward_gateway_packet_to_targets_times_out_slow_targets_concurrently():
+    session = _SlowSession({"https://example.com/webhook/slow": 5})
+    credential = "bot-token"
+
+    started = asyncio.get_running_loop().time()
+    forwarded = await forward_gateway_packet_to_targets(
+        bot_token=credential,
+        packet={"d": {"id": "message-1"}, "op": 0, "t": "MESSAGE_CREATE"},
+        session=session,
+        webhook_urls=(
+            "https://example.com/webhook/slow",
+            "https://example.com/webhook/fast",
+        ),
+        timeout_seconds=0.05,
+        semaphore=asyncio.Semaphore(2),
+    )
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert forwarded is True
+    assert elapsed < 1
+    assert [args for args, _kwargs in session.calls] == [
+        ("https://example.com/webhook/slow",),
+        ("https://example.com/webhook/fast",),
+    ]
+
+
+def test_target_routing_index_matches_linear_scan():
+    targets = (
+        WatcherTarget(webhook_url="https://example.com/webhook/all"),
+        WatcherTarget(webhook_url="https://example.com/webhook/guild", discord_guild_id="guild-1"),
+        WatcherTarget(
+            webhook_url="https://example.com/webhook/channel",
+            discord_guild_id="guild-1",
+            external_channel_id="channel-1",
+        ),
+        WatcherTarget(
+            webhook_url="https://example.com/webhook/other-guild-channel",
+            discord_guild_id="guild-2",
+            external_channel_id="channel-1",
+        ),
+    )
+    index = TargetRoutingIndex(targets)
+    packets = [
+        {"d": {"channel_id": "channel-1", "guild_id": "guild-1"}, "t": "MESSAGE_CREATE"},
+        {
+            "d": {
+                "channel_id": "thread-1",
+                "guild_id": "guild-1",
+                "thread": {"parent_id": "channel-1"},
+            },
+            "t": "THREAD_CREATE",
+        },
+        {"d": {"channel_id": "channel-9", "guild_id": "guild-1"}, "t": "MESSAGE_CREATE"},
+        {"d": {"channel_id": "channel-1", "guild_id": "guild-2"}, "t": "MESSAGE_CREATE"},
+        {"d": {"channel_id": "channel-1"}, "t": "MESSAGE_CREATE"},
+        {"d": {"user": {"id": "user-1"}}, "t": "PRESENCE_UPDATE"},
+        {"d": 41, "op": 11},
+    ]
+
+    for packet in packets:
+        assert index.route(packet) == tuple(
+            target for target in targets if gateway_packet_matches_target(packet, target)
+        )
+
+
+def test_target_routing_index_drops_packets_without_matching_targets():
+    index = TargetRoutingIndex(
+        (
+            WatcherTarget(
+                webhook_url="https://example.com/webhook/channel",
+                discord_guild_id="guild-1",
+                external_channel_id="channel-1",
+            ),
+        )
+    )
+
+    assert index.route({"d": {"guild_id": "guild-1", "user_id": "1"}, "t": "TYPING_START"}) == ()
+    assert index.route({"d": {"status": "online"}, "t": "PRESENCE_UPDATE"}) == ()
+
+
+def test_build_forwarded_gateway_batch_wraps_gateway_events():
+    batch = build_forwarded_gateway_batch(
+        [
+            ({"d": {"id": "1"}, "op": 0, "t": "MESSAGE_CREATE"}, 10),
+            ({"d": 41, "op": 11}, 11),
+            ({"d": {"id": "2"}, "op": 0, "t": "MESSAGE_REACTION_ADD"}, 12),
+        ]
+    )
+
+    assert batch is not None
+    assert batch["type"] == "GATEWAY_BATCH"
+    assert batch["events"] == [
+        {"data": {"id": "1"}, "timestamp": 10, "type": "GATEWAY_MESSAGE_CREATE"},
+        {"data": {"id": "2"}, "timestamp": 12, "type": "GATEWAY_MESSAGE_REACTION_ADD"},
+    ]
+    assert build_forwarded_gateway_batch([({"d": 41, "op": 11}, 1)]) is None
+
+
+class _StaticContext:
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self.response
+
+    async def __aexit__(self, _exc_type, _exc, _tb):
+        return None
+
+
+class _RejectedBatchResponse:
+    status = 503
+
+    async def text(self):
+        return json.dumps({"delivered": 1, "error": "Discord Gateway batch event was rejected"})
+
+
+class _RejectedBatchSession(_Session):
+    def post(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return _StaticContext(_RejectedBatchResponse())
+
+
+@pytest.mark.asyncio
+async def test_forward_gateway_batch_reports_how_many_events_apps_web_delivered():
+    packets = [
+        ({"d": {"id": str(index)}, "op": 0, "t": "MESSAGE_CREATE"}, index) for index in range(3)
+    ]
+    session = _Session()
+
+    delivered = await forward_gateway_batch(
+        bot_token="bot-token",  # noqa: S106
+        packets=packets,
+        session=session,
+        webhook_url="https://example.com/webhook/root-discord/batch",
+    )
+
+    assert delivered == 3
+    [(args, kwargs)] = session.calls
+    assert args == ("https://example.com/webhook/root-discord/batch",)
+    assert kwargs["headers"]["x-discord-gateway-token"] == "bot-token"
+    assert len(json.loads(kwargs["data"])["events"]) == 3
+
+    assert (
+        await forward_gateway_batch(
+            bot_token="bot-token",  # noqa: S106
+            packets=packets,
+            session=_RejectedBatchSession(),
+            webhook_url="https://example.com/webhook/root-discord/batch",
+        )
+        == 1
+    )
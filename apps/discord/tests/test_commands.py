@@ -0,0 +1,304 @@
+import pytest
+
+import commands
+from commands import CommandHandler
+from task_cache import task_ownership_cache
+
+WORKSPACE_ID = "00000000-0000-0000-0000-000000000001"
+TASK_ID = "00000000-0000-0000-0000-0000000000aa"
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, supabase, table):
+        self.supabase = supabase
+        self.table = table
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return record
+
+    def execute(self):
+        self.supabase.executed.append((self.table, self.calls))
+        return _Result(self.supabase.rows.get(self.table, []))
+
+
+class _Supabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+@pytest.fixture(autouse=True)
+def _no_link_shortener(monkeypatch):
+    monkeypatch.setattr(commands, "LinkShortener", lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def _empty_task_cache():
+    task_ownership_cache.clear()
+    yield
+    task_ownership_cache.clear()
+
+
+def _task_row(ws_id=WORKSPACE_ID):
+    return {
+        "id": TASK_ID,
+        "list_id": "list-1",
+        "task_lists": {
+            "id": "list-1",
+            "board_id": "board-1",
+            "workspace_boards": {"id": "board-1", "ws_id": ws_id},
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_validate_task_and_get_users_joins_membership_into_mapping_query():
+    supabase = _Supabase(
+        {
+            "tasks": [_task_row()],
+            "discord_guild_members": [
+                {"discord_user_id": "111", "platform_user_id": "user-1"},
+                {"discord_user_id": "111", "platform_user_id": "user-1"},
+            ],
+        }
+    )
+    handler = CommandHandler()
+
+    error, user_ids, rows = await handler._validate_task_and_get_users(
+        supabase, TASK_ID, WORKSPACE_ID, ["111", "222"]
+    )
+
+    assert error is None
+    assert user_ids == ["user-1"]
+    assert len(rows) == 2
+    assert sorted(table for table, _calls in supabase.executed) == [
+        "discord_guild_members",
+        "tasks",
+    ]
+    [member_calls] = [calls for table, calls in supabase.executed if table != "tasks"]
+    assert ("eq", ("users.workspace_members.ws_id", WORKSPACE_ID), {}) in member_calls
+    assert set(handler.last_validation_timings) == {"task_ms", "members_ms", "total_ms"}
+
+
+@pytest.mark.asyncio
+async def test_validate_task_and_get_users_rejects_task_from_other_workspace():
+    supabase = _Supabase(
+        {
+            "tasks": [_task_row(ws_id="other-workspace")],
+            "discord_guild_members": [{"discord_user_id": "111", "platform_user_id": "user-1"}],
+        }
+    )
+
+    error, user_ids, _rows = await CommandHandler()._validate_task_and_get_users(
+        supabase, TASK_ID, WORKSPACE_ID, ["111"]
+    )
+
+    assert error == "❌ **Error:** Task does not belong to your workspace."
+    assert user_ids == []
+
+
+@pytest.mark.asyncio
+async def test_validate_task_and_get_users_rechecks_task_deleted_after_caching():
+    supabase = _Supabase(
+        {
+            "tasks": [_task_row()],
+            "discord_guild_members": [{"discord_user_id": "111", "platform_user_id": "user-1"}],
+        }
+    )
+    handler = CommandHandler()
+
+    await handler._validate_task_and_get_users(supabase, TASK_ID, WORKSPACE_ID, ["111"])
+    assert task_ownership_cache.get(TASK_ID) is not None
+
+    supabase.rows["tasks"] = []
+    error, user_ids, _rows = await handler._validate_task_and_get_users(
+        supabase, TASK_ID, WORKSPACE_ID, ["111"]
+    )
+
+    assert error == "❌ **Error:** Task not found or deleted."
+    assert user_ids == []
+    assert task_ownership_cache.get(TASK_ID) is None
+
+
+def test_parse_bulk_ticket_input_reads_lines_with_optional_fields():
+    tickets = commands.parse_bulk_ticket_input(
+        "- Fix login bug | 4 | Users get logged out\n\n2. Update docs\n[ ] Ship release | high",
+        default_priority="1",
+    )
+
+    assert tickets == [
+        {"title": "Fix login bug", "description": "Users get logged out", "priority": "critical"},
+        {"title": "Update docs", "description": None, "priority": "low"},
+        {"title": "Ship release", "description": None, "priority": "high"},
+    ]
+
+
+def test_parse_bulk_ticket_input_reads_csv_with_header():
+    tickets = commands.parse_bulk_ticket_input(
+        'Title,Priority,Description\nFix login,3,"Broken, again"\n,2,skipped\nDocs,,\n'
+    )
+
+    assert tickets == [
+        {"title": "Fix login", "description": "Broken, again", "priority": "high"},
+        {"title": "Docs", "description": None, "priority": "normal"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handle_bulk_ticket_modal_submission_inserts_all_rows_at_once(monkeypatch):
+    supabase = _Supabase(
+        {
+            "workspace_boards": [{"id": "board-1", "name": "Board"}],
+            "task_lists": [{"id": "list-1", "name": "List"}],
+            "tasks": [
+                {"id": "task-1", "name": "One", "priority": "normal"},
+                {"id": "task-2", "name": "Two", "priority": "high"},
+            ],
+        }
+    )
+    monkeypatch.setattr(commands, "get_supabase_client", lambda: supabase)
+    responses = []
+
+    async def send_response(payload, _app_id, _token):
+        responses.append(payload)
+
+    handler = CommandHandler()
+    monkeypatch.setattr(handler.discord_client, "send_response", send_response)
+
+    await handler.handle_bulk_ticket_modal_submission(
+        "app",
+        "token",
+        "board-1",
+        "list-1",
+        {"ticket_lines": "One\nTwo | 3"},
+        {"workspace_id": WORKSPACE_ID, "platform_user_id": "user-1", "display_name": "Ada"},
+    )
+
+    [(_table, insert_calls)] = [entry for entry in supabase.executed if entry[0] == "tasks"]
+    [(_name, (payloads,), _kwargs)] = insert_calls
+    assert [(row["name"], row["priority"], row["list_id"]) for row in payloads] == [
+        ("One", "normal", "list-1"),
+        ("Two", "high", "list-1"),
+    ]
+    [response] = responses
+    assert "2 task ticket(s) created by Ada" in response["content"]
+
+
+async def _run_assignment_command(monkeypatch, supabase, command, users):
+    monkeypatch.setattr(commands, "get_supabase_client", lambda: supabase)
+    responses = []
+
+    async def send_response(payload, _app_id, _token):
+        responses.append(payload["content"])
+
+    handler = CommandHandler()
+    monkeypatch.setattr(handler.discord_client, "send_response", send_response)
+    await getattr(handler, command)(
+        "app",
+        "token",
+        [{"name": "task_id", "value": TASK_ID}, {"name": "users", "value": users}],
+        {"workspace_id": WORKSPACE_ID},
+    )
+    [response] = responses
+    [(_table, write_calls)] = [entry for entry in supabase.executed if entry[0] == "task_assignees"]
+    return response.splitlines(), write_calls
+
+
+def _assignment_rows(task_assignees):
+    return {
+        "tasks": [_task_row()],
+        "discord_guild_members": [
+            {"discord_user_id": "111", "platform_user_id": "user-1"},
+            {"discord_user_id": "222", "platform_user_id": "user-2"},
+        ],
+        "task_assignees": task_assignees,
+    }
+
+
+@pytest.mark.asyncio
+async def test_handle_assign_command_upserts_all_new_assignees_at_once(monkeypatch):
+    supabase = _Supabase(_assignment_rows([{"user_id": "user-1"}, {"user_id": "user-2"}]))
+
+    lines, write_calls = await _run_assignment_command(
+        monkeypatch, supabase, "handle_assign_command", "<@111> <@!222> <@111>"
+    )
+
+    assert write_calls == [
+        (
+            "upsert",
+            (
+                [
+                    {"task_id": TASK_ID, "user_id": "user-1"},
+                    {"task_id": TASK_ID, "user_id": "user-2"},
+                ],
+            ),
+            {"on_conflict": "task_id,user_id", "ignore_duplicates": True},
+        )
+    ]
+    assert lines == [f"✅ Added 2 assignee(s) to task `{TASK_ID}`: <@111>, <@222>"]
+
+
+@pytest.mark.asyncio
+async def test_handle_assign_command_reports_existing_assignees(monkeypatch):
+    # The upsert only returns rows it inserted; user-2 was already assigned.
+    supabase = _Supabase(_assignment_rows([{"user_id": "user-1"}]))
+
+    lines, _write_calls = await _run_assignment_command(
+        monkeypatch, supabase, "handle_assign_command", "<@111> <@222>"
+    )
+
+    assert lines == [
+        f"✅ Added 1 assignee(s) to task `{TASK_ID}`: <@111>",
+        "i Already assigned: <@222>",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handle_assign_command_lists_unresolved_mentions(monkeypatch):
+    rows = _assignment_rows([])
+    rows["discord_guild_members"] = rows["discord_guild_members"][:1]
+    supabase = _Supabase(rows)
+
+    lines, _write_calls = await _run_assignment_command(
+        monkeypatch, supabase, "handle_assign_command", "<@111>, <@333>, <@333>"
+    )
+
+    assert lines == [
+        f"i No new assignees added to task `{TASK_ID}`.",
+        "i Already assigned: <@111>",
+        "⚠️ Not in this workspace: <@333>",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handle_unassign_command_deletes_in_one_query(monkeypatch):
+    # The delete only returns rows it removed; user-2 was not assigned.
+    supabase = _Supabase(_assignment_rows([{"user_id": "user-1"}]))
+
+    lines, write_calls = await _run_assignment_command(
+        monkeypatch, supabase, "handle_unassign_command", "<@111> <@222> <@333>"
+    )
+
+    assert write_calls == [
+        ("delete", (), {}),
+        ("eq", ("task_id", TASK_ID), {}),
+        ("in_", ("user_id", ["user-1", "user-2"]), {}),
+    ]
+    assert lines == [
+        f"✅ Removed 1 assignment(s) from task `{TASK_ID}`: <@111>",
+        "i Not assigned: <@222>",
+        "⚠️ Not in this workspace: <@333>",
+    ]
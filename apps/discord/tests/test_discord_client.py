@@ -0,0 +1,49 @@
+from discord_client import (
+    MODAL_TITLE_MAX_LENGTH,
+    SELECT_OPTION_VALUE_MAX_LENGTH,
+    DiscordClient,
+)
+
+BOARD_ID = "11111111-1111-1111-1111-111111111111"
+LIST_ID = "22222222-2222-2222-2222-222222222222"
+
+
+def test_list_selection_value_round_trips_ids_and_name():
+    value = DiscordClient.encode_list_selection_value(BOARD_ID, LIST_ID, "Backlog")
+
+    assert DiscordClient.parse_list_selection_value(value) == (BOARD_ID, LIST_ID, "Backlog")
+
+
+def test_list_selection_value_truncates_name_to_discord_limit():
+    value = DiscordClient.encode_list_selection_value(BOARD_ID, LIST_ID, "Sprint | " * 20)
+
+    assert len(value) <= SELECT_OPTION_VALUE_MAX_LENGTH
+    board_id, list_id, list_name = DiscordClient.parse_list_selection_value(value) or ("", "", "")
+    assert (board_id, list_id) == (BOARD_ID, LIST_ID)
+    assert list_name.startswith("Sprint | Sprint")
+
+
+def test_parse_list_selection_value_accepts_legacy_and_rejects_invalid_values():
+    assert DiscordClient.parse_list_selection_value(f"{BOARD_ID}|{LIST_ID}") == (
+        BOARD_ID,
+        LIST_ID,
+        "Selected List",
+    )
+    assert DiscordClient.parse_list_selection_value(LIST_ID) is None
+    assert DiscordClient.parse_list_selection_value(f"|{LIST_ID}") is None
+
+
+def test_create_list_selection_components_encodes_list_names():
+    [row] = DiscordClient.create_list_selection_components(
+        [{"id": LIST_ID, "name": "Doing", "status": "active"}], BOARD_ID
+    )
+    [option] = row["components"][0]["options"]
+
+    assert option["value"] == f"{BOARD_ID}|{LIST_ID}|Doing"
+
+
+def test_create_ticket_form_modal_caps_title_length():
+    modal = DiscordClient.create_ticket_form_modal(BOARD_ID, LIST_ID, "", "A" * 80)
+
+    assert modal["data"]["custom_id"] == f"ticket_form|{BOARD_ID}|{LIST_ID}"
+    assert len(modal["data"]["title"]) == MODAL_TITLE_MAX_LENGTH
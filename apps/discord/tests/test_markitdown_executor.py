@@ -0,0 +1,116 @@
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from markitdown_executor import (
+    ConversionAdmission,
+    ConversionProcessPool,
+    parse_format_limits,
+    spool_for_worker,
+)
+
+
+def test_parse_format_limits_ignores_invalid_entries():
+    assert parse_format_limits(".PDF=2, mp3=1, docx=zero, =3, wav=0") == {"pdf": 2, "mp3": 1}
+
+
+@pytest.mark.asyncio
+async def test_admission_rejects_when_wait_queue_is_full():
+    admission = ConversionAdmission(max_in_flight=1, max_queued=0, queue_timeout_seconds=1)
+
+    async with admission.admit("pdf"):
+        with pytest.raises(HTTPException) as error:
+            async with admission.admit("pdf"):
+                pass
+
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "1"}
+    assert admission.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_times_out_queued_conversions():
+    admission = ConversionAdmission(max_in_flight=1, queue_timeout_seconds=0.01)
+
+    async with admission.admit("pdf"):
+        with pytest.raises(HTTPException) as error:
+            async with admission.admit("docx"):
+                pass
+
+    assert error.value.status_code == 429
+    async with admission.admit("docx"):
+        assert admission.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_lets_batch_items_wait_past_the_queue_limits():
+    admission = ConversionAdmission(max_in_flight=1, max_queued=0, queue_timeout_seconds=0.01)
+
+    async def convert_later():
+        async with admission.admit("pdf", queue_limits=False):
+            return admission.waiting
+
+    async with admission.admit("pdf"):
+        batch_item = asyncio.create_task(convert_later())
+        await asyncio.sleep(0.05)
+        assert not batch_item.done()
+
+    assert await batch_item == 0
+    assert admission.rejected == 0
+
+
+@pytest.mark.asyncio
+async def test_format_limits_leave_global_slots_for_other_formats():
+    admission = ConversionAdmission(
+        max_in_flight=2, queue_timeout_seconds=0.01, format_limits={"mp3": 1}
+    )
+    release = asyncio.Event()
+
+    async def hold(conversion_format):
+        async with admission.admit(conversion_format):
+            await release.wait()
+
+    holder = asyncio.create_task(hold("mp3"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException):
+        async with admission.admit("mp3"):
+            pass
+    async with admission.admit("pdf"):
+        pass
+
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_process_pool_runs_functions_in_worker_processes():
+    pool = ConversionProcessPool(workers=1)
+    try:
+        assert await pool.run(parse_format_limits, "pdf=2") == {"pdf": 2}
+    finally:
+        pool.shutdown()
+
+
+def test_spool_for_worker_sends_large_inputs_as_a_temp_file_path():
+    stream = io.BytesIO(b"x" * 10)
+    stream.seek(4)
+
+    assert spool_for_worker(stream, max_inline_bytes=10) == b"x" * 10
+
+    path = Path(spool_for_worker(stream, max_inline_bytes=4))
+    try:
+        assert path.read_bytes() == b"x" * 10
+    finally:
+        path.unlink()
+
+
+def test_spool_for_worker_passes_named_files_by_their_own_path(tmp_path):
+    with (tmp_path / "download.bin").open("w+b") as stream:
+        stream.write(b"x" * 10)
+
+        assert spool_for_worker(stream, max_inline_bytes=4) == stream.name
+    assert list(tmp_path.iterdir()) == [tmp_path / "download.bin"]
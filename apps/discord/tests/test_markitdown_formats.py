@@ -0,0 +1,137 @@
+import io
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from markitdown_formats import (
+    ConversionLimits,
+    convert_pdf_pages,
+    convert_spreadsheet_rows,
+    limit_csv_rows,
+    limit_pages,
+    limit_table_rows,
+    sniff_format,
+    truncate_text_download,
+    validate_sniffed_format,
+)
+
+
+def _pdf(page_texts):
+    """A minimal PDF with one line of Helvetica text per page."""
+    first_page = 4
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (
+            b" ".join(b"%d 0 R" % (first_page + 2 * i) for i in range(len(page_texts))),
+            len(page_texts),
+        ),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for index, text in enumerate(page_texts):
+        stream = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode()
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (first_page + 2 * index + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return pdf
+
+
+@pytest.mark.parametrize(
+    ("head", "kind"),
+    [
+        (b"%PDF-1.7\n", "pdf"),
+        (b"PK\x03\x04\x14\x00", "zip"),
+        (b"RIFF\x24\x00\x00\x00WAVEfmt ", "audio"),
+        (b"name,count\nxin ch\xc3", "text"),
+        (b"\x7fELF\x02\x01\x01\x00", None),
+        (b"\x1f\x8b\x08\x00\x00\x00", None),
+    ],
+)
+def test_sniff_format_classifies_magic_bytes(head, kind):
+    assert sniff_format(head) == kind
+
+
+def test_validate_sniffed_format_rejects_mismatched_and_unknown_files():
+    with pytest.raises(HTTPException) as mismatch:
+        validate_sniffed_format(b"<!doctype html><title>Error</title>", "report.pdf")
+    with pytest.raises(HTTPException) as unknown:
+        validate_sniffed_format(b"\x7fELF\x02\x01\x01\x00", "upload.bin")
+
+    assert mismatch.value.status_code == 415
+    assert mismatch.value.detail == "File content does not match its .pdf extension"
+    assert unknown.value.status_code == 415
+    assert validate_sniffed_format(b"caf\xe9,1\n", "legacy.csv") == "text"
+
+
+def test_conversion_limits_describe_themselves_for_cache_keys():
+    assert not ConversionLimits()
+    assert ConversionLimits(max_pages=2).cache_suffix == "|max_pages=2"
+
+
+def test_truncate_text_download_cuts_back_to_a_full_line():
+    assert truncate_text_download(b"a,1\nb,2\nc,3\n", 10) == b"a,1\nb,2\n"
+    assert truncate_text_download(b"abcdef", 4) == b"abcd"
+
+
+def test_limit_csv_rows_keeps_header_and_quoted_newlines():
+    limited, truncated = limit_csv_rows(io.BytesIO(b'name,notes\nalpha,"two\nlines"\nbeta,x\n'), 1)
+
+    assert limited.read().decode().splitlines() == ["name,notes", 'alpha,"two', 'lines"']
+    assert truncated is True
+    assert limit_csv_rows(io.BytesIO(b"name\nalpha\n"), 1)[1] is False
+
+
+def test_convert_pdf_pages_reports_whether_pages_were_left_out():
+    pdf = _pdf(["First page", "Second page"])
+
+    text, truncated = convert_pdf_pages(io.BytesIO(pdf), 1)
+    whole, whole_truncated = convert_pdf_pages(io.BytesIO(pdf), 2)
+
+    assert text == "First page"
+    assert truncated is True
+    assert "Second page" in whole
+    assert whole_truncated is False
+
+
+def test_convert_spreadsheet_rows_reads_only_the_first_rows_of_each_sheet():
+    workbook = io.BytesIO()
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        pd.DataFrame({"n": range(100)}).to_excel(writer, sheet_name="Data", index=False)
+    workbook.seek(0)
+
+    markdown, truncated = convert_spreadsheet_rows(workbook, ".xlsx", 2)
+    workbook.seek(0)
+    _whole, whole_truncated = convert_spreadsheet_rows(workbook, ".xlsx", 100)
+
+    assert markdown.startswith("## Data\n")
+    assert "| 1 |" in markdown
+    assert "| 2 |" not in markdown
+    assert truncated is True
+    assert whole_truncated is False
+
+
+def test_limit_pages_and_table_rows_trim_converted_markdown():
+    slides = "<!-- Slide number: 1 -->\nOne\n\n<!-- Slide number: 2 -->\nTwo\n"
+    table = "| a |\n| --- |\n| 1 |\n| 2 |\n| 3 |\n\nAfter"
+
+    assert limit_pages(slides, 1) == ("<!-- Slide number: 1 -->\nOne", True)
+    assert limit_pages(slides, 2)[1] is False
+    assert limit_table_rows(table, 2) == ("| a |\n| --- |\n| 1 |\n| 2 |\n\nAfter", True)
+    assert limit_table_rows(table, 3) == (table, False)
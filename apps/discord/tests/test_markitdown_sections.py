@@ -0,0 +1,48 @@
+import json
+
+from markitdown_sections import iter_markdown_ndjson, iter_markdown_text, split_markdown
+
+
+def test_split_markdown_by_heading_skips_headings_inside_code_fences():
+    markdown = "Intro\n# Setup\nRun it.\n```sh\n# not a heading\n```\n## Usage ##\nCall it.\n"
+
+    sections = list(split_markdown(markdown, "heading"))
+
+    assert [(section.heading, section.level) for section in sections] == [
+        (None, None),
+        ("Setup", 1),
+        ("Usage", 2),
+    ]
+    assert "# not a heading" in sections[1].markdown
+    assert "".join(section.markdown for section in sections) == markdown
+
+
+def test_split_markdown_by_page_uses_form_feeds_and_slide_markers():
+    pdf = "Page one\fPage two\f"
+    pptx = "\n\n<!-- Slide number: 1 -->\n# Title\n\n<!-- Slide number: 2 -->\nBody\n"
+
+    assert [(section.page, section.markdown) for section in split_markdown(pdf, "page")] == [
+        (1, "Page one"),
+        (2, "Page two"),
+    ]
+    assert [section.page for section in split_markdown(pptx, "page")] == [1, 2]
+
+
+def test_iter_markdown_ndjson_streams_metadata_sections_and_end():
+    result = {"ok": True, "markdown": "abcdefg", "title": "Doc", "cached": False}
+
+    lines = [json.loads(line) for line in iter_markdown_ndjson(result, chunk_chars=3)]
+
+    assert lines[0] == {
+        "type": "metadata",
+        "ok": True,
+        "title": "Doc",
+        "cached": False,
+        "split_by": None,
+    }
+    assert [line["markdown"] for line in lines[1:-1]] == ["abc", "def", "g"]
+    assert lines[-1] == {"type": "end", "sections": 3}
+
+
+def test_iter_markdown_text_encodes_each_chunk():
+    assert list(iter_markdown_text("xin chào", chunk_chars=4)) == [b"xin ", "chào".encode()]
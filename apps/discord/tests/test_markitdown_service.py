@@ -1,7 +1,26 @@
+import asyncio
+import io
+import json
+import tempfile
+from pathlib import Path
+
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from fastapi import HTTPException
 
+import app as discord_app
 import markitdown_service
+from markitdown_cache import CachedConversion, MarkdownConversionCache, conversion_cache_key
+from markitdown_executor import ConversionAdmission, ConversionProcessPool, spool_for_worker
+from markitdown_formats import ConversionLimits
+
+
+@pytest.fixture(autouse=True)
+def conversion_cache(monkeypatch, tmp_path):
+    cache = MarkdownConversionCache(disk_dir=tmp_path / "cache")
+    monkeypatch.setattr(markitdown_service, "markitdown_cache", cache)
+    return cache
 
 
 def test_resolve_supabase_hostname_uses_server_url_fallback(monkeypatch):
@@ -46,7 +65,7 @@ def test_validate_direct_youtube_url_rejects_non_youtube_hosts():
 
 @pytest.mark.asyncio
 async def test_handle_markitdown_converts_direct_youtube_url(monkeypatch):
-    async def convert_url(url: str, enable_plugins: bool):
+    async def convert_url(url: str, enable_plugins: bool, **_kwargs):
         assert url == "https://youtu.be/dQw4w9WgXcQ"
         assert enable_plugins is True
         return "# Transcript", "Video title"
@@ -66,6 +85,7 @@ async def test_handle_markitdown_converts_direct_youtube_url(monkeypatch):
         "title": "Video title",
         "filename": "video.md",
         "url": "https://youtu.be/dQw4w9WgXcQ",
+        "cached": False,
     }
 
 
@@ -81,3 +101,382 @@ async def test_handle_markitdown_requires_one_source():
 
     assert error.value.status_code == 400
     assert error.value.detail == "Provide exactly one of signed_url or url"
+
+
+async def _serve_bytes(body: bytes, *, chunked: bool = False):
+    async def handle(request):
+        if not chunked:
+            return web.Response(body=body)
+        response = web.StreamResponse()
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for start in range(0, len(body), 16):
+            await response.write(body[start : start + 16])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/storage/v1/object/sign/workspaces/file.csv", handle)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    return server
+
+
+@pytest.mark.asyncio
+async def test_download_signed_url_keeps_small_files_in_memory():
+    server = await _serve_bytes(b"name,count\nalpha,1\n")
+    try:
+        download = await markitdown_service._download_signed_url_to_buffer(
+            str(server.make_url("/storage/v1/object/sign/workspaces/file.csv?token=t")),
+            "127.0.0.1",
+        )
+    finally:
+        await server.close()
+
+    with download.buffer as buffer:
+        assert download.size == 19
+        assert isinstance(buffer, io.BytesIO)
+        assert buffer.read() == b"name,count\nalpha,1\n"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunked", [False, True])
+async def test_download_signed_url_writes_large_files_once_to_a_named_file(monkeypatch, chunked):
+    monkeypatch.setattr(markitdown_service, "MARKITDOWN_SPOOL_MAX_BYTES", 8)
+    server = await _serve_bytes(b"x" * 64, chunked=chunked)
+    try:
+        download = await markitdown_service._download_signed_url_to_buffer(
+            str(server.make_url("/storage/v1/object/sign/workspaces/file.csv?token=t")),
+            "127.0.0.1",
+        )
+    finally:
+        await server.close()
+
+    with download.buffer as buffer:
+        assert download.size == 64
+        # Workers get the download's own path rather than a second copy.
+        assert spool_for_worker(buffer, 8) == buffer.name
+        assert buffer.read() == b"x" * 64
+    assert not await asyncio.to_thread(Path(buffer.name).exists)
+
+
+@pytest.mark.asyncio
+async def test_download_signed_url_rejects_unsupported_files_from_the_first_chunk():
+    server = await _serve_bytes(b"\x7fELF\x02\x01\x01\x00" + b"\0" * 64)
+    try:
+        with pytest.raises(HTTPException) as error:
+            await markitdown_service._download_signed_url_to_buffer(
+                str(server.make_url("/storage/v1/object/sign/workspaces/file.csv?token=t")),
+                "127.0.0.1",
+                filename="file.csv",
+            )
+    finally:
+        await server.close()
+
+    assert error.value.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_download_signed_url_stops_text_files_at_max_bytes():
+    server = await _serve_bytes(b"name,count\nalpha,1\nbeta,2\n")
+    try:
+        download = await markitdown_service._download_signed_url_to_buffer(
+            str(server.make_url("/storage/v1/object/sign/workspaces/file.csv?token=t")),
+            "127.0.0.1",
+            filename="file.csv",
+            max_bytes=24,
+        )
+    finally:
+        await server.close()
+
+    with download.buffer as buffer:
+        assert download.truncated is True
+        assert buffer.read() == b"name,count\nalpha,1\n"
+
+
+def test_convert_stream_sync_limits_csv_rows():
+    markdown, _title, truncated = markitdown_service._convert_stream_sync(
+        io.BytesIO(b"name,count\nalpha,1\nbeta,2\n"),
+        "report.csv",
+        enable_plugins=False,
+        limits=ConversionLimits(max_rows=1),
+    )
+
+    assert "| alpha | 1 |" in markdown
+    assert "beta" not in markdown
+    assert truncated is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("limits", "partial"),
+    [
+        (ConversionLimits(max_rows=1), True),
+        (ConversionLimits(max_rows=5), False),
+        (ConversionLimits(max_bytes=20), True),
+        (ConversionLimits(max_bytes=1024), False),
+    ],
+)
+async def test_handle_markitdown_reports_partial_only_when_something_was_cut(
+    monkeypatch, limits, partial
+):
+    monkeypatch.setattr(markitdown_service, "conversion_pool", ConversionProcessPool(0))
+    server = await _serve_bytes(b"name,count\nalpha,1\nbeta,2\n")
+    monkeypatch.setenv("SUPABASE_URL", str(server.make_url("/")))
+    try:
+        result = await markitdown_service.handle_markitdown(
+            str(server.make_url("/storage/v1/object/sign/workspaces/file.csv?token=t")),
+            "file.csv",
+            False,
+            limits=limits,
+        )
+    finally:
+        await server.close()
+
+    assert result["partial"] is partial
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spool_max_bytes", [1024, 8])
+async def test_convert_stream_on_threads_accepts_spooled_downloads(monkeypatch, spool_max_bytes):
+    monkeypatch.setattr(markitdown_service, "conversion_pool", ConversionProcessPool(0))
+    monkeypatch.setattr(markitdown_service, "MARKITDOWN_SPOOL_MAX_BYTES", spool_max_bytes)
+    with tempfile.SpooledTemporaryFile(max_size=spool_max_bytes) as buffer:
+        buffer.write(b"name,count\nalpha,1\n")
+        markdown, _title, _truncated = await markitdown_service._convert_stream(
+            buffer, "file.csv", False
+        )
+
+    assert "| alpha | 1 |" in markdown
+
+
+def test_convert_stream_sync_uses_filename_extension():
+    markdown, _title, _truncated = markitdown_service._convert_stream_sync(
+        io.BytesIO(b"name,count\nalpha,1\n"),
+        "report.csv",
+        enable_plugins=False,
+    )
+
+    assert "| name | count |" in markdown
+    assert "| alpha | 1 |" in markdown
+
+
+def test_converter_pool_reuses_idle_converters_and_isolates_concurrent_leases():
+    pool = markitdown_service.MarkItDownPool()
+
+    with pool.lease(False) as first, pool.lease(False) as concurrent:
+        assert concurrent is not first
+    with pool.lease(False) as reused:
+        assert reused in {first, concurrent}
+    with pool.lease(True) as plugins_enabled:
+        assert plugins_enabled not in {first, concurrent}
+
+
+@pytest.mark.asyncio
+async def test_handle_markitdown_caches_youtube_conversions_by_video_id(monkeypatch):
+    calls = []
+
+    async def convert_url(url: str, _enable_plugins: bool, **_kwargs):
+        calls.append(url)
+        return "# Transcript", "Video title"
+
+    monkeypatch.setattr(markitdown_service, "_convert_url", convert_url)
+
+    first = await markitdown_service.handle_markitdown(
+        None, "video.md", True, url="https://youtu.be/dQw4w9WgXcQ"
+    )
+    second = await markitdown_service.handle_markitdown(
+        None, "video.md", True, url="https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42"
+    )
+
+    assert calls == ["https://youtu.be/dQw4w9WgXcQ"]
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["markdown"] == "# Transcript"
+
+
+@pytest.mark.asyncio
+async def test_handle_markitdown_skips_download_on_etag_hit(monkeypatch, conversion_cache):
+    monkeypatch.setenv("SUPABASE_URL", "https://project-ref.supabase.co")
+    signed_url = (
+        "https://project-ref.supabase.co/storage/v1/object/sign/workspaces/file.csv?token=t"
+    )
+    conversion_cache.set(
+        conversion_cache_key(
+            'object:workspaces/file.csv@"etag-1"', enable_plugins=True, extension=".csv"
+        ),
+        CachedConversion(markdown="| cached |", title=None),
+    )
+
+    async def download(_signed_url, _host, *, lookup_etag, **_kwargs):
+        cached = await lookup_etag('"etag-1"')
+        assert cached is not None
+        return markitdown_service._SignedDownload(
+            buffer=None, size=0, etag='"etag-1"', content_hash=None, cached=cached
+        )
+
+    monkeypatch.setattr(markitdown_service, "_download_signed_url_to_buffer", download)
+
+    result = await markitdown_service.handle_markitdown(signed_url, "file.csv", True)
+
+    assert result["cached"] is True
+    assert result["markdown"] == "| cached |"
+
+
+def test_conversion_cache_evicts_memory_by_size_and_promotes_from_disk(tmp_path):
+    cache = MarkdownConversionCache(memory_max_bytes=10, disk_dir=tmp_path)
+    cache.set("a", CachedConversion(markdown="aaaaaa", title=None))
+    cache.set("b", CachedConversion(markdown="bbbbbb", title=None))
+
+    assert len(cache) == 1
+    assert cache.get("a") == CachedConversion(markdown="aaaaaa", title=None)
+    assert cache.get("b") is not None
+
+
+def test_conversion_cache_bounds_disk_usage(tmp_path):
+    cache = MarkdownConversionCache(memory_max_bytes=0, disk_max_bytes=120, disk_dir=tmp_path)
+    for key in ("a", "b", "c"):
+        cache.set(key, CachedConversion(markdown=key * 30, title=None))
+
+    assert sum(path.stat().st_size for path in tmp_path.glob("*.json")) <= 120
+    assert cache.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_conversion_cache_tracks_disk_usage_without_rescanning(monkeypatch, tmp_path):
+    MarkdownConversionCache(memory_max_bytes=0, disk_dir=tmp_path).set(
+        "old", CachedConversion(markdown="o" * 30, title=None)
+    )
+    cache = MarkdownConversionCache(memory_max_bytes=0, disk_max_bytes=240, disk_dir=tmp_path)
+    scans = []
+    glob = type(tmp_path).glob
+    monkeypatch.setattr(
+        type(tmp_path), "glob", lambda path, pattern: scans.append(pattern) or glob(path, pattern)
+    )
+
+    for key in ("a", "b", "c"):
+        await cache.aset(key, CachedConversion(markdown=key * 30, title=None))
+    assert await cache.aget("a") is not None
+    await cache.aset("d", CachedConversion(markdown="d" * 30, title=None))
+
+    assert scans == ["*.json"]
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["a", "c", "d"]
+    assert cache._disk_bytes == sum(path.stat().st_size for path in tmp_path.glob("*.json"))
+
+
+@pytest.mark.asyncio
+async def test_modal_converter_returns_http_errors_for_the_web_app_to_reraise(monkeypatch):
+    async def handle_markitdown(_signed_url, _filename, _enable_plugins, url=None, **_kwargs):
+        if url:
+            return {"ok": True, "markdown": "# Video"}
+        raise HTTPException(status_code=429, detail="busy", headers={"Retry-After": "30"})
+
+    monkeypatch.setattr(discord_app, "handle_markitdown", handle_markitdown)
+    converter = discord_app.MarkItDownConverter()
+
+    converted = await converter.convert.local(None, None, True, url="https://youtu.be/abc")
+    rejected = await converter.convert.local("https://example.com/file.pdf", None, True)
+
+    assert converted == {"result": {"ok": True, "markdown": "# Video"}}
+    assert rejected == {
+        "error": {"status_code": 429, "detail": "busy", "headers": {"Retry-After": "30"}}
+    }
+
+
+@pytest.mark.asyncio
+async def test_stream_markitdown_batch_reports_results_and_item_errors(monkeypatch):
+    async def convert_stream(stream, filename, _enable_plugins, _limits, **_kwargs):
+        return f"| {stream.read().decode().strip()} |", filename, False
+
+    monkeypatch.setattr(markitdown_service, "_convert_stream", convert_stream)
+    server = await _serve_bytes(b"alpha,1")
+    monkeypatch.setenv("SUPABASE_URL", str(server.make_url("/")))
+    sources = [
+        markitdown_service.MarkitdownSource(
+            signed_url=str(server.make_url("/storage/v1/object/sign/workspaces/file.csv?token=t")),
+            filename="file.csv",
+        ),
+        markitdown_service.MarkitdownSource(url="https://example.com/video"),
+    ]
+    try:
+        lines = [line async for line in markitdown_service.stream_markitdown_batch(sources)]
+    finally:
+        await server.close()
+
+    results = sorted((json.loads(line) for line in lines), key=lambda result: result["index"])
+    assert all(line.endswith(b"\n") for line in lines)
+    assert results[0]["ok"] is True
+    assert results[0]["markdown"] == "| alpha,1 |"
+    assert results[1] == {
+        "index": 1,
+        "ok": False,
+        "status_code": 400,
+        "error": "Unsupported direct URL host",
+    }
+
+
+@pytest.mark.asyncio
+async def test_stream_markitdown_batch_larger_than_admission_capacity_waits_its_turn(
+    monkeypatch,
+):
+    class _SlowPool:
+        async def run(self, _function, url, _enable_plugins):
+            await asyncio.sleep(0.02)
+            return f"# {url}", None
+
+    monkeypatch.setattr(
+        markitdown_service,
+        "conversion_admission",
+        ConversionAdmission(max_in_flight=2, max_queued=0, queue_timeout_seconds=0.01),
+    )
+    monkeypatch.setattr(markitdown_service, "conversion_pool", _SlowPool())
+    sources = [
+        markitdown_service.MarkitdownSource(url=f"https://youtu.be/video{index:06d}")
+        for index in range(7)
+    ]
+
+    lines = [line async for line in markitdown_service.stream_markitdown_batch(sources)]
+
+    results = [json.loads(line) for line in lines]
+    assert sorted(result["index"] for result in results) == list(range(7))
+    assert all(result["ok"] for result in results)
+    assert markitdown_service.conversion_admission.rejected == 0
+
+
+@pytest.mark.asyncio
+async def test_remote_batch_converts_every_item_as_its_own_call():
+    started = []
+    all_started = asyncio.Event()
+
+    async def convert(**item):
+        started.append(item["url"])
+        if len(started) == 3:
+            all_started.set()
+        await all_started.wait()
+        if item["url"] == "busy":
+            return {"error": {"status_code": 429, "detail": "busy", "headers": None}}
+        if item["url"] == "broken":
+            raise RuntimeError("container lost")
+        return {"result": {"ok": True, "markdown": f"# {item['url']}"}}
+
+    lines = [
+        line
+        async for line in discord_app.stream_markitdown_batch_remote(
+            [{"url": "video"}, {"url": "busy"}, {"url": "broken"}], convert
+        )
+    ]
+
+    results = sorted((json.loads(line) for line in lines), key=lambda result: result["index"])
+    assert results == [
+        {"index": 0, "ok": True, "markdown": "# video"},
+        {"index": 1, "ok": False, "status_code": 429, "error": "busy"},
+        {"index": 2, "ok": False, "status_code": 500, "error": "Failed to convert file"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_markitdown_batch_rejects_empty_batches():
+    with pytest.raises(HTTPException) as error:
+        await anext(markitdown_service.stream_markitdown_batch([]))
+
+    assert error.value.status_code == 400
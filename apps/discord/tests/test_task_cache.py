@@ -0,0 +1,54 @@
+from task_cache import TaskOwnership, TaskOwnershipCache, task_ownership_from_row
+
+
+def _ownership(task_id: str, ws_id: str = "ws-1") -> TaskOwnership:
+    return TaskOwnership(task_id=task_id, list_id="list-1", board_id="board-1", ws_id=ws_id)
+
+
+def test_task_ownership_cache_evicts_least_recently_used_entry():
+    cache = TaskOwnershipCache(ttl_seconds=60, max_entries=2)
+    cache.set(_ownership("task-1"))
+    cache.set(_ownership("task-2"))
+
+    assert cache.get("task-1") is not None
+    cache.set(_ownership("task-3"))
+
+    assert cache.get("task-2") is None
+    assert cache.get("task-1") == _ownership("task-1")
+    assert len(cache) == 2
+
+
+def test_task_ownership_cache_expires_entries(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr("task_cache.time.monotonic", lambda: now[0])
+    cache = TaskOwnershipCache(ttl_seconds=30)
+    cache.set(_ownership("task-1"))
+
+    now[0] += 29
+    assert cache.get("task-1") is not None
+    now[0] += 2
+    assert cache.get("task-1") is None
+
+
+def test_task_ownership_cache_invalidate_drops_entry():
+    cache = TaskOwnershipCache()
+    cache.set(_ownership("task-1"))
+
+    cache.invalidate("task-1")
+
+    assert cache.get("task-1") is None
+
+
+def test_task_ownership_from_row_reads_joined_workspace():
+    row = {
+        "id": "task-1",
+        "list_id": "list-1",
+        "task_lists": {
+            "id": "list-1",
+            "board_id": "board-1",
+            "workspace_boards": {"id": "board-1", "ws_id": "ws-1"},
+        },
+    }
+
+    assert task_ownership_from_row(row) == _ownership("task-1")
+    assert task_ownership_from_row({"id": "task-1", "task_lists": {}}) is None
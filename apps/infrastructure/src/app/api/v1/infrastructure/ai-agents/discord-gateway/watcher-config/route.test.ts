@@ -70,9 +70,11 @@ function agent(overrides: Record<string, unknown> = {}) {
 
 async function callRoute({
   auth = `Bearer ${WATCHER_SECRET}`,
+  ifNoneMatch,
   url = 'https://tuturuuu.com/api/v1/infrastructure/ai-agents/discord-gateway/watcher-config',
 }: {
   auth?: string | null;
+  ifNoneMatch?: string;
   url?: string;
 } = {}) {
   const { GET } = await import('./route');
@@ -82,6 +84,10 @@ async function callRoute({
     headers.set('authorization', auth);
   }
 
+  if (ifNoneMatch) {
+    headers.set('if-none-match', ifNoneMatch);
+  }
+
   const request = new Request(url, {
     headers,
     method: 'GET',
@@ -168,6 +174,8 @@ describe('Discord Gateway watcher config route', () => {
       targets: [
         {
           agentId: 'agent-1',
+          batchWebhookUrl:
+            'https://tuturuuu.com/api/v1/webhooks/ai-agents/discord/root-discord/batch',
           channelId: 'root-discord',
           discordGuildId: 'guild-1',
           externalChannelId: 'external-channel-1',
@@ -205,6 +213,8 @@ describe('Discord Gateway watcher config route', () => {
     await expect(response.json()).resolves.toMatchObject({
       targets: [
         {
+          batchWebhookUrl:
+            'https://tuturuuu.com/api/v1/webhooks/ai-agents/discord/secondary-root-discord/batch',
           channelId: 'secondary-root-discord',
           webhookUrl:
             'https://tuturuuu.com/api/v1/webhooks/ai-agents/discord/secondary-root-discord',
@@ -213,4 +223,28 @@ describe('Discord Gateway watcher config route', () => {
       ],
     });
   });
+
+  it('answers conditional requests with 304 until targets change', async () => {
+    const first = await callRoute();
+    const etag = first.headers.get('etag');
+
+    expect(first.status).toBe(200);
+    expect(etag).toBeTruthy();
+
+    const unchanged = await callRoute({ ifNoneMatch: etag ?? undefined });
+
+    expect(unchanged.status).toBe(304);
+    expect(unchanged.headers.get('etag')).toBe(etag);
+
+    mocks.listAiAgents.mockResolvedValue([
+      agent({
+        channels: [channel({ externalChannelId: 'external-channel-2' })],
+      }),
+    ]);
+
+    const changed = await callRoute({ ifNoneMatch: etag ?? undefined });
+
+    expect(changed.status).toBe(200);
+    expect(changed.headers.get('etag')).not.toBe(etag);
+  });
 });
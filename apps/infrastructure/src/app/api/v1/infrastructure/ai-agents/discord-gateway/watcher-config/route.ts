@@ -1,5 +1,5 @@
 import { Buffer } from 'node:buffer';
-import { timingSafeEqual } from 'node:crypto';
+import { createHash, timingSafeEqual } from 'node:crypto';
 import { createAdminClient } from '@tuturuuu/supabase/next/server';
 import type { TypedSupabaseClient } from '@tuturuuu/supabase/types';
 import { ROOT_WORKSPACE_ID } from '@tuturuuu/utils/constants';
@@ -30,6 +30,27 @@ function secretsMatch(candidate: string, configured: string) {
   );
 }
 
+// Served by apps/web's [adapter]/[channelId]/batch webhook route.
+function batchWebhookUrl(webhookUrl: string | null) {
+  return webhookUrl ? `${webhookUrl.replace(/\/+$/u, '')}/batch` : null;
+}
+
+function targetsEtag(body: unknown) {
+  const hash = createHash('sha256')
+    .update(JSON.stringify(body))
+    .digest('base64url');
+
+  return `"${hash}"`;
+}
+
+function etagMatches(request: NextRequest, etag: string) {
+  const ifNoneMatch = request.headers.get('if-none-match');
+
+  return Boolean(
+    ifNoneMatch?.split(',').some((candidate) => candidate.trim() === etag)
+  );
+}
+
 async function readWatcherSecret(db: TypedSupabaseClient) {
   const envSecret = process.env[WATCHER_SECRET_NAME]?.trim();
 
@@ -89,6 +110,7 @@ async function handleGet(request: NextRequest) {
       })
       .map((channel) => ({
         agentId: agent.id,
+        batchWebhookUrl: batchWebhookUrl(channel.webhookUrl),
         channelId: channel.id,
         discordGuildId: channel.discordGuildId ?? null,
         externalChannelId: channel.externalChannelId ?? null,
@@ -97,7 +119,16 @@ async function handleGet(request: NextRequest) {
       }))
   );
 
-  return NextResponse.json({ targets });
+  // Watchers poll this route; an ETag lets unchanged configs answer with 304.
+  const body = { targets };
+  const etag = targetsEtag(body);
+  const headers = { 'Cache-Control': 'private, no-cache', ETag: etag };
+
+  if (etagMatches(request, etag)) {
+    return new NextResponse(null, { headers, status: 304 });
+  }
+
+  return NextResponse.json(body, { headers });
 }
 
 export async function GET(request: NextRequest) {
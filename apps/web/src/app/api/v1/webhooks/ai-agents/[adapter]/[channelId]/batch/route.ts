@@ -0,0 +1,5 @@
+// @generated by scripts/generate-web-api-route-wrappers.js. Do not edit manually.
+
+import * as legacyRoute from '@/legacy-api-routes/v1/webhooks/ai-agents/[adapter]/[channelId]/batch/route';
+
+export const POST = legacyRoute.POST;
@@ -0,0 +1,248 @@
+import { ROOT_WORKSPACE_ID } from '@tuturuuu/utils/constants';
+import type { NextRequest } from 'next/server';
+import { beforeEach, describe, expect, it, vi } from 'vitest';
+
+const mocks = vi.hoisted(() => ({
+  createAiAgentChatRuntime: vi.fn(),
+  getAiAgentChannelById: vi.fn(),
+  webhookHandler: vi.fn(),
+  warn: vi.fn(),
+}));
+
+vi.mock('@/lib/ai-agents/registry', () => ({
+  getAiAgentChannelById: (...args: unknown[]) =>
+    mocks.getAiAgentChannelById(...args),
+}));
+
+vi.mock('@/lib/ai-agents/runtime', () => ({
+  createAiAgentChatRuntime: (...args: unknown[]) =>
+    mocks.createAiAgentChatRuntime(...args),
+}));
+
+vi.mock('@/lib/infrastructure/log-drain', () => ({
+  serverLogger: {
+    warn: (...args: unknown[]) => mocks.warn(...args),
+  },
+  withRequestLogDrain: (_metadata: unknown, handler: () => Promise<Response>) =>
+    handler(),
+}));
+
+function channel(overrides: Record<string, unknown> = {}) {
+  return {
+    adapter: 'discord',
+    discordGuildId: 'guild-1',
+    displayName: 'Discord',
+    enabled: true,
+    externalChannelId: 'discord-channel-1',
+    id: 'discord-channel',
+    lastDeployedAt: '2026-06-03T00:00:00.000Z',
+    lastError: null,
+    lastEventAt: null,
+    mentionRoleIds: [],
+    secrets: [],
+    status: 'deployed',
+    webhookUrl:
+      'https://tuturuuu.com/api/v1/webhooks/ai-agents/discord/discord-channel',
+    workspaceId: ROOT_WORKSPACE_ID,
+    ...overrides,
+  };
+}
+
+function agent(overrides: Record<string, unknown> = {}) {
+  return {
+    channels: [channel()],
+    createdAt: '2026-06-03T00:00:00.000Z',
+    enabled: true,
+    id: 'agent-1',
+    instructions: 'Help users.',
+    modelId: 'google/gemini-3.1-flash-lite',
+    name: 'Support Agent',
+    temperature: null,
+    tools: [],
+    updatedAt: '2026-06-03T00:00:00.000Z',
+    ...overrides,
+  };
+}
+
+function gatewayEvent(id: string, channelId = 'discord-channel-1') {
+  return {
+    data: {
+      channel_id: channelId,
+      guild_id: 'guild-1',
+      id,
+    },
+    timestamp: 1_718_000_000_000,
+    type: 'GATEWAY_MESSAGE_CREATE',
+  };
+}
+
+async function callRoute({
+  adapter = 'discord',
+  body = {
+    events: [gatewayEvent('message-1'), gatewayEvent('message-2')],
+    timestamp: 1_718_000_000_000,
+    type: 'GATEWAY_BATCH',
+  },
+  gatewayToken = 'gateway-token',
+}: {
+  adapter?: string;
+  body?: unknown;
+  gatewayToken?: string | null;
+} = {}) {
+  const { POST } = await import('./route');
+  const headers = new Headers({ 'content-type': 'application/json' });
+
+  if (gatewayToken) {
+    headers.set('x-discord-gateway-token', gatewayToken);
+  }
+
+  const request = new Request(
+    `https://tuturuuu.com/api/v1/webhooks/ai-agents/${adapter}/discord-channel/batch`,
+    {
+      body: JSON.stringify(body),
+      headers,
+      method: 'POST',
+    }
+  ) as unknown as NextRequest;
+  Object.assign(request, { nextUrl: new URL(request.url) });
+
+  return POST(request, {
+    params: Promise.resolve({
+      adapter,
+      channelId: 'discord-channel',
+    }),
+  });
+}
+
+async function handledEvents() {
+  return Promise.all(
+    mocks.webhookHandler.mock.calls.map(([request]) =>
+      (request as Request).json()
+    )
+  );
+}
+
+describe('AI agent batch webhook route', () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+    mocks.getAiAgentChannelById.mockResolvedValue({
+      agent: agent(),
+      channel: channel(),
+    });
+    mocks.webhookHandler.mockImplementation(async () =>
+      Response.json({ ok: true })
+    );
+    mocks.createAiAgentChatRuntime.mockResolvedValue({
+      webhooks: {
+        discord: (...args: unknown[]) => mocks.webhookHandler(...args),
+      },
+    });
+  });
+
+  it('hands every batched Gateway event to the Discord webhook handler in order', async () => {
+    const response = await callRoute();
+
+    expect(response.status).toBe(200);
+    await expect(response.json()).resolves.toEqual({ delivered: 2 });
+    expect(mocks.createAiAgentChatRuntime).toHaveBeenCalledOnce();
+    await expect(handledEvents()).resolves.toEqual([
+      gatewayEvent('message-1'),
+      gatewayEvent('message-2'),
+    ]);
+
+    const [request] = mocks.webhookHandler.mock.calls[0] as [Request];
+    expect(request.headers.get('x-discord-gateway-token')).toBe(
+      'gateway-token'
+    );
+  });
+
+  it('stops at the first rejected event and reports what was delivered', async () => {
+    mocks.webhookHandler
+      .mockResolvedValueOnce(Response.json({ ok: true }))
+      .mockResolvedValueOnce(Response.json({ error: 'busy' }, { status: 503 }));
+
+    const response = await callRoute({
+      body: {
+        events: [
+          gatewayEvent('message-1'),
+          gatewayEvent('message-2'),
+          gatewayEvent('message-3'),
+        ],
+        type: 'GATEWAY_BATCH',
+      },
+    });
+
+    expect(response.status).toBe(503);
+    await expect(response.json()).resolves.toMatchObject({ delivered: 1 });
+    expect(mocks.webhookHandler).toHaveBeenCalledTimes(2);
+  });
+
+  it('rejects the whole batch when an event is outside the channel binding', async () => {
+    const response = await callRoute({
+      body: {
+        events: [gatewayEvent('message-1'), gatewayEvent('message-2', 'other')],
+        type: 'GATEWAY_BATCH',
+      },
+    });
+
+    expect(response.status).toBe(403);
+    await expect(response.json()).resolves.toMatchObject({
+      delivered: 0,
+      error:
+        'Discord Gateway event does not match the configured AI agent channel',
+      index: 1,
+    });
+    expect(mocks.createAiAgentChatRuntime).not.toHaveBeenCalled();
+  });
+
+  it('rejects batches for non-root workspaces', async () => {
+    mocks.getAiAgentChannelById.mockResolvedValue({
+      agent: agent(),
+      channel: channel({ workspaceId: 'workspace-1' }),
+    });
+
+    const response = await callRoute();
+
+    expect(response.status).toBe(403);
+    expect(mocks.createAiAgentChatRuntime).not.toHaveBeenCalled();
+  });
+
+  it('requires the Discord Gateway token', async () => {
+    const response = await callRoute({ gatewayToken: null });
+
+    expect(response.status).toBe(401);
+    expect(mocks.getAiAgentChannelById).not.toHaveBeenCalled();
+  });
+
+  it('only accepts batches for Discord channels', async () => {
+    const response = await callRoute({ adapter: 'zalo' });
+
+    expect(response.status).toBe(404);
+    expect(mocks.getAiAgentChannelById).not.toHaveBeenCalled();
+  });
+
+  it.each([
+    { events: [], type: 'GATEWAY_BATCH' },
+    { events: [gatewayEvent('message-1')], type: 'GATEWAY_MESSAGE_CREATE' },
+    { type: 'GATEWAY_BATCH' },
+  ])('rejects malformed batch envelopes', async (body) => {
+    const response = await callRoute({ body });
+
+    expect(response.status).toBe(400);
+    expect(mocks.webhookHandler).not.toHaveBeenCalled();
+  });
+
+  it('rejects batches above the event limit', async () => {
+    const response = await callRoute({
+      body: {
+        events: Array.from({ length: 101 }, (_, index) =>
+          gatewayEvent(`message-${index}`)
+        ),
+        type: 'GATEWAY_BATCH',
+      },
+    });
+
+    expect(response.status).toBe(413);
+    expect(mocks.webhookHandler).not.toHaveBeenCalled();
+  });
+});
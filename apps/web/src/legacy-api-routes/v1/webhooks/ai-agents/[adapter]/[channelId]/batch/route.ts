@@ -0,0 +1,189 @@
+import { ROOT_WORKSPACE_ID } from '@tuturuuu/utils/constants';
+import { after, type NextRequest, NextResponse } from 'next/server';
+import { checkDiscordGatewayBinding } from '@/lib/ai-agents/discord-gateway-binding';
+import { getAiAgentChannelById } from '@/lib/ai-agents/registry';
+import { createAiAgentChatRuntime } from '@/lib/ai-agents/runtime';
+import { withRequestLogDrain } from '@/lib/infrastructure/log-drain';
+
+// Matches MAX_BATCH_EVENTS in apps/discord/ai_agent_gateway_watcher.py.
+const MAX_GATEWAY_BATCH_EVENTS = 100;
+
+interface Params {
+  params: Promise<{
+    adapter: string;
+    channelId: string;
+  }>;
+}
+
+function readGatewayBatchEvents(payload: unknown) {
+  if (!payload || typeof payload !== 'object' || Array.isArray(payload)) {
+    return null;
+  }
+
+  const { events, type } = payload as Record<string, unknown>;
+
+  return type === 'GATEWAY_BATCH' && Array.isArray(events) && events.length
+    ? events
+    : null;
+}
+
+/**
+ * Accepts a `GATEWAY_BATCH` envelope from the Discord Gateway watcher and
+ * hands its events, in order, to the channel's Discord webhook handler.
+ *
+ * The response reports how many events were `delivered`. Delivery stops at
+ * the first event the handler rejects, and the response takes that event's
+ * status, so the watcher only retries the events from there on.
+ */
+async function handleBatchWebhook(request: NextRequest, { params }: Params) {
+  const { adapter, channelId } = await params;
+
+  // Only the Discord Gateway watcher batches events.
+  if (adapter !== 'discord') {
+    return NextResponse.json(
+      { error: 'Unknown AI agent adapter' },
+      { status: 404 }
+    );
+  }
+
+  if (!request.headers.has('x-discord-gateway-token')) {
+    return NextResponse.json(
+      { error: 'Discord Gateway batches require a gateway token' },
+      { status: 401 }
+    );
+  }
+
+  try {
+    const resolved = await getAiAgentChannelById({
+      adapter,
+      channelId,
+      origin: request.nextUrl.origin,
+    });
+
+    if (!resolved) {
+      return NextResponse.json(
+        { error: 'AI agent channel not found' },
+        { status: 404 }
+      );
+    }
+
+    const { agent, channel } = resolved;
+    if (!agent.enabled || !channel.enabled || channel.status !== 'deployed') {
+      return NextResponse.json(
+        { error: 'AI agent channel is not deployed' },
+        { status: 409 }
+      );
+    }
+
+    if (channel.workspaceId !== ROOT_WORKSPACE_ID) {
+      return NextResponse.json(
+        {
+          error:
+            'Discord Gateway forwarding is restricted to the internal workspace',
+        },
+        { status: 403 }
+      );
+    }
+
+    const events = readGatewayBatchEvents(
+      await request.json().catch(() => null)
+    );
+
+    if (!events) {
+      return NextResponse.json(
+        { error: 'Invalid Discord Gateway batch payload' },
+        { status: 400 }
+      );
+    }
+
+    if (events.length > MAX_GATEWAY_BATCH_EVENTS) {
+      return NextResponse.json(
+        {
+          error: `Discord Gateway batches are limited to ${MAX_GATEWAY_BATCH_EVENTS} events`,
+        },
+        { status: 413 }
+      );
+    }
+
+    // Validate the whole batch first so a bad event rejects it untouched.
+    for (const [index, event] of events.entries()) {
+      const bindingError = checkDiscordGatewayBinding(event, channel);
+      if (bindingError) {
+        return NextResponse.json(
+          { delivered: 0, error: bindingError.error, index },
+          { status: bindingError.status }
+        );
+      }
+    }
+
+    const chat = await createAiAgentChatRuntime({ agent, channel });
+    const handler = chat.webhooks.discord;
+
+    if (!handler) {
+      return NextResponse.json(
+        { error: 'AI agent adapter is not configured' },
+        { status: 500 }
+      );
+    }
+
+    const headers = new Headers(request.headers);
+    headers.delete('content-length');
+    headers.set('content-type', 'application/json');
+
+    let delivered = 0;
+    for (const event of events) {
+      let response: Response;
+
+      try {
+        response = await handler(
+          new Request(request.url, {
+            body: JSON.stringify(event),
+            headers,
+            method: 'POST',
+          }),
+          { waitUntil: (task) => after(() => task) }
+        );
+      } catch (error) {
+        console.warn('Failed to handle AI agent batch webhook event', {
+          channelId,
+          delivered,
+          error: error instanceof Error ? error.message : String(error),
+        });
+        return NextResponse.json(
+          { delivered, error: 'Failed to handle AI agent webhook' },
+          { status: 400 }
+        );
+      }
+
+      if (!response.ok) {
+        return NextResponse.json(
+          { delivered, error: 'Discord Gateway batch event was rejected' },
+          { status: response.status }
+        );
+      }
+
+      delivered += 1;
+    }
+
+    return NextResponse.json({ delivered });
+  } catch (error) {
+    console.warn('Failed to handle AI agent batch webhook', {
+      channelId,
+      error: error instanceof Error ? error.message : String(error),
+    });
+    return NextResponse.json(
+      { error: 'Failed to handle AI agent webhook' },
+      { status: 400 }
+    );
+  }
+}
+
+export async function POST(request: NextRequest, context: Params) {
+  return withRequestLogDrain(
+    {
+      request,
+      route: '/api/v1/webhooks/ai-agents/[adapter]/[channelId]/batch',
+    },
+    () => handleBatchWebhook(request, context)
+  );
+}
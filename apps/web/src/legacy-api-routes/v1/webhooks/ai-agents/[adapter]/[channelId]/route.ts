@@ -1,5 +1,6 @@
 import { ROOT_WORKSPACE_ID } from '@tuturuuu/utils/constants';
 import { after, type NextRequest, NextResponse } from 'next/server';
+import { checkDiscordGatewayBinding } from '@/lib/ai-agents/discord-gateway-binding';
 import { getAiAgentChannelById } from '@/lib/ai-agents/registry';
 import {
   assertWebhookAdapter,
@@ -15,69 +16,21 @@ interface Params {
   }>;
 }
 
-function asRecord(value: unknown): Record<string, unknown> | null {
-  return value && typeof value === 'object' && !Array.isArray(value)
-    ? (value as Record<string, unknown>)
-    : null;
-}
-
-function readString(value: unknown) {
-  return typeof value === 'string' && value.trim() ? value.trim() : null;
-}
-
-function readGatewayChannelIds(data: Record<string, unknown>) {
-  const channelIds = new Set<string>();
-  const directChannelId = readString(data.channel_id);
-  const thread = asRecord(data.thread);
-  const parentChannelId = readString(thread?.parent_id);
-
-  if (directChannelId) channelIds.add(directChannelId);
-  if (parentChannelId) channelIds.add(parentChannelId);
-
-  return channelIds;
-}
-
 async function validateDiscordGatewayBinding(
   request: Request,
   channel: AiAgentChannelConfig
 ) {
-  const expectedGuildId = channel.discordGuildId?.trim() || null;
-  const expectedChannelId = channel.externalChannelId?.trim() || null;
-
-  if (!expectedGuildId || !expectedChannelId) {
-    return NextResponse.json(
-      {
-        error:
-          'Discord Gateway forwarding requires a configured guild and channel binding',
-      },
-      { status: 403 }
-    );
-  }
-
-  const payload = asRecord(await request.json().catch(() => null));
-  const data = asRecord(payload?.data);
-
-  if (!data) {
-    return NextResponse.json(
-      { error: 'Invalid Discord Gateway event payload' },
-      { status: 400 }
-    );
-  }
-
-  const guildId = readString(data.guild_id);
-  const channelIds = readGatewayChannelIds(data);
-
-  if (guildId !== expectedGuildId || !channelIds.has(expectedChannelId)) {
-    return NextResponse.json(
-      {
-        error:
-          'Discord Gateway event does not match the configured AI agent channel',
-      },
-      { status: 403 }
-    );
-  }
+  const bindingError = checkDiscordGatewayBinding(
+    await request.json().catch(() => null),
+    channel
+  );
 
-  return null;
+  return bindingError
+    ? NextResponse.json(
+        { error: bindingError.error },
+        { status: bindingError.status }
+      )
+    : null;
 }
 
 async function handleWebhook(request: NextRequest, { params }: Params) {
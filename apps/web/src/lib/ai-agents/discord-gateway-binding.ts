@@ -0,0 +1,67 @@
+import type { AiAgentChannelConfig } from './types';
+
+export interface DiscordGatewayBindingError {
+  error: string;
+  status: 400 | 403;
+}
+
+function asRecord(value: unknown): Record<string, unknown> | null {
+  return value && typeof value === 'object' && !Array.isArray(value)
+    ? (value as Record<string, unknown>)
+    : null;
+}
+
+function readString(value: unknown) {
+  return typeof value === 'string' && value.trim() ? value.trim() : null;
+}
+
+function readGatewayChannelIds(data: Record<string, unknown>) {
+  const channelIds = new Set<string>();
+  const directChannelId = readString(data.channel_id);
+  const thread = asRecord(data.thread);
+  const parentChannelId = readString(thread?.parent_id);
+
+  if (directChannelId) channelIds.add(directChannelId);
+  if (parentChannelId) channelIds.add(parentChannelId);
+
+  return channelIds;
+}
+
+/**
+ * Checks that a forwarded Discord Gateway event belongs to the guild and
+ * channel the AI agent channel is bound to. Returns null when it does.
+ */
+export function checkDiscordGatewayBinding(
+  payload: unknown,
+  channel: AiAgentChannelConfig
+): DiscordGatewayBindingError | null {
+  const expectedGuildId = channel.discordGuildId?.trim() || null;
+  const expectedChannelId = channel.externalChannelId?.trim() || null;
+
+  if (!expectedGuildId || !expectedChannelId) {
+    return {
+      error:
+        'Discord Gateway forwarding requires a configured guild and channel binding',
+      status: 403,
+    };
+  }
+
+  const data = asRecord(asRecord(payload)?.data);
+
+  if (!data) {
+    return { error: 'Invalid Discord Gateway event payload', status: 400 };
+  }
+
+  const guildId = readString(data.guild_id);
+  const channelIds = readGatewayChannelIds(data);
+
+  if (guildId !== expectedGuildId || !channelIds.has(expectedChannelId)) {
+    return {
+      error:
+        'Discord Gateway event does not match the configured AI agent channel',
+      status: 403,
+    };
+  }
+
+  return null;
+}
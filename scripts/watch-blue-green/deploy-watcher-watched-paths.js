@@ -20,6 +20,10 @@ const CONTAINER_REFRESH_WATCHED_FILES = [
   'apps/backend/',
   'apps/discord/Dockerfile.markitdown',
   'apps/discord/local_server.py',
+  'apps/discord/markitdown_cache.py',
+  'apps/discord/markitdown_executor.py',
+  'apps/discord/markitdown_formats.py',
+  'apps/discord/markitdown_sections.py',
   'apps/discord/markitdown_service.py',
   'apps/hive/Dockerfile',
   'apps/hive/db/',